@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+STAFF_EMAILS_CACHE_KEY = 'account:staff_emails'
+
+
+def get_staff_emails():
+    """
+    Email addresses of every staff user, for admin notifications.
+    Served from the cache; on a miss only the email column is read.
+    """
+    emails = cache.get(STAFF_EMAILS_CACHE_KEY)
+    if emails is None:
+        emails = list(
+            User.objects.filter(is_staff=True)
+            .exclude(email='')
+            .order_by('id')
+            .values_list('email', flat=True)
+        )
+        cache.set(STAFF_EMAILS_CACHE_KEY, emails, settings.STAFF_EMAILS_CACHE_TIMEOUT)
+    return emails
+
+
+def invalidate_staff_emails():
+    cache.delete(STAFF_EMAILS_CACHE_KEY)
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from account.authentication import invalidate_cached_user
+from account.cache import invalidate_staff_emails
+
+
+def _staff_state(user):
+    # Read from __dict__ so a deferred field is reported as unknown instead of triggering a query.
+    return user.__dict__.get('is_staff'), user.__dict__.get('email')
+
+
+# Cache entries are dropped now, and again once the transaction commits, so a request that
+# re-reads the row before our commit cannot put the old value back for a whole timeout.
+
+def _invalidate_staff_emails():
+    invalidate_staff_emails()
+    transaction.on_commit(invalidate_staff_emails)
+
+
+def _invalidate_cached_user(user_id):
+    invalidate_cached_user(user_id)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+@receiver(post_init, sender=User)
+def remember_staff_state(sender, instance, **kwargs):
+    instance._staff_state = _staff_state(instance)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    if not created:
+        _invalidate_cached_user(instance.pk)
+
+    previous = getattr(instance, '_staff_state', (None, None))
+    current = _staff_state(instance)
+    instance._staff_state = current
+    if created:
+        affects_staff = bool(instance.is_staff)
+    elif None in previous:
+        affects_staff = True
+    else:
+        affects_staff = previous != current and (previous[0] or current[0])
+    if affects_staff:
+        _invalidate_staff_emails()
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    _invalidate_cached_user(instance.pk)
+    if instance.__dict__.get('is_staff', True):
+        _invalidate_staff_emails()
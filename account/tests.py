@@ -1,3 +1,93 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.conf import settings
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from account.cache import get_staff_emails
+
+
+class StaffEmailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        self.user = User.objects.create_user('user', 'user@example.com', 'pass')
+
+    def test_hits_do_not_query(self):
+        self.assertEqual(get_staff_emails(), ['admin@example.com'])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_staff_emails(), ['admin@example.com'])
+
+    def test_staff_changes_invalidate(self):
+        get_staff_emails()
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(get_staff_emails(), ['admin@example.com', 'user@example.com'])
+
+        self.admin.email = 'boss@example.com'
+        self.admin.save()
+        self.assertEqual(get_staff_emails(), ['boss@example.com', 'user@example.com'])
+
+        self.user.delete()
+        self.assertEqual(get_staff_emails(), ['boss@example.com'])
+
+    def test_unrelated_saves_keep_the_cache(self):
+        get_staff_emails()
+        self.user.first_name = 'Someone'
+        self.user.save()
+        self.admin.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            get_staff_emails()
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('user', 'user@example.com', 'pass')
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_repeat_requests_do_not_query_the_user(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.data['data']['username'], 'user')
+
+    def test_saving_the_user_refreshes_the_cache(self):
+        self.client.get('/api/auth/profile/')
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').data['data']['full_name'], 'Renamed')
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get('/api/auth/profile/')
+        self.user.delete()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user('user', 'user@example.com', 'pass')
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {
+        **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'login_user': '2/min',
+    }})
+    def test_password_guessing_is_throttled_per_username(self):
+        for _ in range(2):
+            response = self.client.post('/api/auth/login/', {'username': 'User', 'password': 'wrong'})
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post('/api/auth/login/', {'username': 'user', 'password': 'pass'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+        response = self.client.post('/api/auth/login/', {'username': 'someone-else', 'password': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,20 @@
+from base.throttling import IPTokenBucketThrottle, TokenBucketThrottle
+
+
+class LoginIPThrottle(IPTokenBucketThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsernameThrottle(TokenBucketThrottle):
+    """Limits password guesses against one account, whichever addresses they come from."""
+    scope = 'login_user'
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': username.lower()}
+
+
+class RegisterIPThrottle(IPTokenBucketThrottle):
+    scope = 'register_ip'
@@ -1,7 +1,16 @@
 from django.contrib import admin
+from .models import OutboxEmail
 
 # Register your models here.
 admin.site.site_header = "BBC MEET ADMIN"
 admin.site.site_title = "Welcome to BBC MEET ADMIN"
 admin.site.index_title = "Welcome to BBC MEET ADMIN"
-admin.site.site_url = "https://meeting.bbcfinsrv.com"
\ No newline at end of file
+admin.site.site_url = "https://meeting.bbcfinsrv.com"
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject',)
+    ordering = ('-created_at',)
+    readonly_fields = ('locked_by', 'locked_until', 'last_error', 'sent_at')
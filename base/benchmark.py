@@ -0,0 +1,78 @@
+"""
+Helpers shared by the `bench_*` management commands.
+
+Benchmarks run inside a throwaway test database (the same one `manage.py test`
+would create), so they can be pointed at any settings module without touching
+real data.
+"""
+import contextlib
+import math
+import re
+import statistics
+
+from django.db import connections
+from django.test.utils import setup_databases, teardown_databases
+
+
+@contextlib.contextmanager
+def benchmark_database(keepdb=False, sqlite_file=None):
+    """
+    Create the test databases for the duration of the block. SQLite test
+    databases live in memory with table-level locking, which fails concurrent
+    writers from other threads; pass `sqlite_file` to put them in a file instead.
+    """
+    if sqlite_file:
+        for connection in connections.all():
+            if connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME']:
+                connection.settings_dict['TEST']['NAME'] = f'{sqlite_file}-{connection.alias}.sqlite3'
+    old_config = setup_databases(verbosity=0, interactive=False, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0, keepdb=keepdb)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (pct between 0 and 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies):
+    """Summary statistics for a list of latencies in seconds, reported in milliseconds."""
+    return {
+        'count': len(latencies),
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def server_timing_queries(header):
+    """The query count PerformanceMiddleware put in a Server-Timing header, or None if it has none."""
+    match = re.search(r'(?:^|,)\s*db;[^,]*desc="(\d+) queries"', header or '')
+    return int(match.group(1)) if match else None
+
+
+def compare(current, baseline, tolerance):
+    """
+    Differences between two `bench_load` results that count as regressions:
+    throughput down or an endpoint's p95 latency up by more than `tolerance`
+    (a fraction), or an endpoint making half a query per request more.
+    """
+    regressions = []
+    if current['rps'] < baseline['rps'] * (1 - tolerance):
+        regressions.append(f"throughput {current['rps']:.0f} req/s, was {baseline['rps']:.0f}")
+    for name, stats in current['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if before is None:
+            continue
+        if stats['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name} p95 {stats['p95_ms']:.1f}ms, was {before['p95_ms']:.1f}ms")
+        if stats['queries'] is not None and before['queries'] is not None and stats['queries'] >= before['queries'] + 0.5:
+            regressions.append(f"{name} {stats['queries']:.1f} queries per request, was {before['queries']:.1f}")
+    return regressions
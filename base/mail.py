@@ -0,0 +1,21 @@
+from django.conf import settings
+from base.models import OutboxEmail
+from base.perf import timed
+
+
+@timed('mail')
+def queue_mail(subject, message, recipient_list, from_email=None):
+    """
+    Drop-in replacement for `send_mail` that writes to the outbox instead of
+    talking to SMTP. Call it inside the transaction that makes the change the
+    email is about; the `process_outbox` command delivers it afterwards.
+    """
+    recipients = [email for email in recipient_list if email]
+    if not recipients:
+        return None
+    return OutboxEmail.objects.create(
+        subject=subject[:255],
+        message=message,
+        from_email=from_email or settings.EMAIL_HOST_USER,
+        recipients=recipients,
+    )
@@ -0,0 +1,46 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from base.benchmark import summarize
+from base.throttling import IPTokenBucketThrottle
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of the token-bucket throttle against the configured throttle cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100_000)
+        parser.add_argument('--clients', type=int, default=1000, help="Distinct client IPs (buckets).")
+        parser.add_argument('--budget-us', type=float, default=100.0, help="Fail if the mean cost exceeds this.")
+
+    def handle(self, *args, **options):
+        throttle_class = type('BenchThrottle', (IPTokenBucketThrottle,), {'scope': 'bench', 'rate': '1000000/s'})
+        factory = APIRequestFactory()
+        requests = []
+        for i in range(options['clients']):
+            request = Request(factory.get('/', REMOTE_ADDR=f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}'))
+            request.user = AnonymousUser()
+            requests.append(request)
+
+        latencies = []
+        for i in range(options['requests']):
+            request = requests[i % len(requests)]
+            began = time.perf_counter()
+            # A new instance per request, as DRF does.
+            throttle_class().allow_request(request, None)
+            latencies.append(time.perf_counter() - began)
+
+        stats = summarize(latencies)
+        mean_us = stats['mean_ms'] * 1000
+        self.stdout.write(
+            f"requests={stats['count']} clients={options['clients']} mean={mean_us:.1f}us "
+            f"p50={stats['p50_ms'] * 1000:.1f}us p99={stats['p99_ms'] * 1000:.1f}us"
+        )
+        if mean_us > options['budget_us']:
+            self.stderr.write(self.style.ERROR(f"Mean cost is above the {options['budget_us']:.0f}us budget."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Within the {options['budget_us']:.0f}us budget."))
@@ -0,0 +1,122 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from base.models import OutboxEmail
+from base.views import logger
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the outbox, retrying failures with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain what is due now and exit instead of polling.")
+        parser.add_argument('--batch-size', type=int, default=50, help="Emails claimed per round.")
+        parser.add_argument('--workers', type=int, default=4, help="Concurrent SMTP connections.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        self.max_attempts = settings.OUTBOX_MAX_ATTEMPTS
+        self.backoff = settings.OUTBOX_RETRY_BACKOFF_SECONDS
+        self.local = threading.local()
+        self.connections = []
+
+        try:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                while True:
+                    claimed = self.claim(options['batch_size'])
+                    if claimed:
+                        results = pool.map(self.deliver, claimed)
+                        self.record(list(results))
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+        finally:
+            for connection in self.connections:
+                self.close(connection)
+
+    def claim(self, batch_size):
+        """
+        Lease a batch of due emails to this worker. The lease is a single
+        conditional UPDATE, so several workers can poll the same table without
+        sending anything twice; a lease left by a crashed worker simply expires.
+        """
+        now = timezone.now()
+        token = uuid.uuid4()
+        due = Q(status='pending', next_attempt_at__lte=now) & (Q(locked_until__isnull=True) | Q(locked_until__lt=now))
+        ids = list(
+            OutboxEmail.objects.filter(due)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        OutboxEmail.objects.filter(due, id__in=ids).update(
+            locked_by=token,
+            locked_until=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+        )
+        return list(OutboxEmail.objects.filter(locked_by=token))
+
+    def connection(self):
+        # One SMTP connection per worker thread, kept open across emails.
+        if getattr(self.local, 'connection', None) is None:
+            connection = get_connection()
+            connection.open()
+            self.local.connection = connection
+            self.connections.append(connection)
+        return self.local.connection
+
+    @staticmethod
+    def close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def deliver(self, email):
+        try:
+            message = EmailMessage(email.subject, email.message, email.from_email, email.recipients,
+                                   connection=self.connection())
+            message.send()
+            return email, None
+        except Exception as e:
+            # Drop the connection; it may be the thing that broke.
+            connection = getattr(self.local, 'connection', None)
+            if connection is not None:
+                self.close(connection)
+                self.connections.remove(connection)
+            self.local.connection = None
+            return email, e
+
+    def record(self, results):
+        now = timezone.now()
+        for email, error in results:
+            attempts = email.attempts + 1
+            if error is None:
+                OutboxEmail.objects.filter(pk=email.pk).update(
+                    status='sent', attempts=attempts, sent_at=now, last_error='',
+                    locked_by=None, locked_until=None, updated_at=now,
+                )
+                continue
+
+            if attempts >= self.max_attempts:
+                logger.error(f"Giving up on outbox email {email.uid} after {attempts} attempts: {error}")
+                fields = {'status': 'failed'}
+            else:
+                delay = self.backoff * 2 ** (attempts - 1)
+                delay = min(delay, 3600) * random.uniform(0.8, 1.2)
+                logger.warning(f"Outbox email {email.uid} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+                fields = {'next_attempt_at': now + timedelta(seconds=delay)}
+            OutboxEmail.objects.filter(pk=email.pk).update(
+                attempts=attempts, last_error=str(error), locked_by=None, locked_until=None, updated_at=now, **fields,
+            )
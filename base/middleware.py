@@ -0,0 +1,97 @@
+import logging
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from base.perf import RequestTimings, collect
+
+logger = logging.getLogger('perf')
+
+
+class PerformanceMiddleware:
+    """
+    Time every request and its database queries and, for a PERF_SAMPLE_RATE
+    share of them, break the time down into the phases marked with
+    base.perf.timed (serializer, outbox email). Sampled requests go out in a
+    `perf` log line and, to staff users (everyone when DEBUG or
+    PERF_SERVER_TIMING is on), in a Server-Timing header; any request slower
+    than PERF_SLOW_REQUEST_MS is logged as a warning with its slowest queries.
+
+    Requests that are not sampled only pay for the clock reads around the
+    request and each query. For streamed responses the time runs until the
+    response starts, not until it ends.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = self.start()
+        with collect(timings):
+            response = self.get_response(request)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = self.start()
+        with collect(timings):
+            response = await self.get_response(request)
+        return self.finish(request, response, timings)
+
+    @staticmethod
+    def start():
+        sampled = random.random() < settings.PERF_SAMPLE_RATE
+        return RequestTimings(sampled, settings.PERF_SLOW_QUERY_COUNT)
+
+    def finish(self, request, response, timings):
+        total = timings.elapsed()
+        if self.shows_timings(request):
+            response['Server-Timing'] = self.server_timing(timings, total)
+
+        fields = self.log_fields(request, response, timings, total)
+        message = ' '.join(f'{key}={value}' for key, value in fields.items())
+        if total * 1000 >= settings.PERF_SLOW_REQUEST_MS:
+            queries = ''.join(f"\n    {duration * 1000:.1f}ms {sql}" for duration, sql in timings.top_queries())
+            logger.warning(f"Slow request {message}{queries}", extra={'perf': fields})
+        elif timings.sampled:
+            logger.info(message, extra={'perf': fields})
+        return response
+
+    @staticmethod
+    def shows_timings(request):
+        if settings.PERF_SERVER_TIMING or settings.DEBUG:
+            return True
+        # DRF copies the user it authenticated onto the Django request.
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_staff)
+
+    @staticmethod
+    def server_timing(timings, total):
+        metrics = []
+        if timings.sampled:
+            metrics.append(f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries"')
+            metrics += [f'{phase};dur={seconds * 1000:.1f}' for phase, seconds in sorted(timings.phases.items())]
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+    @staticmethod
+    def log_fields(request, response, timings, total):
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'queries': timings.queries,
+            'db_ms': round(timings.db * 1000, 1),
+        }
+        if timings.sampled:
+            for phase, seconds in sorted(timings.phases.items()):
+                fields[f'{phase}_ms'] = round(seconds * 1000, 1)
+        return fields
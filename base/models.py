@@ -1,11 +1,42 @@
 from django.db import models
+from django.utils import timezone
+from base.choices import OUTBOX_STATUS_CHOICES
 import uuid
 
 # Create your models here.
 class BaseModel(models.Model):
-    uid = models.UUIDField(default=uuid.uuid4, editable=False)
+    uid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         abstract = True
+
+
+class OutboxEmail(BaseModel):
+    """
+    An email waiting to be delivered by the `process_outbox` worker.
+    Rows are written in the same transaction as the change that triggers them,
+    so a notification is never sent for a change that was rolled back.
+    """
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=OUTBOX_STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    # Claim held by a worker while it is sending; expires if the worker dies.
+    locked_by = models.UUIDField(blank=True, null=True)
+    locked_until = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
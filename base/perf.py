@@ -0,0 +1,127 @@
+"""
+Per-request timings collected by base.middleware.PerformanceMiddleware.
+
+The middleware puts a RequestTimings in a context variable for the duration
+of the request. Database queries are added by an execute_wrapper installed on
+every connection as it is opened, so queries run by sync_to_async threads under
+ASGI are counted too (asgiref copies the context variable into those threads).
+Other work is attributed to a named phase with `timed`:
+
+    @timed('serialize')
+    def to_representation(self, instance):
+        ...
+
+Queries are timed for every request, so a slow one can always be logged with
+its slowest queries; that costs two clock reads and a small heap update per
+query. Outside a request, or in one that was not sampled, `timed` does nothing.
+"""
+import heapq
+import time
+from contextlib import ContextDecorator, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self, sampled, keep_queries):
+        self.started = time.perf_counter()
+        self.sampled = sampled
+        self.keep_queries = keep_queries
+        self.queries = 0
+        self.db = 0.0
+        self.phases = {}
+        self.slowest = []  # min-heap of (seconds, sql), at most keep_queries long
+        self._open = {}  # phase -> (depth, started)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.db += duration
+            entry = (duration, sql)
+            if len(self.slowest) < self.keep_queries:
+                heapq.heappush(self.slowest, entry)
+            elif self.slowest and duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def top_queries(self):
+        return sorted(self.slowest, reverse=True)
+
+    def enter(self, phase):
+        depth, started = self._open.get(phase, (0, None))
+        self._open[phase] = (depth + 1, time.perf_counter() if depth == 0 else started)
+
+    def exit(self, phase):
+        depth, started = self._open[phase]
+        if depth > 1:
+            self._open[phase] = (depth - 1, started)
+            return
+        del self._open[phase]
+        self.phases[phase] = self.phases.get(phase, 0.0) + time.perf_counter() - started
+
+
+def current_timings():
+    return _current.get()
+
+
+def _record_query(execute, sql, params, many, context):
+    """The execute_wrapper on every connection: times the query for the current request, sampled or not."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings.record_query(execute, sql, params, many, context)
+
+
+def instrument(connection):
+    if _record_query not in connection.execute_wrappers:
+        # At the front, so execute_wrapper() blocks that pop their own wrapper off the end are unaffected.
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+def _connection_created(sender, connection, **kwargs):
+    instrument(connection)
+
+
+connection_created.connect(_connection_created)
+
+
+@contextmanager
+def collect(timings):
+    """Make `timings` the current request's for the duration of the block."""
+    # Connections opened before this module was imported never sent connection_created.
+    for connection in connections.all(initialized_only=True):
+        instrument(connection)
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+class timed(ContextDecorator):
+    """Add the time spent in a block or function to the current request's `phase`; nested blocks count once."""
+
+    def __init__(self, phase):
+        self.phase = phase
+
+    def __enter__(self):
+        timings = _current.get()
+        if timings is not None and timings.sampled:
+            timings.enter(self.phase)
+        return self
+
+    def __exit__(self, *exc):
+        timings = _current.get()
+        if timings is not None and timings.sampled:
+            timings.exit(self.phase)
+        return False
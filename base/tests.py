@@ -1,3 +1,222 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from base.benchmark import compare, server_timing_queries
+from base.mail import queue_mail
+from base.perf import RequestTimings, collect, timed
+from base.models import OutboxEmail
+from base.throttling import IPTokenBucketThrottle, UserTokenBucketThrottle
+from meet.management.commands.bench_asgi import meet_routes
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError("SMTP unavailable")
+
+
+class OutboxTests(TestCase):
+    def test_queue_mail_does_not_send(self):
+        email = queue_mail("Subject", "Body", ['a@example.com', ''])
+        self.assertEqual(email.recipients, ['a@example.com'])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertIsNone(queue_mail("Subject", "Body", []))
+
+    def test_worker_delivers_due_emails(self):
+        queue_mail("First", "Body", ['a@example.com'])
+        queue_mail("Second", "Body", ['b@example.com'])
+        later = queue_mail("Later", "Body", ['c@example.com'])
+        OutboxEmail.objects.filter(pk=later.pk).update(next_attempt_at=timezone.now() + timedelta(hours=1))
+
+        call_command('process_outbox', once=True, workers=2)
+
+        self.assertEqual(sorted(m.subject for m in mail.outbox), ['First', 'Second'])
+        self.assertEqual(OutboxEmail.objects.filter(status='sent').count(), 2)
+        self.assertEqual(OutboxEmail.objects.get(pk=later.pk).status, 'pending')
+
+    @override_settings(EMAIL_BACKEND='base.tests.FailingEmailBackend', OUTBOX_MAX_ATTEMPTS=2)
+    def test_failures_back_off_then_give_up(self):
+        email = queue_mail("Subject", "Body", ['a@example.com'])
+
+        call_command('process_outbox', once=True)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn("SMTP unavailable", email.last_error)
+        self.assertIsNone(email.locked_by)
+
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        call_command('process_outbox', once=True)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+
+    def test_leased_emails_are_skipped_until_the_lease_expires(self):
+        email = queue_mail("Subject", "Body", ['a@example.com'])
+        OutboxEmail.objects.filter(pk=email.pk).update(locked_until=timezone.now() + timedelta(minutes=5))
+        call_command('process_outbox', once=True)
+        self.assertEqual(len(mail.outbox), 0)
+
+        OutboxEmail.objects.filter(pk=email.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        call_command('process_outbox', once=True)
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1000.0
+
+    def throttle(self, cls=IPTokenBucketThrottle, rate='3/min'):
+        throttle = type('Throttle', (cls,), {'scope': 'test', 'rate': rate})()
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def request(self, ip='10.0.0.1', user=None, **headers):
+        request = Request(APIRequestFactory().get('/', REMOTE_ADDR=ip, **headers))
+        request.user = user or AnonymousUser()
+        return request
+
+    def allowed(self, count, **kwargs):
+        return [self.throttle(**kwargs).allow_request(self.request(), None) for _ in range(count)]
+
+    def test_burst_then_refill(self):
+        self.assertEqual(self.allowed(4), [True, True, True, False])
+        throttle = self.throttle()
+        self.assertFalse(throttle.allow_request(self.request(), None))
+        self.assertAlmostEqual(throttle.wait(), 20.0)
+
+        self.now += 20  # one token back (3 per minute)
+        self.assertEqual(self.allowed(2), [True, False])
+        self.now += 600  # never more than a full bucket
+        self.assertEqual(self.allowed(4), [True, True, True, False])
+
+    def test_forwarded_for_is_only_trusted_behind_proxies(self):
+        self.allowed(3)
+        # Made-up X-Forwarded-For values do not get a client a fresh bucket.
+        for n in range(3):
+            self.assertFalse(self.throttle().allow_request(self.request(HTTP_X_FORWARDED_FOR=f'192.0.2.{n}'), None))
+
+        # Behind one proxy the last address it appended is the client's.
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            forwarded = self.request(ip='10.0.0.254', HTTP_X_FORWARDED_FOR='198.51.100.7, 10.0.0.1')
+            self.assertFalse(self.throttle().allow_request(forwarded, None))
+            forwarded = self.request(ip='10.0.0.254', HTTP_X_FORWARDED_FOR='10.0.0.1, 198.51.100.7')
+            self.assertTrue(self.throttle().allow_request(forwarded, None))
+
+    def test_buckets_are_per_ip_and_per_user(self):
+        self.allowed(3)
+        self.assertTrue(self.throttle().allow_request(self.request(ip='10.0.0.2'), None))
+
+        alice = User.objects.create_user('alice')
+        bob = User.objects.create_user('bob')
+        throttle = self.throttle(UserTokenBucketThrottle, rate='1/min')
+        self.assertTrue(throttle.allow_request(self.request(user=alice), None))
+        self.assertFalse(throttle.allow_request(self.request(user=alice), None))
+        self.assertTrue(throttle.allow_request(self.request(user=bob), None))
+
+
+@override_settings(PERF_SAMPLE_RATE=1.0, PERF_SERVER_TIMING=True)
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('organizer', 'organizer@example.com', 'pass'))
+
+    def test_server_timing_and_log_fields(self):
+        with self.assertLogs('perf', 'INFO') as logs:
+            response = self.client.get('/api/meet/')
+        metrics = dict(metric.split(';', 1) for metric in response['Server-Timing'].split(', '))
+        self.assertEqual(set(metrics), {'db', 'serialize', 'total'})
+        self.assertRegex(metrics['db'], r'^dur=[\d.]+;desc="[1-9]\d* queries"$')
+        self.assertIn('method=GET path=/api/meet/ status=200', logs.output[0])
+        self.assertEqual(logs.records[0].perf['status'], 200)
+        self.assertIn('queries', logs.records[0].perf)
+
+    async def test_counts_queries_run_by_async_views(self):
+        user = await User.objects.aget(username='organizer')
+        with meet_routes(async_views=True):
+            response = await AsyncClient().get('/api/meet/', headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    @override_settings(PERF_SLOW_REQUEST_MS=0, PERF_SLOW_QUERY_COUNT=2)
+    def test_slow_requests_are_logged_with_their_slowest_queries(self):
+        with self.assertLogs('perf', 'WARNING') as logs:
+            self.client.get('/api/meet/')
+        lines = logs.records[0].getMessage().splitlines()
+        self.assertTrue(lines[0].startswith('Slow request method=GET'))
+        self.assertIn(len(lines), (2, 3))
+        self.assertIn('SELECT', lines[1])
+
+    @override_settings(PERF_SAMPLE_RATE=0, PERF_SLOW_REQUEST_MS=0, PERF_SLOW_QUERY_COUNT=2)
+    def test_unsampled_slow_requests_still_list_their_queries(self):
+        with self.assertLogs('perf', 'WARNING') as logs:
+            self.client.get('/api/meet/')
+        lines = logs.records[0].getMessage().splitlines()
+        self.assertIn('SELECT', lines[1])
+        self.assertGreater(logs.records[0].perf['queries'], 0)
+        self.assertNotIn('serialize_ms', logs.records[0].perf)
+
+    @override_settings(PERF_SERVER_TIMING=False, DEBUG=False)
+    def test_server_timing_is_only_sent_to_staff(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/meet/'))
+        self.assertNotIn('Server-Timing', APIClient().get('/api/meet/'))
+        self.client.force_authenticate(User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True))
+        self.assertIn('Server-Timing', self.client.get('/api/meet/'))
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_unsampled_requests_only_report_the_total(self):
+        with self.assertNoLogs('perf', 'INFO'):
+            response = self.client.get('/api/meet/')
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+$')
+
+    def test_nested_phases_count_once(self):
+        @timed('serialize')
+        def inner():
+            time.sleep(0.01)
+
+        with collect(RequestTimings(sampled=True, keep_queries=1)) as timings:
+            with timed('serialize'):
+                inner()
+                inner()
+            queue_mail("Subject", "Body", ['a@example.com'])
+        self.assertEqual(set(timings.phases), {'serialize', 'mail'})
+        self.assertLess(timings.phases['serialize'], timings.elapsed())
+        self.assertEqual(timings.queries, 1)
+        self.assertIn('INSERT', timings.top_queries()[0][1])
+
+        with timed('serialize'):
+            pass  # outside a request there is nothing to record
+
+
+class BenchmarkHelperTests(TestCase):
+    def test_reads_query_count_from_server_timing(self):
+        self.assertEqual(server_timing_queries('db;dur=1.2;desc="7 queries", serialize;dur=0.4, total;dur=3.0'), 7)
+        self.assertIsNone(server_timing_queries('total;dur=3.0'))
+        self.assertIsNone(server_timing_queries(None))
+
+    def test_compare_reports_regressions(self):
+        baseline = {'rps': 100.0, 'endpoints': {
+            'meet.list': {'p95_ms': 50.0, 'queries': 3.0},
+            'meet.search': {'p95_ms': 80.0, 'queries': 2.0},
+        }}
+        current = {'rps': 95.0, 'endpoints': {
+            'meet.list': {'p95_ms': 70.0, 'queries': 3.0},
+            'meet.search': {'p95_ms': 85.0, 'queries': 3.0},
+            'auth.login': {'p95_ms': 900.0, 'queries': 1.0},
+        }}
+        regressions = compare(current, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('meet.list p95'))
+        self.assertTrue(regressions[1].startswith('meet.search 3.0 queries'))
+        self.assertEqual(compare(baseline, baseline, tolerance=0), [])
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token-bucket throttle. A rate of 'N/period' (from DEFAULT_THROTTLE_RATES,
+    looked up by `scope`) allows bursts of up to N requests and refills at
+    N per period.
+
+    Each client's bucket is a single (tokens, timestamp) entry in the cache
+    named by THROTTLE_CACHE_ALIAS, so a request costs one cache read and, when
+    allowed, one write. With a shared cache the limit applies across workers;
+    concurrent requests from the same client may occasionally both take the
+    last token, which errs on the side of letting a request through.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        super().__init__()
+
+    def get_rate(self):
+        # Read the rates at request time so they follow settings changes (and override_settings).
+        if not getattr(self, 'scope', None):
+            raise ImproperlyConfigured(f"You must set either `.scope` or `.rate` for '{self.__class__.__name__}' throttle")
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(f"No default throttle rate set for '{self.scope}' scope")
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        capacity = self.num_requests
+        refill_per_second = self.num_requests / self.duration
+
+        state = self.cache.get(self.key)
+        if state is None:
+            tokens = capacity
+        else:
+            tokens, updated = state
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+
+        if tokens < 1:
+            self.retry_after = (1 - tokens) / refill_per_second
+            return False
+
+        # An idle bucket is full again after `duration`, so the entry can expire then.
+        self.cache.set(self.key, (tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return getattr(self, 'retry_after', None)
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """One bucket per client IP address."""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """One bucket per authenticated user, falling back to the client IP for anonymous requests."""
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
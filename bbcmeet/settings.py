@@ -68,19 +68,56 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'account.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Reverse proxies in front of the app. Client IPs for throttling are read from X-Forwarded-For only
+    # behind that many proxies; with 0 the header is ignored, as clients could otherwise set it themselves.
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=0),
+    # Token-bucket limits (burst/period) used by base.throttling subclasses
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '20/min',
+        'login_user': '5/min',
+        'register_ip': '10/hour',
+        'otp_user': '10/min',
+        'otp_ip': '30/min',
+    },
 }
 
+# Cache holding throttle buckets; must be shared between workers for limits to be global
+THROTTLE_CACHE_ALIAS = 'default'
+
+# Default number of meetings per page on GET /api/meet/ (clients may ask for up to 200)
+MEET_PAGE_SIZE = 50
+
+# Largest batch accepted by POST /api/meet/bulk-create/
+MEET_BULK_CREATE_MAX_ITEMS = 500
+
+# Largest batch accepted by POST /api/meet/bulk-transition/
+MEET_BULK_TRANSITION_MAX_ITEMS = 500
+
+# Rows fetched per query by GET /api/meet/export/; bounds the export's memory use
+MEET_EXPORT_CHUNK_SIZE = 2000
+
+# Longest window accepted by GET /api/meet/calendar/
+MEET_CALENDAR_MAX_DAYS = 92
+
+# Longest meeting the API accepts; also bounds the start_time range scanned by calendar and conflict queries
+MEET_MAX_DURATION_MINUTES = 24 * 60
+
+# Serve meeting reads and status changes from the async views in meet.async_views.
+# Turn on when running under ASGI (uvicorn/daphne); under WSGI they only add overhead.
+MEET_ASYNC_VIEWS = env.bool('MEET_ASYNC_VIEWS', default=False)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=14),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=14),
 }
 
 MIDDLEWARE = [
+    'base.middleware.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -141,6 +178,30 @@ else:
 }
 
 
+# Cache
+# Defaults to per-process memory. Point CACHE_URL at a shared backend (e.g. redis://, memcache://)
+# when running several workers so that invalidation reaches every process.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    # Only used with OTP_STORE = 'meet.otp.CacheOTPStore'; needs a shared backend with an atomic
+    # incr (redis, memcached) so the attempt limit holds across workers.
+    'otp': env.cache('OTP_CACHE_URL', default='locmemcache://otp'),
+}
+
+# Staff notification recipients are cached and refreshed by signals in account.signals
+STAFF_EMAILS_CACHE_TIMEOUT = 600
+
+# Users behind JWT access tokens are cached by account.authentication.CachedJWTAuthentication
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Meeting completion OTPs (see meet.otp). Codes are stored hashed and expire.
+OTP_STORE = env.str('OTP_STORE', default='meet.otp.DatabaseOTPStore')
+OTP_CACHE_ALIAS = 'otp'
+OTP_TTL_SECONDS = 900
+OTP_MAX_ATTEMPTS = 5
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -184,6 +245,38 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/' #url
 MEDIA_ROOT = BASE_DIR / 'media' # for production
 
+# Resized copies of each meeting photo, built by `manage.py process_photos`
+PHOTO_RENDITIONS = {
+    'thumbnail': (320, 320),
+    'medium': (1280, 1280),
+}
+PHOTO_RENDITION_FORMAT = 'WEBP' # falls back to JPEG if Pillow lacks WebP support
+PHOTO_RENDITION_QUALITY = 80
+
+# Hash uploads while they stream in, so duplicate photos are stored once (see meet.models.PhotoBlob)
+FILE_UPLOAD_HANDLERS = [
+    'meet.uploads.HashingMemoryFileUploadHandler',
+    'meet.uploads.HashingTemporaryFileUploadHandler',
+]
+
+# Request timings (base.middleware.PerformanceMiddleware): the share of requests broken down into
+# database and serializer time, and the duration above which a request is logged with its slowest queries
+PERF_SAMPLE_RATE = env.float('PERF_SAMPLE_RATE', default=0.01)
+PERF_SLOW_REQUEST_MS = env.int('PERF_SLOW_REQUEST_MS', default=500)
+PERF_SLOW_QUERY_COUNT = 5
+# Send the Server-Timing header to every client; otherwise only staff users (and everyone when DEBUG) get it
+PERF_SERVER_TIMING = env.bool('PERF_SERVER_TIMING', default=False)
+
+# Resumable uploads (POST /api/meet/{uid}/upload-sessions/) keep their partial files here until committed.
+# Share it between app servers so a client can resume on any of them; keep it outside MEDIA_ROOT.
+PHOTO_UPLOAD_SESSION_DIR = env('PHOTO_UPLOAD_SESSION_DIR', default=str(BASE_DIR / 'upload_sessions'))
+PHOTO_UPLOAD_SESSION_HOURS = 24 # unfinished sessions are removed by `manage.py gc_photo_blobs` after this
+PHOTO_UPLOAD_MAX_SIZE = 50 * 1024 * 1024 # bytes
+
+# POST /api/meet/{uid}/upload-photo/ takes up to this many files, validated and stored by PHOTO_UPLOAD_WORKERS threads per process
+MEET_PHOTO_UPLOAD_MAX_FILES = 50
+PHOTO_UPLOAD_WORKERS = 4
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
@@ -192,6 +285,14 @@ EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
 EMAIL_USE_TLS = True
 EMAIL_USE_SSL = False
 
+# Outgoing email is queued in base.OutboxEmail and delivered by `manage.py process_outbox`
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BACKOFF_SECONDS = 30 # doubles on every failed attempt, capped at an hour
+OUTBOX_LEASE_SECONDS = 300 # how long a worker may hold a claimed email before another may retry it
+
+
+# logs/ is not in version control; the file handler below needs it to exist
+(BASE_DIR / 'logs').mkdir(exist_ok=True)
 
 LOGGING = {
     'version': 1,
@@ -229,6 +330,12 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        # One line per sampled request from base.middleware.PerformanceMiddleware
+        'perf': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
         'events': {
             'handlers': ['file', 'console'],
             'level': 'DEBUG',
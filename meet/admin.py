@@ -1,9 +1,13 @@
 from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db.models import Q
 from .models import Meeting, MeetingPhoto
+from .search import matching, search_terms
 
 class MeetingPhotoInline(admin.TabularInline):
     model = MeetingPhoto
     extra = 1
+    readonly_fields = ('blob',)
 
 @admin.register(Meeting)
 class MeetingAdmin(admin.ModelAdmin):
@@ -12,6 +16,21 @@ class MeetingAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description', 'location', 'created_by__username', 'created_by__email')
     ordering = ('-start_time',)
     inlines = [MeetingPhotoInline]
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Title, description and location go through the full-text index (see
+        meet.search) instead of `icontains` scans; a creator is found by exact
+        username or email.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        condition = Q(created_by__in=User.objects.filter(Q(username__iexact=search_term) | Q(email__iexact=search_term)))
+        terms = search_terms(search_term)
+        if terms:
+            condition |= matching(terms, queryset.db)
+        return queryset.filter(condition), False
     
     fieldsets = (
         ('Basic Information', {
@@ -21,7 +40,7 @@ class MeetingAdmin(admin.ModelAdmin):
             'fields': ('location', 'start_time', 'duration_minutes', 'recipient_emails')
         }),
         ('Status & Verification', {
-            'fields': ('status', 'otp_code', 'is_otp_verified')
+            'fields': ('status', 'overrun_at', 'is_otp_verified')
         }),
     )
 
@@ -30,3 +49,4 @@ class MeetingPhotoAdmin(admin.ModelAdmin):
     list_display = ('meeting', 'uploaded_by', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('meeting__title', 'uploaded_by__username')
+    readonly_fields = ('blob',)
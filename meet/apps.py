@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class MeetConfig(AppConfig):
     name = 'meet'
+
+    def ready(self):
+        from meet import signals  # noqa: F401
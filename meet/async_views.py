@@ -0,0 +1,215 @@
+"""
+Async variants of the MeetingViewSet read paths and status actions.
+
+DRF views are synchronous, so under ASGI every request to MeetingViewSet is
+handed to a worker thread. These views run on the event loop instead: reads go
+through the async ORM, and the status changes, whose transaction and outbox
+email need a synchronous connection, are awaited through sync_to_async. The
+JSON bodies match the MeetingViewSet responses.
+
+Routed ahead of the viewset when MEET_ASYNC_VIEWS is on (see meet.urls); any
+other method on the same URLs is handed to MeetingViewSet.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max, aprefetch_related_objects
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from account.authentication import CachedJWTAuthentication
+from base.views import logger
+from meet.conditional import meeting_validators, not_modified_response, set_validators
+from meet.models import Meeting, MeetingPhoto
+from meet.otp import OTPAttemptsExceeded
+from meet.pagination import MeetingCursorPagination
+from meet.serializers import MeetingFieldsSerializer, MeetingFilterSerializer, MeetingSerializer, MeetingValuesSerializer
+from meet.throttling import OTPIPThrottle, OTPUserThrottle
+from meet.views import MeetingViewSet
+
+authenticator = CachedJWTAuthentication()
+renderer = JSONRenderer()
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(renderer.render(data), content_type=renderer.media_type, status=status_code)
+
+
+def error_response(request, exc):
+    """Render an APIException the way APIView.handle_exception would."""
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        exc.auth_header = authenticator.authenticate_header(request)
+    handled = exception_handler(exc, {})
+    response = json_response(handled.data, handled.status_code)
+    for header, value in handled.headers.items():
+        if header.lower() != 'content-type':
+            response[header] = value
+    return response
+
+
+def check_throttles(request, throttle_classes):
+    durations = [throttle.wait() for throttle in (cls() for cls in throttle_classes)
+                 if not throttle.allow_request(request, None)]
+    if durations:
+        raise exceptions.Throttled(wait=max((d for d in durations if d is not None), default=None))
+
+
+def async_endpoint(methods, fallback):
+    """
+    Authenticate the request and require a user, like IsAuthenticated does for
+    the viewset. Methods outside `methods` are passed to the sync `fallback`.
+    """
+    fallback = sync_to_async(fallback)
+
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, **kwargs):
+            if request.method not in methods:
+                return await fallback(request, **kwargs)
+            try:
+                result = await authenticator.aauthenticate(request)
+                if result is None:
+                    raise exceptions.NotAuthenticated()
+                request.user = result[0]
+                return await view(request, **kwargs)
+            except exceptions.APIException as exc:
+                return error_response(request, exc)
+        return wrapper
+    return decorator
+
+
+@async_endpoint(('GET',), MeetingViewSet.as_view({'get': 'list', 'post': 'create'}))
+async def meeting_list(request):
+    """
+    List meetings, newest first, one page at a time
+    Endpoint: GET /api/meet/
+    Same query params and response as MeetingViewSet.list.
+    """
+    filters = MeetingFilterSerializer(data=request.GET)
+    shape = MeetingFieldsSerializer(data=request.GET)
+    if not (filters.is_valid() & shape.is_valid()):
+        return json_response({**filters.errors, **shape.errors}, status.HTTP_400_BAD_REQUEST)
+    fast = MeetingValuesSerializer(**shape.serializer_kwargs())
+    meetings = filters.filter_queryset(Meeting.objects.values(*fast.columns))
+    paginator = MeetingCursorPagination()
+    page = await paginator.apaginate_queryset(meetings, Request(request))
+
+    photos = await MeetingPhoto.objects.filter(meeting__in=[m['id'] for m in page]).aaggregate(
+        latest=Max('updated_at'), total=Count('id'),
+    ) if page and shape.expands('photos') else {'latest': None, 'total': 0}
+    etag, last_modified = meeting_validators(request, page, photos['latest'], photos['total'], extra=paginator.has_next,
+                                             include_creator=shape.expands('created_by'))
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    results = await sync_to_async(fast.to_representation)(page)
+    return set_validators(json_response(paginator.get_paginated_response(results).data), etag, last_modified)
+
+
+@async_endpoint(('GET',), MeetingViewSet.as_view({'get': 'retrieve', 'put': 'update', 'delete': 'destroy'}))
+async def meeting_detail(request, uid):
+    """
+    Retrieve a meeting
+    Endpoint: GET /api/meet/{uid}/
+    """
+    shape = MeetingFieldsSerializer(data=request.GET)
+    if not shape.is_valid():
+        return json_response(shape.errors, status.HTTP_400_BAD_REQUEST)
+    meetings = shape.prepare_queryset(Meeting.objects.all())
+    if shape.expands('photos'):
+        meetings = meetings.with_photo_stats()
+    try:
+        meeting = await meetings.aget(uid=uid)
+    except Meeting.DoesNotExist:
+        return json_response({"error": "Meeting not found"}, status.HTTP_404_NOT_FOUND)
+    etag, last_modified = meeting_validators(request, [meeting], getattr(meeting, 'photos_updated_at', None),
+                                             getattr(meeting, 'photo_count', 0), include_creator=shape.expands('created_by'))
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    if shape.expands('photos'):
+        await aprefetch_related_objects([meeting], 'photos')
+    serializer = MeetingSerializer(meeting, **shape.serializer_kwargs())
+    return set_validators(json_response(serializer.data), etag, last_modified)
+
+
+@async_endpoint(('POST',), MeetingViewSet.as_view({'post': 'mark_in_progress'}))
+async def mark_in_progress(request, uid):
+    """
+    Mark a meeting as in progress
+    Endpoint: POST /api/meet/{uid}/mark-in-progress/
+    """
+    try:
+        meeting = await Meeting.objects.with_relations().aget(uid=uid)
+        if not await sync_to_async(meeting.status_update_in_progress)():
+            return json_response({'status': False, 'error': f"Cannot change status from {meeting.status} to in_progress"}, status.HTTP_400_BAD_REQUEST)
+        serializer = MeetingSerializer(meeting)
+        return json_response({'status': True, 'data': serializer.data})
+    except Meeting.DoesNotExist:
+        return json_response({'status': False, 'error': 'Meeting not found'}, status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.error(f"Error marking meeting in progress: {e}")
+        return json_response({'status': False, 'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+
+
+@async_endpoint(('POST',), MeetingViewSet.as_view({'post': 'mark_completed'}))
+async def mark_completed(request, uid):
+    """
+    Mark a meeting as completed
+    Endpoint: POST /api/meet/{uid}/mark-completed/
+    Body: {"otp_code": "OTP Code"} (optional — omit to trigger OTP email)
+    """
+    drf_request = Request(request, parsers=[JSONParser(), FormParser(), MultiPartParser()])
+    drf_request.user = request.user
+    await sync_to_async(check_throttles)(drf_request, (OTPUserThrottle, OTPIPThrottle))
+    try:
+        meeting = await Meeting.objects.with_relations().aget(uid=uid)
+        otp_code = drf_request.data.get('otp_code')
+
+        if otp_code:
+            try:
+                verified = await sync_to_async(meeting.verify_otp)(otp_code)
+            except OTPAttemptsExceeded:
+                return json_response({'status': False, 'error': 'Too many invalid OTP attempts. Request a new OTP.'}, status.HTTP_429_TOO_MANY_REQUESTS)
+            if not verified:
+                return json_response({'status': False, 'error': 'Invalid OTP'}, status.HTTP_400_BAD_REQUEST)
+            if not await sync_to_async(meeting.status_update_completed)():
+                return json_response({'status': False, 'error': f"Cannot change status from {meeting.status} to completed"}, status.HTTP_400_BAD_REQUEST)
+            serializer = MeetingSerializer(meeting)
+            return json_response({'status': True, 'data': serializer.data})
+
+        await sync_to_async(meeting.generate_otp)()
+        logger.info(f"OTP sent to recipients: {meeting.recipient_emails}")
+        return json_response({'status': True, 'message': 'Meeting OTP sent to the recipient.'})
+    except Meeting.DoesNotExist:
+        return json_response({'status': False, 'error': 'Meeting not found'}, status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.error(f"Error marking meeting completed: {e}")
+        return json_response({'status': False, 'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+
+
+@async_endpoint(('POST',), MeetingViewSet.as_view({'post': 'mark_cancelled'}))
+async def mark_cancelled(request, uid):
+    """
+    Mark a meeting as cancelled
+    Endpoint: POST /api/meet/{uid}/mark-cancelled/
+    """
+    try:
+        meeting = await Meeting.objects.with_relations().aget(uid=uid)
+        if not await sync_to_async(meeting.status_update_cancelled)(request.user):
+            return json_response({'status': False, 'error': f"Cannot change status from {meeting.status} to cancelled"}, status.HTTP_400_BAD_REQUEST)
+        serializer = MeetingSerializer(meeting)
+        return json_response({'status': True, 'data': serializer.data})
+    except Meeting.DoesNotExist:
+        return json_response({'status': False, 'error': 'Meeting not found'}, status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.error(f"Error cancelling meeting: {e}")
+        return json_response({'status': False, 'error': str(e)}, status.HTTP_400_BAD_REQUEST)
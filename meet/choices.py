@@ -15,4 +15,15 @@ VALID_STATUS_CHANGE = {
 MEETING_TYPE_CHOICES = [
     ('in_person', 'In Person'),
     ('online', 'Online'),
-]
\ No newline at end of file
+]
+UPLOAD_SESSION_STATUS_CHOICES = [
+    ('open', 'Open'),
+    ('committed', 'Committed'),
+]
+
+PHOTO_PROCESSING_CHOICES = [
+    ('pending', 'Pending'),
+    ('processing', 'Processing'),
+    ('ready', 'Ready'),
+    ('failed', 'Failed'),
+]
@@ -0,0 +1,63 @@
+"""
+ETag / Last-Modified support for the meeting read endpoints.
+
+Validators are computed from timestamps and ids that the view loads anyway, so
+a client whose copy is current gets a 304 before any serializer runs.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def meeting_validators(request, meetings, photos_updated_at=None, photo_count=0, extra='', include_creator=True):
+    """
+    Return (etag, last_modified) for a response built from `meetings`.
+
+    `photos_updated_at` and `photo_count` describe the photos of those meetings;
+    the count catches deletions that leave the newest timestamp unchanged. The
+    creator's fields are hashed too when `include_creator` says they are
+    embedded in the response.
+    """
+    digest = hashlib.sha256(request.get_full_path().encode())
+    last_modified = photos_updated_at
+    for meeting in meetings:
+        values = _state(meeting, include_creator)
+        digest.update(('|' + ':'.join(str(value) for value in values)).encode())
+        if last_modified is None or values[1] > last_modified:
+            last_modified = values[1]
+    digest.update(f"|{photos_updated_at.isoformat() if photos_updated_at else ''}:{photo_count or 0}|{extra}".encode())
+
+    etag = quote_etag(digest.hexdigest()[:32])
+    return etag, int(last_modified.timestamp()) if last_modified else None
+
+
+CREATOR_FIELDS = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'is_superuser')
+
+
+def _state(meeting, include_creator):
+    """The values a meeting's representation depends on, from an instance or a `.values()` row."""
+    if isinstance(meeting, dict):
+        values = [meeting['id'], meeting['updated_at'], meeting['status'], meeting['created_by']]
+        if include_creator:
+            values += [meeting[f'created_by__{name}'] for name in CREATOR_FIELDS]
+    else:
+        values = [meeting.pk, meeting.updated_at, meeting.status, meeting.created_by_id]
+        if include_creator:
+            values += [getattr(meeting.created_by, name) for name in CREATOR_FIELDS]
+    return values
+
+
+def not_modified_response(request, etag, last_modified):
+    """A 304 response if the client's If-None-Match / If-Modified-Since still match, else None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,172 @@
+"""
+Streaming CSV / NDJSON export of meetings.
+
+Rows are read in keyset-ordered chunks of MEET_EXPORT_CHUNK_SIZE, one short
+query per chunk, and written out as soon as each chunk arrives. Memory use is
+bounded by the chunk size whatever the number of rows, and no query or cursor
+stays open while the client is reading.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from meet.pagination import MeetingCursorPagination
+
+COLUMNS = (
+    'uid', 'title', 'description', 'location', 'meeting_type', 'status', 'start_time',
+    'duration_minutes', 'end_time', 'overrun_at', 'is_otp_verified', 'created_by', 'created_by_email', 'recipient_emails',
+    'created_at', 'updated_at',
+)
+
+VALUES = (
+    'id', 'uid', 'title', 'description', 'location', 'meeting_type', 'status', 'start_time',
+    'duration_minutes', 'end_time', 'overrun_at', 'is_otp_verified', 'created_by__username', 'created_by__email',
+    'recipient_emails', 'created_at', 'updated_at',
+)
+
+_datetime = serializers.DateTimeField()
+
+
+def export_row(values):
+    """Turn a `.values(*VALUES)` row into an export row, formatted like the API."""
+    return {
+        'uid': str(values['uid']),
+        'title': values['title'],
+        'description': values['description'],
+        'location': values['location'],
+        'meeting_type': values['meeting_type'],
+        'status': values['status'],
+        'start_time': _datetime.to_representation(values['start_time']),
+        'duration_minutes': values['duration_minutes'],
+        'end_time': _datetime.to_representation(values['end_time']),
+        'overrun_at': values['overrun_at'] and _datetime.to_representation(values['overrun_at']),
+        'is_otp_verified': values['is_otp_verified'],
+        'created_by': values['created_by__username'],
+        'created_by_email': values['created_by__email'],
+        'recipient_emails': values['recipient_emails'],
+        'created_at': _datetime.to_representation(values['created_at']),
+        'updated_at': _datetime.to_representation(values['updated_at']),
+    }
+
+
+def _chunk(queryset, position, size):
+    if position is not None:
+        queryset = MeetingCursorPagination.after(queryset, *position)
+    return queryset[:size]
+
+
+def export_batches(queryset):
+    """Yield lists of export rows for `queryset`, newest first, one query per list."""
+    size = settings.MEET_EXPORT_CHUNK_SIZE
+    queryset = queryset.order_by(*MeetingCursorPagination.ordering).values(*VALUES)
+    position = None
+    while True:
+        batch = list(_chunk(queryset, position, size))
+        yield [export_row(values) for values in batch]
+        if len(batch) < size:
+            return
+        position = (batch[-1]['start_time'], batch[-1]['id'])
+
+
+async def aexport_batches(queryset):
+    """Async counterpart of export_batches, so ASGI servers can stream without buffering."""
+    size = settings.MEET_EXPORT_CHUNK_SIZE
+    queryset = queryset.order_by(*MeetingCursorPagination.ordering).values(*VALUES)
+    position = None
+    while True:
+        batch = [values async for values in _chunk(queryset, position, size)]
+        yield [export_row(values) for values in batch]
+        if len(batch) < size:
+            return
+        position = (batch[-1]['start_time'], batch[-1]['id'])
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Base for the export formats. Only lists of rows are rendered in the
+    format; anything else (authentication, throttling and validation errors)
+    goes out as JSON, since it is not rows and clients need to read it.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if not isinstance(data, list) or (response is not None and response.status_code >= 400):
+            if response is not None:
+                response['Content-Type'] = JSONRenderer.media_type
+            return JSONRenderer().render(data, JSONRenderer.media_type, renderer_context)
+        return ''.join([self.header()] + [self.render_row(row) for row in data]).encode(self.charset)
+
+
+class MeetingCSVRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+    # Spreadsheet apps run cells starting with these as formulas.
+    formula_prefixes = ('=', '+', '-', '@', '\t', '\r')
+
+    def __init__(self):
+        self.writer = csv.writer(_Echo())
+
+    def header(self):
+        return self.writer.writerow(COLUMNS)
+
+    def render_row(self, row):
+        row = dict(row, recipient_emails=';'.join(row['recipient_emails']))
+        return self.writer.writerow([self.escape(row[column]) for column in COLUMNS])
+
+    def escape(self, value):
+        if isinstance(value, str) and value.startswith(self.formula_prefixes):
+            return "'" + value
+        return value
+
+
+class MeetingNDJSONRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def header(self):
+        return ''
+
+    def render_row(self, row):
+        return json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+def _stream(renderer, batches):
+    yield renderer.header()
+    for batch in batches:
+        yield ''.join(renderer.render_row(row) for row in batch)
+
+
+async def _astream(renderer, batches):
+    yield renderer.header()
+    async for batch in batches:
+        yield ''.join(renderer.render_row(row) for row in batch)
+
+
+def export_response(request, queryset, renderer):
+    """
+    A StreamingHttpResponse of `queryset` in the renderer's format. Under ASGI
+    the rows are produced by an async generator; Django would otherwise read a
+    sync iterator to the end before sending anything.
+    """
+    if isinstance(request, ASGIRequest):
+        content = _astream(renderer, aexport_batches(queryset))
+    else:
+        content = _stream(renderer, export_batches(queryset))
+    response = StreamingHttpResponse(content, content_type=f'{renderer.media_type}; charset={renderer.charset}')
+    response['Content-Disposition'] = f'attachment; filename="meetings.{renderer.format}"'
+    return response
@@ -0,0 +1,81 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+
+# Extensions for formats whose Pillow name is not one; others use the lower-cased format name.
+FORMAT_EXTENSIONS = {'JPEG': '.jpg', 'MPO': '.jpg', 'TIFF': '.tif'}
+
+
+def image_extension(file):
+    """
+    The extension for the image format Pillow detects in `file`, or '' when it
+    is not an image Pillow can read. Uploads are stored under this rather than
+    the client's filename, so a file can only be served as what it really is.
+    """
+    try:
+        with Image.open(file) as image:
+            fmt = image.format
+    except OSError:
+        return ''
+    finally:
+        file.seek(0)
+    return FORMAT_EXTENSIONS.get(fmt, f'.{fmt.lower()}')
+
+
+def rendition_format():
+    """The configured rendition format, falling back to JPEG when Pillow was built without WebP."""
+    fmt = settings.PHOTO_RENDITION_FORMAT.upper()
+    if fmt == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return fmt
+
+
+def _prepare(image, fmt):
+    # JPEG has no alpha channel; flatten transparent images onto white.
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    if fmt == 'JPEG':
+        if has_alpha:
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            return background
+        return image.convert('RGB')
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def render(image, max_size, fmt):
+    """Encode a copy of `image` that fits inside `max_size`. EXIF and other metadata are not carried over."""
+    copy = _prepare(image, fmt)
+    copy.thumbnail(max_size, Image.LANCZOS)
+    buffer = io.BytesIO()
+    copy.save(buffer, format=fmt, quality=settings.PHOTO_RENDITION_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def build_renditions(photo):
+    """
+    Read a MeetingPhoto's original and write its renditions to storage.
+
+    Does no database work, so it is safe to call from a worker thread. Returns
+    the field values the caller should store on the photo.
+    """
+    fmt = rendition_format()
+    extension = 'jpg' if fmt == 'JPEG' else fmt.lower()
+    storage = photo.file.storage
+
+    with photo.file.open('rb') as original:
+        file_size = original.size
+        with Image.open(original) as image:
+            # Apply the EXIF orientation tag to the pixels, so renditions display upright without it.
+            image = ImageOps.exif_transpose(image)
+            values = {'width': image.width, 'height': image.height, 'file_size': file_size}
+            for name, max_size in settings.PHOTO_RENDITIONS.items():
+                data = render(image, max_size, fmt)
+                path = os.path.join(photo._meta.get_field(name).upload_to, f"{photo.uid}_{name}.{extension}")
+                values[name] = storage.save(path, ContentFile(data))
+                values[f'{name}_size'] = len(data)
+    return values
@@ -0,0 +1,130 @@
+import asyncio
+import contextlib
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from base.benchmark import benchmark_database, summarize
+from meet.models import Meeting, MeetingPhoto
+
+
+@contextlib.contextmanager
+def meet_routes(async_views):
+    """Rebuild the URLconf with MEET_ASYNC_VIEWS set to `async_views`."""
+    def reload():
+        import meet.urls
+        importlib.reload(meet.urls)
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    try:
+        with override_settings(MEET_ASYNC_VIEWS=async_views):
+            reload()
+            yield
+    finally:
+        reload()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency of the meeting read endpoints served through the WSGI "
+        "handler, the ASGI handler with MeetingViewSet, and the ASGI handler with meet.async_views. "
+        "Requests go through Django's in-process test clients, so the numbers exclude the web server "
+        "itself; use them to compare the three set-ups, not as absolute capacity."
+    )
+
+    modes = ('wsgi', 'asgi', 'asgi+async_views')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meetings', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per mode.")
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the benchmark database between runs.")
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options['keepdb']):
+            paths, headers = self.seed(options['meetings'])
+            self.stdout.write(f"meetings={options['meetings']} requests={options['requests']} concurrency={options['concurrency']}")
+            for mode in self.modes:
+                with meet_routes(async_views=mode == 'asgi+async_views'):
+                    run = self.run_wsgi if mode == 'wsgi' else self.run_asgi
+                    began = time.perf_counter()
+                    results = run(paths, headers, options['requests'], options['concurrency'])
+                    elapsed = time.perf_counter() - began
+                self.report(mode, results, elapsed)
+
+    def seed(self, total):
+        user = User.objects.create_user('bench-organizer', 'organizer@example.com')
+        start = timezone.now() + timedelta(days=1)
+        meetings = Meeting.objects.bulk_create([
+            Meeting(title=f'Bench {i}', location='Office', start_time=start + timedelta(minutes=i),
+                    duration_minutes=30, created_by=user, recipient_emails=['guest@example.com'])
+            for i in range(total)
+        ])
+        MeetingPhoto.objects.bulk_create([
+            MeetingPhoto(meeting=meeting, file='meeting_photos/photo.jpg', uploaded_by=user)
+            for meeting in meetings
+        ])
+        # Alternate between a list page and single meetings.
+        paths = []
+        for meeting in meetings[:50]:
+            paths += ['/api/meet/?page_size=20', f'/api/meet/{meeting.uid}/']
+        return paths, {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    @staticmethod
+    def shares(total, workers):
+        return [total // workers + (1 if i < total % workers else 0) for i in range(workers)]
+
+    def run_wsgi(self, paths, headers, total, concurrency):
+        def worker(offset, count):
+            client = Client()
+            results = []
+            try:
+                for i in range(offset, offset + count):
+                    began = time.perf_counter()
+                    response = client.get(paths[i % len(paths)], headers=headers)
+                    results.append((time.perf_counter() - began, response.status_code))
+            finally:
+                connection.close()
+            return results
+
+        shares = self.shares(total, concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(worker, sum(shares[:i]), count) for i, count in enumerate(shares)]
+            return [result for future in futures for result in future.result()]
+
+    def run_asgi(self, paths, headers, total, concurrency):
+        async def worker(offset, count):
+            client = AsyncClient()
+            results = []
+            for i in range(offset, offset + count):
+                began = time.perf_counter()
+                response = await client.get(paths[i % len(paths)], headers=headers)
+                results.append((time.perf_counter() - began, response.status_code))
+            return results
+
+        async def main():
+            shares = self.shares(total, concurrency)
+            batches = await asyncio.gather(*(worker(sum(shares[:i]), count) for i, count in enumerate(shares)))
+            return [result for batch in batches for result in batch]
+
+        return asyncio.run(main())
+
+    def report(self, mode, results, elapsed):
+        stats = summarize([latency for latency, _ in results])
+        failed = sum(1 for _, code in results if code != 200)
+        self.stdout.write(
+            f"{mode:<17} {stats['count'] / elapsed:8.0f} req/s  p50={stats['p50_ms']:.2f}ms "
+            f"p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms"
+            + (f"  non-200={failed}" if failed else "")
+        )
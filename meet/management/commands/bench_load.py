@@ -0,0 +1,249 @@
+import contextlib
+import http.client
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer
+from django.db.models import Max, Min
+from django.test import override_settings
+from django.test.testcases import LiveServerThread
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from base.benchmark import benchmark_database, compare, server_timing_queries, summarize
+from meet.management.commands.seed_data import KINDS, TOPICS
+from meet.models import Meeting
+
+# Relative share of the requests each endpoint gets.
+ENDPOINTS = {
+    'meet.list': 3,
+    'meet.retrieve': 3,
+    'meet.calendar': 1,
+    'meet.search': 1,
+    'meet.create': 1,
+    'auth.login': 1,
+    'auth.profile': 1,
+}
+
+
+class LoadTestServer(ThreadedWSGIServer):
+    # The default backlog of 10 refuses connections well below typical --concurrency values.
+    request_queue_size = 128
+
+
+class LoadTestServerThread(LiveServerThread):
+    server_class = LoadTestServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the meet and auth endpoints over HTTP through a local threaded server at a given concurrency, "
+        "and report requests/sec, p50/p95/p99 latency and queries per request (read from the Server-Timing "
+        "header). By default a throwaway database is filled with `seed_data` first; --existing runs against "
+        "the configured database instead, which must already hold `seed_data` users. --save-baseline keeps "
+        "the results in a JSON file and --baseline fails the run if it regressed against one. The server is "
+        "Django's development server, so compare runs on the same machine rather than reading the numbers "
+        "as production capacity."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--warmup', type=int, default=100, help="Requests sent first and left out of the results.")
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help="Comma-separated subset of: " + ', '.join(ENDPOINTS))
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--meetings', type=int, default=10_000)
+        parser.add_argument('--photos-per-meeting', type=float, default=1.0)
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the benchmark database between runs (seeds only once).")
+        parser.add_argument('--existing', action='store_true', help="Use the configured database as it is.")
+        parser.add_argument('--prefix', default='seed', help="Username prefix given to `seed_data`.")
+        parser.add_argument('--password', default='seed-password', help="Password given to `seed_data`.")
+        parser.add_argument('--baseline', help="JSON file from --save-baseline to compare against.")
+        parser.add_argument('--save-baseline', help="Write the results to this JSON file.")
+        parser.add_argument('--tolerance', type=float, default=20.0, help="Percent change allowed against the baseline.")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        if options['existing']:
+            database = contextlib.nullcontext()
+        else:
+            database = benchmark_database(keepdb=options['keepdb'], sqlite_file=os.path.join(tempfile.gettempdir(), 'bench_load'))
+        with database:
+            if not options['existing'] and not User.objects.filter(username__startswith=f"{options['prefix']}-").exists():
+                call_command('seed_data', users=options['users'], meetings=options['meetings'], prefix=options['prefix'],
+                             photos_per_meeting=options['photos_per_meeting'], password=options['password'],
+                             seed=options['seed'], stdout=self.stdout)
+            plan = self.plan(endpoints, options['warmup'] + options['requests'], options)
+            with self.server() as (host, port):
+                self.run(host, port, plan[:options['warmup']], options['concurrency'])
+                began = time.perf_counter()
+                results = self.run(host, port, plan[options['warmup']:], options['concurrency'])
+                elapsed = time.perf_counter() - began
+            # Undo the meetings created by the run, so --existing and --keepdb runs start from the same data.
+            Meeting.objects.filter(start_time__gte=self.created_after, title__startswith='Load test ').delete()
+
+        report = self.summarize(results, elapsed, options)
+        self.report(report)
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+        if baseline is not None:
+            regressions = compare(report, baseline, options['tolerance'] / 100)
+            for regression in regressions:
+                self.stderr.write(self.style.ERROR(f"Regression: {regression}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS(f"Within {options['tolerance']:.0f}% of {options['baseline']}."))
+
+    def plan(self, endpoints, total, options):
+        """The (endpoint, method, path, body, headers) of every request to send, in order."""
+        pick = random.Random(options['seed'])
+        users = list(User.objects.filter(username__startswith=f"{options['prefix']}-").order_by('id')[:20])
+        if not users:
+            raise CommandError(f"No users named {options['prefix']}-<n>; run `seed_data` first.")
+        tokens = [{'Authorization': f'Bearer {AccessToken.for_user(user)}'} for user in users]
+        # Random ids rather than ORDER BY RANDOM(), which sorts the whole table.
+        bounds = Meeting.objects.aggregate(low=Min('id'), high=Max('id'))
+        ids = [pick.randint(bounds['low'], bounds['high']) for _ in range(500)] if bounds['low'] is not None else []
+        uids = list(Meeting.objects.filter(id__in=ids).values_list('uid', flat=True))
+        now = timezone.now()
+        self.created_after = now + timedelta(days=3650)
+        weighted = [name for name in endpoints for _ in range(ENDPOINTS[name])]
+
+        requests = []
+        for i in range(total):
+            name = weighted[i % len(weighted)]
+            headers = pick.choice(tokens)
+            body = None
+            if name == 'meet.list':
+                path = '/api/meet/?' + urlencode({'page_size': 20, **pick.choice([{}, {'status': 'scheduled'}])})
+            elif name == 'meet.retrieve':
+                path = f'/api/meet/{pick.choice(uids)}/' if uids else '/api/meet/'
+            elif name == 'meet.calendar':
+                start = now + timedelta(days=pick.randrange(-30, 30))
+                path = '/api/meet/calendar/?' + urlencode({'from': start.isoformat(), 'to': (start + timedelta(days=1)).isoformat()})
+            elif name == 'meet.search':
+                path = '/api/meet/search/?' + urlencode({'q': f'{pick.choice(TOPICS)} {pick.choice(KINDS)}', 'page_size': 20})
+            elif name == 'meet.create':
+                path = '/api/meet/'
+                # Far enough ahead, and apart, not to clash with seeded or earlier meetings.
+                body = {'title': f'Load test {i}', 'description': 'Synthetic load', 'location': 'Room 101', 'meeting_type': 'in_person',
+                        'start_time': (self.created_after + timedelta(hours=i)).isoformat(), 'duration_minutes': 30,
+                        'recipient_emails': ['guest@example.com']}
+            elif name == 'auth.login':
+                path, headers = '/api/auth/login/', {}
+                body = {'username': pick.choice(users).username, 'password': options['password']}
+            else:
+                path = '/api/auth/profile/'
+            if body is not None:
+                method, body, headers = 'POST', json.dumps(body), {**headers, 'Content-Type': 'application/json'}
+            else:
+                method = 'GET'
+            requests.append((name, method, path, body, headers))
+        return requests
+
+    @contextlib.contextmanager
+    def server(self):
+        host = '127.0.0.1'
+        limits = {scope: '1000000/s' for scope in settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})}
+        overrides = override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, host],
+            DEBUG=False,
+            # Login would otherwise be throttled after a few requests.
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': limits},
+            PERF_SAMPLE_RATE=1.0,
+            PERF_SERVER_TIMING=True,
+        )
+        # The per-request `perf` log lines would drown the report; the same figures come back in Server-Timing.
+        perf_logger = logging.getLogger('perf')
+        level = perf_logger.level
+        with overrides:
+            perf_logger.setLevel(logging.ERROR)
+            thread = LoadTestServerThread(host, lambda application: application)
+            thread.daemon = True
+            thread.start()
+            thread.is_ready.wait()
+            try:
+                if thread.error:
+                    raise thread.error
+                yield host, thread.port
+            finally:
+                thread.terminate()
+                perf_logger.setLevel(level)
+
+    @staticmethod
+    def run(host, port, plan, concurrency):
+        def worker(requests):
+            connection = http.client.HTTPConnection(host, port, timeout=120)
+            results = []
+            try:
+                for name, method, path, body, headers in requests:
+                    began = time.perf_counter()
+                    connection.request(method, path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    latency = time.perf_counter() - began
+                    results.append((name, latency, response.status, server_timing_queries(response.getheader('Server-Timing'))))
+            finally:
+                connection.close()
+            return results
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(worker, plan[i::concurrency]) for i in range(concurrency)]
+            return [result for future in futures for result in future.result()]
+
+    @staticmethod
+    def summarize(results, elapsed, options):
+        report = {
+            'requests': len(results),
+            'concurrency': options['concurrency'],
+            'seconds': elapsed,
+            'rps': len(results) / elapsed if elapsed else 0.0,
+            **summarize([latency for _, latency, _, _ in results]),
+            'endpoints': {},
+        }
+        for name in ENDPOINTS:
+            rows = [row for row in results if row[0] == name]
+            if not rows:
+                continue
+            queries = [count for _, _, _, count in rows if count is not None]
+            report['endpoints'][name] = {
+                **summarize([latency for _, latency, _, _ in rows]),
+                'errors': sum(1 for _, _, code, _ in rows if code >= 400),
+                'queries': sum(queries) / len(queries) if queries else None,
+            }
+        return report
+
+    def report(self, report):
+        self.stdout.write(
+            f"requests={report['requests']} concurrency={report['concurrency']} {report['rps']:.0f} req/s "
+            f"p50={report['p50_ms']:.1f}ms p95={report['p95_ms']:.1f}ms p99={report['p99_ms']:.1f}ms"
+        )
+        for name, stats in report['endpoints'].items():
+            queries = '-' if stats['queries'] is None else f"{stats['queries']:.1f}"
+            self.stdout.write(
+                f"  {name:<14} n={stats['count']:<6} p50={stats['p50_ms']:7.1f}ms p95={stats['p95_ms']:7.1f}ms "
+                f"p99={stats['p99_ms']:7.1f}ms queries={queries}"
+                + (f"  errors={stats['errors']}" if stats['errors'] else "")
+            )
@@ -0,0 +1,77 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from base.benchmark import benchmark_database
+from meet.models import Meeting, MeetingPhoto
+from meet.serializers import MeetingSerializer, MeetingValuesSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Serialize N meetings (each with photos) with MeetingSerializer and with MeetingValuesSerializer, "
+        "check that the rendered JSON is identical and report the time taken by each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+        parser.add_argument('--photos', type=int, default=2, help="Photos per meeting.")
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help="Meetings per query, as on a list page (default: the largest page size).")
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the benchmark database between runs.")
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options['keepdb']):
+            self.user = User.objects.create_user('bench-organizer', 'organizer@example.com', first_name='Bench', last_name='User')
+            self.stdout.write(f"photos/meeting={options['photos']} batch={options['batch_size']}")
+            for size in sorted(options['sizes']):
+                self.populate(size, options['photos'])
+                ids = list(Meeting.objects.order_by('-start_time', '-id').values_list('id', flat=True)[:size])
+                batches = [ids[i:i + options['batch_size']] for i in range(0, len(ids), options['batch_size'])]
+
+                drf_time, drf_output = self.time(self.serialize_drf, batches)
+                fast_time, fast_output = self.time(self.serialize_fast, batches)
+                identical = drf_output == fast_output
+                self.stdout.write(
+                    f"meetings={size:>7}  MeetingSerializer={drf_time:8.3f}s  MeetingValuesSerializer={fast_time:8.3f}s  "
+                    f"speedup={drf_time / fast_time:5.1f}x  identical={identical}"
+                )
+                if not identical:
+                    self.stderr.write(self.style.ERROR("The two serializers rendered different JSON."))
+
+    def populate(self, total, photos):
+        missing = total - Meeting.objects.count()
+        if missing <= 0:
+            return
+        start = timezone.now() + timedelta(days=1)
+        meetings = Meeting.objects.bulk_create([
+            Meeting(title=f'Bench {i}', location='Office', start_time=start + timedelta(minutes=i), duration_minutes=30,
+                    created_by=self.user, recipient_emails=['guest@example.com', 'other@example.com'])
+            for i in range(missing)
+        ], batch_size=1000)
+        MeetingPhoto.objects.bulk_create([
+            MeetingPhoto(meeting=meeting, file=f'meeting_photos/bench_{n}.jpg', uploaded_by=self.user)
+            for meeting in meetings for n in range(photos)
+        ], batch_size=1000)
+
+    @staticmethod
+    def time(serialize, batches):
+        renderer = JSONRenderer()
+        began = time.perf_counter()
+        output = [renderer.render(serialize(batch)) for batch in batches]
+        return time.perf_counter() - began, output
+
+    @staticmethod
+    def serialize_drf(ids):
+        meetings = Meeting.objects.with_relations().filter(id__in=ids).order_by('-start_time', '-id')
+        return MeetingSerializer(meetings, many=True).data
+
+    @staticmethod
+    def serialize_fast(ids):
+        serializer = MeetingValuesSerializer()
+        rows = list(Meeting.objects.filter(id__in=ids).order_by('-start_time', '-id').values(*serializer.columns))
+        return serializer.to_representation(rows)
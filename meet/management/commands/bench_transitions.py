@@ -0,0 +1,110 @@
+import random
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from base.benchmark import benchmark_database, summarize
+from base.models import OutboxEmail
+from meet.models import Meeting
+
+
+class Command(BaseCommand):
+    help = (
+        "Race several threads issuing random status changes against the same meetings and "
+        "report throughput, latency and whether any change was applied twice."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meetings', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the benchmark database between runs.")
+
+    retries = 50
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options['keepdb']):
+            self.run(options['meetings'], options['threads'])
+
+    @staticmethod
+    def apply(pk, target, user):
+        meeting = Meeting.objects.select_related('created_by').get(pk=pk)
+        if target == 'in_progress':
+            return meeting.status_update_in_progress()
+        if target == 'completed':
+            return meeting.status_update_completed()
+        return meeting.status_update_cancelled(user)
+
+    def run(self, total, threads):
+        user = User.objects.create_user('bench-organizer', 'organizer@example.com')
+        User.objects.create_user('bench-admin', 'admin@example.com', is_staff=True)
+        start = timezone.now() + timedelta(days=1)
+        Meeting.objects.bulk_create([
+            Meeting(title=f'Bench {i}', location='Office', start_time=start, duration_minutes=30,
+                    created_by=user, recipient_emails=['guest@example.com'])
+            for i in range(total)
+        ])
+        ids = list(Meeting.objects.values_list('id', flat=True))
+
+        latencies, wins, errors = [], Counter(), Counter()
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            order = ids[:]
+            rng.shuffle(order)
+            local_latencies, local_wins, local_errors = [], Counter(), Counter()
+            barrier.wait()
+            try:
+                for pk in order:
+                    target = rng.choice(['in_progress', 'completed', 'cancelled'])
+                    began = time.perf_counter()
+                    for attempt in range(self.retries):
+                        try:
+                            won = self.apply(pk, target, user)
+                            break
+                        except DatabaseError as e:
+                            # SQLite reports lock contention as an error rather than waiting.
+                            local_errors[type(e).__name__] += 1
+                            time.sleep(0.001 * (attempt + 1))
+                    else:
+                        continue
+                    local_latencies.append(time.perf_counter() - began)
+                    if won:
+                        local_wins[(pk, target)] += 1
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(local_latencies)
+                wins.update(local_wins)
+                errors.update(local_errors)
+
+        pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+        began = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        stats = summarize(latencies)
+        applied = sum(wins.values())
+        duplicates = sum(count - 1 for count in wins.values() if count > 1)
+        emails = OutboxEmail.objects.count()
+
+        self.stdout.write(f"meetings={total} threads={threads} attempts={stats['count']} elapsed={elapsed:.2f}s")
+        self.stdout.write(f"throughput={stats['count'] / elapsed:.0f} attempts/s, {applied / elapsed:.0f} transitions/s")
+        self.stdout.write(f"latency p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms")
+        self.stdout.write(f"transitions applied={applied} duplicated={duplicates} emails queued={emails}")
+        if errors:
+            self.stdout.write(f"retried database errors: {dict(errors)}")
+        if duplicates or emails != applied:
+            self.stderr.write(self.style.ERROR("A status change was applied or notified more than once."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Every status change was applied and notified exactly once."))
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from base.views import logger
+from meet.models import PhotoBlob, PhotoUploadSession
+
+
+class Command(BaseCommand):
+    help = "Delete stored photo blobs that no meeting photo references any more, and expired upload sessions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Blobs deleted per round.")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted without deleting it.")
+        parser.add_argument('--recount', action='store_true',
+                            help="First recompute every ref_count from the photos, e.g. after rows were removed with raw SQL.")
+
+    def handle(self, *args, **options):
+        expired = self.delete_expired_sessions(options['dry_run'])
+        if options['recount']:
+            self.recount()
+        unreferenced = PhotoBlob.objects.filter(ref_count=0, photos__isnull=True).order_by('id')
+        if options['dry_run']:
+            total = unreferenced.count()
+            self.stdout.write(f"{total} blobs and {expired} upload sessions would be deleted")
+            return
+
+        deleted = reclaimed = 0
+        position = 0
+        while True:
+            batch = list(unreferenced.filter(id__gt=position).values_list('id', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            position = batch[-1]
+            for pk in batch:
+                size = self.delete(pk)
+                if size is not None:
+                    deleted += 1
+                    reclaimed += size
+        self.stdout.write(f"deleted={deleted} bytes={reclaimed} upload_sessions={expired}")
+
+    @staticmethod
+    def delete(pk):
+        """
+        Delete one blob, its file and its renditions, unless an upload took a new
+        reference to it since it was listed. Returns the bytes freed, or None.
+        """
+        with transaction.atomic():
+            # The lock makes a concurrent PhotoBlob.acquire wait for us, or us see its new reference.
+            blob = PhotoBlob.objects.select_for_update().filter(pk=pk, ref_count=0).first()
+            if blob is None or blob.photos.exists():
+                return None
+            blob.delete()
+        renditions = blob.renditions or {}
+        names = [blob.file.name] + [renditions[name] for name in settings.PHOTO_RENDITIONS if renditions.get(name)]
+        storage = PhotoBlob._meta.get_field('file').storage
+        for name in names:
+            try:
+                storage.delete(name)
+            except OSError as e:
+                logger.error(f"Error deleting photo blob file {name}: {e}")
+        return blob.size + sum(renditions.get(f'{name}_size') or 0 for name in settings.PHOTO_RENDITIONS)
+
+    @staticmethod
+    def delete_expired_sessions(dry_run):
+        sessions = PhotoUploadSession.objects.filter(expires_at__lte=timezone.now())
+        if dry_run:
+            return sessions.count()
+        # Their files are removed by the post_delete receiver in meet.signals.
+        _, deleted = sessions.delete()
+        return deleted.get(PhotoUploadSession._meta.label, 0)
+
+    @staticmethod
+    def recount():
+        counts = dict(PhotoBlob.objects.annotate(total=Count('photos')).values_list('id', 'total'))
+        blobs = [PhotoBlob(pk=pk, ref_count=total) for pk, total in counts.items()]
+        PhotoBlob.objects.bulk_update(blobs, ['ref_count'], batch_size=1000)
@@ -0,0 +1,117 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from base.views import logger
+from meet.imaging import build_renditions
+from meet.models import MeetingPhoto, PhotoBlob
+
+# What build_renditions produces, and what photos sharing a blob can share
+RENDITION_FIELDS = ('thumbnail', 'medium', 'width', 'height', 'file_size', 'thumbnail_size', 'medium_size')
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnail and medium renditions for newly uploaded meeting photos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process what is pending now and exit instead of polling.")
+        parser.add_argument('--batch-size', type=int, default=20, help="Photos claimed per round.")
+        parser.add_argument('--workers', type=int, default=4, help="Photos processed in parallel.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when nothing is pending.")
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help="Seconds after which a photo stuck in 'processing' (e.g. the worker died) is retried.")
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                self.requeue_stale(options['stale_after'])
+                claimed = self.claim(options['batch_size'])
+                if claimed:
+                    self.process(pool, claimed)
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+
+    def requeue_stale(self, seconds):
+        cutoff = timezone.now() - timedelta(seconds=seconds)
+        MeetingPhoto.objects.filter(processing_status='processing', updated_at__lt=cutoff).update(
+            processing_status='pending', updated_at=timezone.now(),
+        )
+
+    def claim(self, batch_size):
+        """Move a batch from 'pending' to 'processing'; photos another worker claimed first are skipped."""
+        ids = list(
+            MeetingPhoto.objects.filter(processing_status='pending')
+            .order_by('created_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        claimed = []
+        for pk in ids:
+            if MeetingPhoto.objects.filter(pk=pk, processing_status='pending').update(
+                processing_status='processing', updated_at=timezone.now(),
+            ):
+                claimed.append(pk)
+        return list(MeetingPhoto.objects.filter(pk__in=claimed))
+
+    def process(self, pool, photos):
+        """
+        Build renditions once per stored blob: photos whose content was processed
+        before, or appears more than once in the batch, reuse the same files,
+        which are recorded on the blob so `gc_photo_blobs` can delete them with it.
+        """
+        results = self.processed_blobs(photos)
+        builds = {}
+        for photo in photos:
+            if self.content_key(photo) not in results:
+                builds.setdefault(self.content_key(photo), photo)
+        for key, result in zip(builds, pool.map(self.build, builds.values())):
+            results[key] = result if isinstance(key, tuple) else self.share(key, result)
+        for photo in photos:
+            self.record(photo, results[self.content_key(photo)])
+
+    @staticmethod
+    def content_key(photo):
+        return photo.blob_id if photo.blob_id is not None else ('photo', photo.pk)
+
+    @staticmethod
+    def processed_blobs(photos):
+        """Rendition values already built for the blobs among `photos`, by blob id."""
+        blob_ids = {photo.blob_id for photo in photos if photo.blob_id is not None}
+        if not blob_ids:
+            return {}
+        return dict(PhotoBlob.objects.filter(pk__in=blob_ids, renditions__isnull=False).values_list('id', 'renditions'))
+
+    @staticmethod
+    def share(blob_id, result):
+        """
+        Record renditions built for a blob on it, unless another worker got
+        there first; then ours are deleted and theirs are used.
+        """
+        if isinstance(result, Exception):
+            return result
+        if PhotoBlob.objects.filter(pk=blob_id, renditions__isnull=True).update(renditions=result):
+            return result
+        storage = PhotoBlob._meta.get_field('file').storage
+        for name in settings.PHOTO_RENDITIONS:
+            storage.delete(result[name])
+        return PhotoBlob.objects.get(pk=blob_id).renditions
+
+    @staticmethod
+    def build(photo):
+        try:
+            return build_renditions(photo)
+        except Exception as e:
+            return e
+
+    def record(self, photo, result):
+        if isinstance(result, Exception):
+            logger.error(f"Error processing photo {photo.uid}: {result}")
+            fields = {'processing_status': 'failed'}
+        else:
+            fields = {'processing_status': 'ready', **result}
+        MeetingPhoto.objects.filter(pk=photo.pk).update(updated_at=timezone.now(), **fields)
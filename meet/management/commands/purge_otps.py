@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from meet.models import MeetingOTP
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired meeting OTPs from the meet_meetingotp table. Expired codes are already refused, "
+        "so this only reclaims space; run it from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows deleted per DELETE.")
+
+    def handle(self, *args, **options):
+        expired = MeetingOTP.objects.filter(expires_at__lte=timezone.now()).order_by('id')
+        deleted = 0
+        while True:
+            # Deleted by primary key, so each DELETE only locks the rows it removes, not a range of expires_at.
+            batch = list(expired.values_list('id', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            deleted += MeetingOTP.objects.filter(pk__in=batch).delete()[0]
+        self.stdout.write(f"deleted={deleted}")
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from base.views import logger
+from meet.models import Meeting
+
+
+class Command(BaseCommand):
+    help = (
+        "Move scheduled meetings whose start time has passed to in_progress and flag in-progress meetings "
+        "that run past their end time. Several schedulers can run against the same database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run one round and exit instead of polling.")
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Meetings updated per UPDATE; each batch is announced in one admin email.")
+        parser.add_argument('--interval', type=float, default=30.0, help="Seconds to sleep between rounds.")
+
+    def handle(self, *args, **options):
+        while True:
+            now = timezone.now()
+            started = self.drain(Meeting.start_due, now, options['batch_size'])
+            flagged = self.drain(Meeting.flag_overruns, now, options['batch_size'])
+            if started or flagged:
+                logger.info(f"Scheduler started {started} meetings and flagged {flagged} overruns")
+            if options['once']:
+                self.stdout.write(f"started={started} overruns={flagged}")
+                break
+            time.sleep(options['interval'])
+
+    @staticmethod
+    def drain(step, now, batch_size):
+        """Run `step` until it returns a short batch; returns the number of meetings it handled."""
+        total = 0
+        while True:
+            handled = len(step(now, batch_size))
+            total += handled
+            if handled < batch_size:
+                return total
@@ -0,0 +1,136 @@
+import hashlib
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from meet.models import Meeting, MeetingPhoto, PhotoBlob
+
+TOPICS = ['Quarterly', 'Budget', 'Hiring', 'Roadmap', 'Design', 'Vendor', 'Security', 'Release', 'Customer', 'Onboarding']
+KINDS = ['planning', 'review', 'sync', 'retrospective', 'kickoff', 'interview', 'workshop', 'demo']
+LOCATIONS = ['Board Room', 'Room 101', 'Room 204', 'Cafeteria', 'Head Office', 'Client Site', 'Zoom', 'Google Meet']
+DURATIONS = [15, 30, 30, 45, 60, 60, 90, 120]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic users, meetings and photos for load testing, using bulk inserts. "
+        "Every user gets the same password; photo rows point at a small pool of shared blobs whose files "
+        "are not written, so rendition and download URLs will 404."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--meetings', type=int, default=10_000)
+        parser.add_argument('--photos-per-meeting', type=float, default=1.0, help="Average; each meeting gets 0 to twice this.")
+        parser.add_argument('--photo-blobs', type=int, default=50, help="Distinct photo contents shared by the photos.")
+        parser.add_argument('--days', type=int, default=365, help="Meetings are spread over this many days around today.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT transaction.")
+        parser.add_argument('--prefix', default='seed', help="Usernames are <prefix>-<n>.")
+        parser.add_argument('--password', default='seed-password')
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, so runs are repeatable.")
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.now = timezone.now()
+        began = time.perf_counter()
+        users = self.create_users(options['prefix'], options['users'], options['password'], options['batch_size'])
+        blobs = self.create_blobs(options['prefix'], options['photo_blobs']) if options['photos_per_meeting'] else []
+        meetings = photos = 0
+        while meetings < options['meetings']:
+            size = min(options['batch_size'], options['meetings'] - meetings)
+            with transaction.atomic():
+                batch = self.create_meetings(users, size, options['days'])
+                photos += self.create_photos(batch, blobs, options['photos_per_meeting'])
+            meetings += size
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{meetings}/{options['meetings']} meetings")
+        self.stdout.write(
+            f"users={len(users)} meetings={meetings} photos={photos} blobs={len(blobs)} "
+            f"seconds={time.perf_counter() - began:.1f}"
+        )
+
+    @staticmethod
+    def create_users(prefix, total, password, batch_size):
+        """Create the users that do not exist yet; returns (id, email) for all of them."""
+        # Hashing is deliberately slow, so every user shares one hash.
+        hashed = make_password(password)
+        names = {f'{prefix}-{n}': n for n in range(total)}
+        seeded = User.objects.filter(username__startswith=f'{prefix}-')
+        existing = set(seeded.values_list('username', flat=True))
+        User.objects.bulk_create([
+            User(username=name, email=f'{name}@example.com', password=hashed, first_name=prefix.title(), last_name=str(n))
+            for name, n in names.items() if name not in existing
+        ], batch_size=batch_size)
+        return [(pk, email) for pk, username, email in seeded.order_by('id').values_list('id', 'username', 'email')
+                if username in names]
+
+    @staticmethod
+    def create_blobs(prefix, total):
+        digests = [hashlib.sha256(f'{prefix}-photo-{n}'.encode()).hexdigest() for n in range(total)]
+        PhotoBlob.objects.bulk_create([
+            PhotoBlob(sha256=digest, file=PhotoBlob.path_for(digest, '.jpg'), size=200_000) for digest in digests
+        ], ignore_conflicts=True)
+        return list(PhotoBlob.objects.filter(sha256__in=digests).values_list('id', 'file'))
+
+    def create_meetings(self, users, size, days):
+        meetings = [self.meeting(users, days) for _ in range(size)]
+        Meeting.objects.bulk_create(meetings)
+        if any(meeting.pk is None for meeting in meetings):
+            # Backends that cannot return ids from a bulk INSERT, e.g. MySQL.
+            ids = dict(Meeting.objects.filter(uid__in=[meeting.uid for meeting in meetings]).values_list('uid', 'id'))
+            for meeting in meetings:
+                meeting.pk = ids[meeting.uid]
+        return meetings
+
+    def meeting(self, users, days):
+        pick = self.random
+        creator, _ = pick.choice(users)
+        start = self.now + timedelta(minutes=pick.randrange(-days * 720, days * 720) // 15 * 15)
+        duration = pick.choice(DURATIONS)
+        end = start + timedelta(minutes=duration)
+        if end <= self.now:
+            status = 'cancelled' if pick.random() < 0.1 else 'completed'
+        elif start <= self.now:
+            status = 'in_progress'
+        else:
+            status = 'cancelled' if pick.random() < 0.05 else 'scheduled'
+        meeting_type = pick.choice(['in_person', 'online'])
+        location = pick.choice(LOCATIONS[6:] if meeting_type == 'online' else LOCATIONS[:6])
+        title = f'{pick.choice(TOPICS)} {pick.choice(KINDS)}'
+        return Meeting(
+            title=title,
+            description=f'{title} with the {pick.choice(TOPICS).lower()} team. Agenda: {", ".join(pick.sample(KINDS, 3))}.',
+            location=location,
+            meeting_type=meeting_type,
+            start_time=start,
+            duration_minutes=duration,
+            status=status,
+            created_by_id=creator,
+            recipient_emails=[email for _, email in pick.sample(users, min(len(users), pick.randint(1, 5)))],
+            is_otp_verified=status == 'completed',
+        )
+
+    def create_photos(self, meetings, blobs, per_meeting):
+        if not blobs:
+            return 0
+        photos = []
+        references = Counter()
+        for meeting in meetings:
+            for _ in range(round(self.random.uniform(0, 2 * per_meeting))):
+                blob_id, name = self.random.choice(blobs)
+                references[blob_id] += 1
+                photos.append(MeetingPhoto(meeting_id=meeting.pk, blob_id=blob_id, file=name, uploaded_by_id=meeting.created_by_id,
+                                           processing_status='ready', width=1600, height=1200, file_size=200_000))
+        MeetingPhoto.objects.bulk_create(photos)
+        PhotoBlob.objects.bulk_update(
+            [PhotoBlob(pk=pk, ref_count=F('ref_count') + count) for pk, count in references.items()], ['ref_count'],
+        )
+        return len(photos)
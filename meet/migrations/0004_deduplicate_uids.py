@@ -0,0 +1,40 @@
+# Rows that existed before 0002 all received the same uid, because AddField
+# evaluates the uuid4 default once for the whole table. Give every duplicate a
+# fresh uid so 0005 can add the unique constraint.
+
+import uuid
+from django.db import migrations
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def deduplicate_uids(apps, schema_editor):
+    for model_name in ('Meeting', 'MeetingPhoto'):
+        model = apps.get_model('meet', model_name)
+        duplicated = (
+            model.objects.values('uid')
+            .annotate(rows=Count('id'))
+            .filter(rows__gt=1)
+            .values_list('uid', flat=True)
+        )
+        for uid in list(duplicated):
+            ids = list(model.objects.filter(uid=uid).order_by('id').values_list('id', flat=True))
+            # Keep the uid on the oldest row so any link already handed out still works.
+            for start in range(1, len(ids), BATCH_SIZE):
+                batch = [model(id=pk, uid=uuid.uuid4()) for pk in ids[start:start + BATCH_SIZE]]
+                model.objects.bulk_update(batch, ['uid'])
+
+
+class Migration(migrations.Migration):
+
+    # Each batch commits on its own so a large table is never held in one long transaction.
+    atomic = False
+
+    dependencies = [
+        ('meet', '0003_meeting_recipient_emails'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_uids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-18 06:22
+
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meet', '0004_deduplicate_uids'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='meeting',
+            name='uid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='meetingphoto',
+            name='uid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['start_time', 'id'], name='meeting_start_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['status', 'start_time'], name='meeting_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['created_by', 'start_time'], name='meeting_creator_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meetingphoto',
+            index=models.Index(fields=['meeting', 'created_at'], name='photo_meeting_created_idx'),
+        ),
+    ]
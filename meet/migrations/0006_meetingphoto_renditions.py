@@ -0,0 +1,59 @@
+# Generated by Django 6.0.2 on 2026-10-18 06:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meet', '0005_uid_unique_and_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetingphoto',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meetingphoto',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meetingphoto',
+            name='medium',
+            field=models.ImageField(blank=True, null=True, upload_to='meeting_photos/renditions/'),
+        ),
+        migrations.AddField(
+            model_name='meetingphoto',
+            name='medium_size',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meetingphoto',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='meetingphoto',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='meeting_photos/renditions/'),
+        ),
+        migrations.AddField(
+            model_name='meetingphoto',
+            name='thumbnail_size',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meetingphoto',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='meetingphoto',
+            index=models.Index(fields=['processing_status', 'created_at'], name='photo_processing_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 06:32
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meet', '0006_meetingphoto_renditions'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='meeting',
+            name='otp_code',
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Store each meeting's end time so calendar and conflict queries can use an
+# index. Existing rows are filled in batches before the column becomes NOT NULL.
+
+import datetime
+import meet.models
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_end_time(apps, schema_editor):
+    Meeting = apps.get_model('meet', 'Meeting')
+    last_id = 0
+    while True:
+        rows = list(
+            Meeting.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'start_time', 'duration_minutes')[:BATCH_SIZE]
+        )
+        if not rows:
+            return
+        Meeting.objects.bulk_update([
+            Meeting(id=pk, end_time=start_time + datetime.timedelta(minutes=duration))
+            for pk, start_time, duration in rows
+        ], ['end_time'])
+        last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    # Each batch commits on its own so a large table is never held in one long transaction.
+    atomic = False
+
+    dependencies = [
+        ('meet', '0007_remove_meeting_otp_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='end_time',
+            field=meet.models.EndTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_end_time, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='meeting',
+            name='end_time',
+            field=meet.models.EndTimeField(),
+        ),
+        migrations.RemoveIndex(
+            model_name='meeting',
+            name='meeting_creator_start_idx',
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['start_time', 'end_time'], name='meeting_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['created_by', 'start_time', 'end_time'], name='meeting_creator_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['duration_minutes'], name='meeting_duration_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-18 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meet', '0008_meeting_end_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meeting',
+            name='overrun_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['status', 'end_time'], name='meeting_status_end_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Full-text index over meeting title, description and location, see meet.search.
+# MySQL gets a FULLTEXT index. SQLite gets an external-content FTS5 table kept in
+# step by triggers; a later migration that makes Django rebuild meet_meeting on
+# SQLite drops the triggers with the old table and has to run create_fts again.
+
+from django.db import migrations
+
+TABLE = 'meet_meeting'
+FTS_TABLE = 'meet_meeting_fts'
+FULLTEXT_INDEX = 'meeting_fulltext_idx'
+COLUMNS = ('title', 'description', 'location')
+
+
+def create_fts(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    columns = ', '.join(COLUMNS)
+    if vendor == 'mysql':
+        schema_editor.execute(f"ALTER TABLE `{TABLE}` ADD FULLTEXT INDEX `{FULLTEXT_INDEX}` ({columns})")
+    elif vendor == 'sqlite':
+        new = ', '.join(f'new.{column}' for column in COLUMNS)
+        old = ', '.join(f'old.{column}' for column in COLUMNS)
+        delete = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old});"
+        insert = f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new});"
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns}, content='{TABLE}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN {insert} END")
+        schema_editor.execute(f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN {delete} END")
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF {columns} ON {TABLE} BEGIN {delete} {insert} END"
+        )
+        schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_fts(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        schema_editor.execute(f"ALTER TABLE `{TABLE}` DROP INDEX `{FULLTEXT_INDEX}`")
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meet', '0009_meeting_overrun_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+RENDITION_FIELDS = ('thumbnail', 'medium', 'width', 'height', 'file_size', 'thumbnail_size', 'medium_size')
+
+
+def backfill_renditions(apps, schema_editor):
+    """Record on each blob the renditions its processed photos already share."""
+    PhotoBlob = apps.get_model('meet', 'PhotoBlob')
+    MeetingPhoto = apps.get_model('meet', 'MeetingPhoto')
+    rows = MeetingPhoto.objects.filter(blob__isnull=False, processing_status='ready').values('blob', *RENDITION_FIELDS)
+    renditions = {row.pop('blob'): row for row in rows.iterator()}
+    PhotoBlob.objects.bulk_update(
+        [PhotoBlob(pk=pk, renditions=values) for pk, values in renditions.items()], ['renditions'], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meet', '0013_meetingotp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='photoblob',
+            name='renditions',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_renditions, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,95 @@
 from django.db import models
+from collections import Counter
+from concurrent.futures import wait
+from django.db.models import Case, Count, F, Max, OuterRef, Subquery, Value, When
+from django.db import IntegrityError
 from django.contrib.auth.models import User
 from base.models import BaseModel
-import random
-from django.core.mail import send_mail
+from django.db import transaction
+from django.utils import timezone
+from base.mail import queue_mail
+from account.cache import get_staff_emails
+from meet.otp import get_otp_store
+from meet.imaging import image_extension
+from meet.search import matching, relevance
+from meet.uploads import discard_on_error, file_sha256, saved_files
+import os
 from django.conf import settings
-from meet.choices import STATUS_CHOICES, MEETING_TYPE_CHOICES, VALID_STATUS_CHANGE
+from datetime import timedelta
+from meet.choices import STATUS_CHOICES, MEETING_TYPE_CHOICES, VALID_STATUS_CHANGE, PHOTO_PROCESSING_CHOICES, UPLOAD_SESSION_STATUS_CHOICES
+from django.core.files import File
+
+
+class EndTimeField(models.DateTimeField):
+    """
+    A meeting's `start_time + duration_minutes`, stored so time-window queries
+    can use an index. Filled in on every save and by bulk_create; code that
+    changes the start or duration with QuerySet.update() or bulk_update() must
+    set it too.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs['editable'] = False
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs['editable']
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = model_instance.start_time + timedelta(minutes=model_instance.duration_minutes)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class MeetingQuerySet(models.QuerySet):
+    def with_relations(self):
+        """Load the creator and photos in batches so serializing N meetings costs a fixed number of queries."""
+        return self.select_related('created_by').prefetch_related('photos')
+
+    def with_photo_stats(self):
+        """Annotate each meeting with its newest photo timestamp and photo count, for conditional GETs."""
+        photos = MeetingPhoto.objects.filter(meeting=OuterRef('pk')).order_by().values('meeting')
+        return self.annotate(
+            photos_updated_at=Subquery(photos.annotate(latest=Max('updated_at')).values('latest')),
+            photo_count=Subquery(photos.annotate(total=Count('id')).values('total')),
+        )
+
+    def overlapping(self, start, end):
+        """
+        Meetings that are running at some point in [start, end).
+
+        `end_time > start` alone would scan every later meeting, so the start
+        time is also bounded below by the longest duration a meeting in the
+        window can have; both conditions are then answered from the
+        (start_time, end_time) index. That is MEET_MAX_DURATION_MINUTES, unless
+        a longer meeting stored before the limit existed overlaps the window:
+        those are few, and are looked up in the duration index.
+        """
+        running = {'start_time__lt': end, 'end_time__gt': start}
+        longest = Meeting.objects.filter(duration_minutes__gt=settings.MEET_MAX_DURATION_MINUTES, **running).aggregate(
+            longest=Max('duration_minutes'),
+        )['longest'] or settings.MEET_MAX_DURATION_MINUTES
+        return self.filter(start_time__gt=start - timedelta(minutes=longest), **running)
+
+    def search(self, terms):
+        """
+        Meetings whose title, description or location match every term from
+        meet.search.search_terms, annotated with a `rank` that is higher for
+        better matches.
+        """
+        return self.filter(matching(terms, self.db)).annotate(rank=relevance(terms, self.db))
+
+    def transition(self, status, **fields):
+        """
+        Move every meeting in this queryset that VALID_STATUS_CHANGE allows to
+        reach `status`, in a single conditional UPDATE. Rows in any other state
+        are left alone. Returns the number of meetings changed.
+        """
+        sources = [source for source, targets in VALID_STATUS_CHANGE.items() if status in targets]
+        fields.setdefault('updated_at', timezone.now())
+        return self.filter(status__in=sources).update(status=status, **fields)
 
 
 class Meeting(BaseModel):
@@ -14,115 +99,598 @@ class Meeting(BaseModel):
     meeting_type = models.CharField(max_length=20, choices=MEETING_TYPE_CHOICES, default='in_person')
     start_time = models.DateTimeField()
     duration_minutes = models.PositiveIntegerField(help_text="Duration of the meeting in minutes")
+    end_time = EndTimeField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='scheduled')
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='organized_meetings')
     recipient_emails = models.JSONField(default=list)
 
-    # OTP fields for verification upon completion
-    otp_code = models.CharField(max_length=6, blank=True, null=True)
+    # Set when the meeting is completed with a valid OTP; the codes themselves live in meet.otp
     is_otp_verified = models.BooleanField(default=False)
+    # Set by the `run_scheduler` command when a meeting is still in progress after its end time
+    overrun_at = models.DateTimeField(blank=True, null=True)
+
+    objects = MeetingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination on the list endpoint
+            models.Index(fields=['start_time', 'id'], name='meeting_start_id_idx'),
+            models.Index(fields=['status', 'start_time'], name='meeting_status_start_idx'),
+            # Calendar windows and double-booking checks, see MeetingQuerySet.overlapping
+            models.Index(fields=['start_time', 'end_time'], name='meeting_window_idx'),
+            models.Index(fields=['created_by', 'start_time', 'end_time'], name='meeting_creator_window_idx'),
+            models.Index(fields=['duration_minutes'], name='meeting_duration_idx'),
+            # Overrun scan in `run_scheduler`
+            models.Index(fields=['status', 'end_time'], name='meeting_status_end_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
 
+    def save(self, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'start_time', 'duration_minutes'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'end_time'}
+        super().save(**kwargs)
+
+    @staticmethod
+    def lock_organizer(user_id):
+        """
+        Lock the organizer's user row until the transaction ends, so that the
+        conflict check and the write of one booking finish before another booking
+        for the same organizer is checked.
+        """
+        User.objects.select_for_update().only('pk').get(pk=user_id)
+
+    def conflicts(self):
+        """The creator's other scheduled or running meetings that overlap this one."""
+        end_time = self.start_time + timedelta(minutes=self.duration_minutes)
+        return (
+            Meeting.objects.filter(created_by_id=self.created_by_id, status__in=['scheduled', 'in_progress'])
+            .overlapping(self.start_time, end_time)
+            .exclude(pk=self.pk)
+            .order_by('start_time')
+        )
+
+    def transition(self, status, **fields):
+        """
+        Change this meeting's status if VALID_STATUS_CHANGE allows it from the
+        status currently stored in the database. Only `status`, `updated_at` and
+        any extra `fields` are written. Returns True when this call made the
+        change and False when the move is not allowed, including when a
+        concurrent request got there first.
+        """
+        fields.setdefault('updated_at', timezone.now())
+        if Meeting.objects.filter(pk=self.pk).transition(status, **fields):
+            self.status = status
+            for name, value in fields.items():
+                setattr(self, name, value)
+            return True
+        self.refresh_from_db(fields=['status'])
+        return False
+
+    @transaction.atomic
     def status_update_in_progress(self):
-        if self.status != 'in_progress':
-            self.status = 'in_progress'
-            self.save()
-        
-            admins = User.objects.filter(is_staff=True)
-
-            subject = f"BBC Meeting is in Progress: {self.title}"
-            message = f"""Hello,
-                The meeting '{self.title}' is now in progress. 
-                
-                Location: {self.location}
-                Start Time: {self.start_time.strftime('%Y-%m-%d %H:%M')}
-                Duration: {self.duration_minutes} minutes
-                Created By: {self.created_by.get_full_name()}
-
-                Thank you,
-                
-                BBC Meet Team"""
-            from_email = settings.EMAIL_HOST_USER
-            recipient_list = [admin.email for admin in admins] # Send to admins only
-            send_mail(subject, message, from_email, recipient_list)
-        else:
+        if not self.transition('in_progress'):
             return False
 
+        subject = f"BBC Meeting is in Progress: {self.title}"
+        message = f"""Hello,
+            The meeting '{self.title}' is now in progress. 
+            
+            Location: {self.location}
+            Start Time: {self.start_time.strftime('%Y-%m-%d %H:%M')}
+            Duration: {self.duration_minutes} minutes
+            Created By: {self.created_by.get_full_name()}
+
+            Thank you,
+            
+            BBC Meet Team"""
+        from_email = settings.EMAIL_HOST_USER
+        recipient_list = get_staff_emails() # Send to admins only
+        queue_mail(subject, message, recipient_list, from_email)
+        return True
+
+    @transaction.atomic
     def status_update_completed(self):
-        if self.status != 'completed':
-            self.status = 'completed'
-            self.save()
-        
-            admins = User.objects.filter(is_staff=True)
-
-            subject = f"BBC Meeting is Completed: {self.title}"
-            message = f"""Hello,
-                The meeting '{self.title}' is now completed. 
-                
-                Location: {self.location}
-                Start Time: {self.start_time.strftime('%Y-%m-%d %H:%M')}
-                Duration: {self.duration_minutes} minutes
-                Created By: {self.created_by.get_full_name()}
-
-                Thank you,
-                
-                BBC Meet Team"""
-            from_email = settings.EMAIL_HOST_USER
-            recipient_list = [admin.email for admin in admins] # Send to admins only
-            send_mail(subject, message, from_email, recipient_list)
-        return False
+        if not self.transition('completed', is_otp_verified=self.is_otp_verified):
+            return False
+
+        subject = f"BBC Meeting is Completed: {self.title}"
+        message = f"""Hello,
+            The meeting '{self.title}' is now completed. 
+            
+            Location: {self.location}
+            Start Time: {self.start_time.strftime('%Y-%m-%d %H:%M')}
+            Duration: {self.duration_minutes} minutes
+            Created By: {self.created_by.get_full_name()}
+
+            Thank you,
+            
+            BBC Meet Team"""
+        from_email = settings.EMAIL_HOST_USER
+        recipient_list = get_staff_emails() # Send to admins only
+        queue_mail(subject, message, recipient_list, from_email)
+        return True
     
+    @transaction.atomic
     def status_update_cancelled(self, cancelled_by):
-        if self.status != 'cancelled':
-            self.status = 'cancelled'
-            self.save()
-        
-            admins = User.objects.filter(is_staff=True)
-
-            subject = f"BBC Meeting is Cancelled: {self.title}"
-            message = f"""Hello,
-                The meeting '{self.title}' is now cancelled. 
-                
-                Cancelled By: {cancelled_by.get_full_name()}
-
-                Location: {self.location}
-                Start Time: {self.start_time.strftime('%Y-%m-%d %H:%M')}
-                Duration: {self.duration_minutes} minutes
-                Created By: {self.created_by.get_full_name()}
-
-                Thank you,
-                
-                BBC Meet Team"""
-            from_email = settings.EMAIL_HOST_USER
-            recipient_list = [admin.email for admin in admins] # Send to admins only
-            send_mail(subject, message, from_email, recipient_list)
-        return False
+        if not self.transition('cancelled'):
+            return False
+
+        subject = f"BBC Meeting is Cancelled: {self.title}"
+        message = f"""Hello,
+            The meeting '{self.title}' is now cancelled. 
+            
+            Cancelled By: {cancelled_by.get_full_name()}
+
+            Location: {self.location}
+            Start Time: {self.start_time.strftime('%Y-%m-%d %H:%M')}
+            Duration: {self.duration_minutes} minutes
+            Created By: {self.created_by.get_full_name()}
+
+            Thank you,
+            
+            BBC Meet Team"""
+        from_email = settings.EMAIL_HOST_USER
+        recipient_list = get_staff_emails() # Send to admins only
+        queue_mail(subject, message, recipient_list, from_email)
+        return True
+
+    @classmethod
+    @transaction.atomic
+    def bulk_schedule(cls, items, created_by):
+        """
+        Insert many meetings with one INSERT per batch and queue a single admin
+        email listing all of them. `items` are validated MeetingCreatSerializer data.
+
+        Like a single booking, an item is refused if it overlaps a scheduled or
+        running meeting of `created_by`, including an earlier item of the batch;
+        the check runs under the organizer lock. Returns a (meeting, conflicts)
+        pair per item: the new meeting and [], or None and the meetings it overlaps.
+        """
+        cls.lock_organizer(created_by.pk)
+        candidates = [cls(**item, created_by=created_by) for item in items]
+        for meeting in candidates:
+            meeting.end_time = meeting.start_time + timedelta(minutes=meeting.duration_minutes)
+        # One query for the organizer's meetings anywhere in the batch's span; items are checked in memory.
+        booked = list(
+            cls.objects.filter(created_by=created_by, status__in=['scheduled', 'in_progress'])
+            .overlapping(min(meeting.start_time for meeting in candidates), max(meeting.end_time for meeting in candidates))
+            .only('id', 'uid', 'start_time', 'end_time')
+        ) if candidates else []
+
+        outcomes, meetings = [], []
+        for meeting in candidates:
+            conflicts = [other for other in booked if other.start_time < meeting.end_time and meeting.start_time < other.end_time]
+            if conflicts:
+                outcomes.append((None, conflicts))
+            else:
+                booked.append(meeting)
+                meetings.append(meeting)
+                outcomes.append((meeting, []))
+        if not meetings:
+            return outcomes
+        cls.objects.bulk_create(meetings, batch_size=500)
+
+        cls._queue_summary(
+            f"BBC Meetings Scheduled: {len(meetings)} new meetings",
+            f"{created_by.get_full_name() or created_by.username} scheduled {len(meetings)} meetings:",
+            meetings,
+        )
+        return outcomes
+
+    @classmethod
+    @transaction.atomic
+    def bulk_transition(cls, uids, status, changed_by):
+        """
+        Move every meeting in `uids` that VALID_STATUS_CHANGE allows to reach
+        `status` with one UPDATE, and queue a single admin email listing them.
+        Returns {uid: (outcome, current status)} where outcome is 'updated',
+        'invalid_transition' or 'not_found'.
+        """
+        # Lock the rows so the outcome we report matches what the UPDATE did.
+        meetings = list(
+            cls.objects.select_for_update()
+            .filter(uid__in=uids)
+            .only('id', 'uid', 'status', 'title', 'location', 'start_time', 'duration_minutes')
+        )
+        eligible = [meeting for meeting in meetings if status in VALID_STATUS_CHANGE.get(meeting.status, [])]
+        if eligible:
+            cls.objects.filter(pk__in=[meeting.pk for meeting in eligible]).transition(status)
+
+        outcomes = {uid: ('not_found', None) for uid in uids}
+        for meeting in meetings:
+            outcomes[meeting.uid] = ('invalid_transition', meeting.status)
+        for meeting in eligible:
+            outcomes[meeting.uid] = ('updated', status)
+
+        if eligible:
+            label = dict(STATUS_CHOICES)[status]
+            cls._queue_summary(
+                f"BBC Meetings {label}: {len(eligible)} meetings",
+                f"The following meetings are now {label.lower()}.\n\n"
+                f"            Changed By: {changed_by.get_full_name() or changed_by.username}",
+                eligible,
+            )
+        return outcomes
+
+    @classmethod
+    @transaction.atomic
+    def start_due(cls, now, limit):
+        """
+        Move up to `limit` scheduled meetings whose start time is before `now`
+        to in_progress with one UPDATE, and queue a single admin email listing
+        them. Returns the meetings started.
+
+        Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so schedulers
+        on several nodes take disjoint batches instead of waiting on each other.
+        """
+        due = cls.objects.filter(status='scheduled', start_time__lte=now).order_by('start_time', 'id')
+        claimed = cls._claim(due, limit)
+        stamp = timezone.now()
+        changed = cls.objects.filter(pk__in=[meeting.pk for meeting in claimed]).transition('in_progress', updated_at=stamp)
+        started = cls._changed_by(claimed, changed, stamp)
+
+        if started:
+            cls._queue_summary(
+                f"BBC Meetings In Progress: {len(started)} meetings",
+                "The following meetings have reached their start time and are now in progress.",
+                started,
+            )
+        return started
+
+    @classmethod
+    @transaction.atomic
+    def flag_overruns(cls, now, limit):
+        """
+        Set `overrun_at` on up to `limit` in-progress meetings whose end time is
+        before `now` and that are not flagged yet, and queue a single admin email
+        listing them. Returns the meetings flagged.
+        """
+        overdue = cls.objects.filter(status='in_progress', end_time__lte=now, overrun_at__isnull=True).order_by('end_time', 'id')
+        claimed = cls._claim(overdue, limit)
+        stamp = timezone.now()
+        changed = cls.objects.filter(
+            pk__in=[meeting.pk for meeting in claimed], status='in_progress', overrun_at__isnull=True,
+        ).update(overrun_at=stamp, updated_at=stamp)
+        flagged = cls._changed_by(claimed, changed, stamp)
+
+        if flagged:
+            cls._queue_summary(
+                f"BBC Meetings Overrunning: {len(flagged)} meetings",
+                "The following meetings are still in progress after their scheduled end time.",
+                flagged,
+            )
+        return flagged
+
+    @staticmethod
+    def _claim(queryset, limit):
+        return list(
+            queryset.select_for_update(skip_locked=True)
+            .only('id', 'uid', 'status', 'title', 'location', 'start_time', 'duration_minutes', 'end_time')[:limit]
+        )
+
+    @classmethod
+    def _changed_by(cls, claimed, changed, stamp):
+        """
+        The `claimed` meetings a conditional UPDATE stamped with `stamp` changed.
+        Where the database has no row locks (SQLite) another scheduler may have
+        got to some of them between our SELECT and UPDATE.
+        """
+        if changed == len(claimed):
+            return claimed
+        ours = set(cls.objects.filter(pk__in=[meeting.pk for meeting in claimed], updated_at=stamp).values_list('pk', flat=True))
+        return [meeting for meeting in claimed if meeting.pk in ours]
+
+    @staticmethod
+    def _queue_summary(subject, intro, meetings):
+        """Queue one admin email: `intro`, then a line per meeting."""
+        lines = "\n".join(
+            f"            - {meeting.title}: {meeting.start_time.strftime('%Y-%m-%d %H:%M')}, "
+            f"{meeting.duration_minutes} minutes, {meeting.location}"
+            for meeting in meetings
+        )
+        message = f"""Hello,
+            {intro}
+
+{lines}
+
+            Thank you,
+
+            BBC Meet Team"""
+        from_email = settings.EMAIL_HOST_USER
+        recipient_list = get_staff_emails() # Send to admins only
+        queue_mail(subject, message, recipient_list, from_email)
 
     def generate_otp(self):
-        self.otp_code = str(random.randint(100000, 999999))
-        self.save()
-        
-        subject = f"Your Meeting Verification Code: {self.otp_code}"
-        message = f"Hello,\n\nYour OTP for the meeting '{self.title}' is: {self.otp_code}\n\nPlease provide this code to the meeting organizer to verify your attendance.\n\nThank you,\nBBC Meet Team"
+        otp_code = get_otp_store().issue(self.uid)
+
+        subject = f"Your Meeting Verification Code: {otp_code}"
+        message = f"Hello,\n\nYour OTP for the meeting '{self.title}' is: {otp_code}\n\nPlease provide this code to the meeting organizer to verify your attendance.\n\nThank you,\nBBC Meet Team"
         from_email = settings.EMAIL_HOST_USER
         recipient_list = self.recipient_emails # Send to organizer for now, logic can change based on requirements
         
-        send_mail(subject, message, from_email, recipient_list)
+        queue_mail(subject, message, recipient_list, from_email)
 
     def verify_otp(self, otp_code):
-        print(str(self.otp_code) == str(otp_code),self.otp_code, otp_code)
-        if str(self.otp_code) == str(otp_code):
+        """
+        Check the code against the OTP store. Nothing is written here; on success
+        `is_otp_verified` is saved together with the move to completed.
+        Raises OTPAttemptsExceeded after too many wrong codes.
+        """
+        if get_otp_store().verify(self.uid, otp_code):
             self.is_otp_verified = True
-            self.save()
             return True
         return False
 
+class MeetingOTP(BaseModel):
+    """
+    The current completion OTP of a meeting, for meet.otp.DatabaseOTPStore.
+    Keyed by the meeting's uid like the cache entries of CacheOTPStore, so
+    issuing and checking codes never touches the meetings table.
+    """
+    meeting_uid = models.UUIDField(unique=True)
+    digest = models.CharField(max_length=64)
+    attempts = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"OTP for meeting {self.meeting_uid}"
+
+
+class PhotoBlob(BaseModel):
+    """
+    One stored copy of a photo's bytes, at a path derived from their SHA-256.
+    Every MeetingPhoto with the same content points at the same blob;
+    `ref_count` is the number of them, and the `gc_photo_blobs` command
+    deletes blobs that have dropped to zero, with their renditions.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.ImageField(upload_to='meeting_photos/blobs/')
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    # The rendition fields `process_photos` built from this content, shared by every photo of the blob
+    renditions = models.JSONField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count'], name='photoblob_ref_count_idx'),
+        ]
+
+    def __str__(self):
+        return self.sha256
+
+    @staticmethod
+    def path_for(digest, extension):
+        return f"meeting_photos/blobs/{digest[:2]}/{digest}{extension}"
+
+    @classmethod
+    def acquire(cls, upload):
+        """
+        The blob holding `upload`'s content, with one more reference counted.
+        The content is written to storage only when no blob has it yet.
+        """
+        digest = file_sha256(upload)
+        if cls.objects.filter(sha256=digest).update(ref_count=F('ref_count') + 1):
+            return cls.objects.get(sha256=digest)
+
+        storage = cls._meta.get_field('file').storage
+        name = storage.save(cls.path_for(digest, image_extension(upload)), upload)
+        saved_files().append((storage, name))
+        try:
+            with transaction.atomic():
+                return cls.objects.create(sha256=digest, file=name, size=upload.size, ref_count=1)
+        except IntegrityError:
+            # Someone stored the same content between our UPDATE and INSERT.
+            storage.delete(name)
+            cls.objects.filter(sha256=digest).update(ref_count=F('ref_count') + 1)
+            return cls.objects.get(sha256=digest)
+
+    @classmethod
+    def acquire_many(cls, uploads, pool):
+        """
+        Blobs for a batch of uploads, in upload order, with one more reference
+        counted per upload. Content not stored yet is written by `pool`
+        threads before any row is written; the database work is a fixed
+        number of queries however many files there are. Call inside a
+        transaction, itself inside discard_on_error().
+        """
+        digests = [file_sha256(upload) for upload in uploads]
+        counts = Counter(digests)
+        storage = cls._meta.get_field('file').storage
+        known = set(cls.objects.filter(sha256__in=counts).values_list('sha256', flat=True))
+        new = {}
+        for digest, upload in zip(digests, uploads):
+            if digest not in known:
+                new.setdefault(digest, upload)
+        files = saved_files()
+
+        def save(digest):
+            name = storage.save(cls.path_for(digest, image_extension(new[digest])), new[digest])
+            files.append((storage, name))
+            return name
+
+        futures = {digest: pool.submit(save, digest) for digest in new}
+        # Wait for every write, so none lands after discard_on_error() has cleaned up a failed one.
+        wait(futures.values())
+        saved = {digest: future.result() for digest, future in futures.items()}
+
+        cls._add_references({digest: total for digest, total in counts.items() if digest not in new})
+        cls.objects.bulk_create([
+            cls(sha256=digest, file=name, size=new[digest].size, ref_count=counts[digest]) for digest, name in saved.items()
+        ], ignore_conflicts=True)
+        blobs = {blob.sha256: blob for blob in cls.objects.filter(sha256__in=counts)}
+
+        # Content another request stored first: count our references on its blob and drop our copy.
+        lost = {digest: counts[digest] for digest, name in saved.items() if blobs[digest].file.name != name}
+        cls._add_references(lost)
+        for digest in lost:
+            storage.delete(saved[digest])
+        # Blobs that gc_photo_blobs deleted after we looked them up are stored again.
+        for digest in set(counts) - set(blobs):
+            upload = uploads[digests.index(digest)]
+            blobs[digest] = cls.acquire(upload)
+            cls._add_references({digest: counts[digest] - 1})
+        return [blobs[digest] for digest in digests]
+
+    @classmethod
+    def _add_references(cls, counts):
+        """Add counts[sha256] references to each blob, in one UPDATE."""
+        if counts:
+            cls.objects.filter(sha256__in=counts).update(ref_count=F('ref_count') + Case(
+                *[When(sha256=digest, then=Value(total)) for digest, total in counts.items()],
+            ))
+
+    @classmethod
+    def release(cls, blob_id):
+        cls.objects.filter(pk=blob_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+
+
 class MeetingPhoto(BaseModel):
     meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, related_name='photos')
     file = models.ImageField(upload_to='meeting_photos/')
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploaded_photos')
+    # Content-addressed storage of `file`; photos uploaded before blobs existed have none
+    blob = models.ForeignKey(PhotoBlob, on_delete=models.PROTECT, related_name='photos', blank=True, null=True)
+
+    # Filled in by the `process_photos` worker, see meet.imaging
+    processing_status = models.CharField(max_length=20, choices=PHOTO_PROCESSING_CHOICES, default='pending')
+    thumbnail = models.ImageField(upload_to='meeting_photos/renditions/', blank=True, null=True)
+    medium = models.ImageField(upload_to='meeting_photos/renditions/', blank=True, null=True)
+    width = models.PositiveIntegerField(blank=True, null=True)
+    height = models.PositiveIntegerField(blank=True, null=True)
+    file_size = models.PositiveBigIntegerField(blank=True, null=True)
+    thumbnail_size = models.PositiveIntegerField(blank=True, null=True)
+    medium_size = models.PositiveIntegerField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['meeting', 'created_at'], name='photo_meeting_created_idx'),
+            models.Index(fields=['processing_status', 'created_at'], name='photo_processing_idx'),
+        ]
 
     def __str__(self):
         return f"Photo for {self.meeting.title} - {self.created_at}"
+
+    @classmethod
+    def store(cls, meeting, upload, uploaded_by):
+        """
+        Add an uploaded photo to `meeting`. Content that is already stored is
+        not written again: the new photo only references the existing blob.
+        """
+        with discard_on_error(), transaction.atomic():
+            blob = PhotoBlob.acquire(upload)
+            return cls.objects.create(meeting=meeting, blob=blob, file=blob.file.name, uploaded_by=uploaded_by)
+
+    @classmethod
+    def store_many(cls, meeting, uploads, uploaded_by, pool):
+        """
+        Add many uploaded photos to `meeting` with one INSERT; new content is
+        written to storage by `pool` threads. Returns the photos in upload order.
+        """
+        with discard_on_error(), transaction.atomic():
+            blobs = PhotoBlob.acquire_many(uploads, pool)
+            photos = cls.objects.bulk_create([
+                cls(meeting=meeting, blob=blob, file=blob.file.name, uploaded_by=uploaded_by) for blob in blobs
+            ])
+        if any(photo.pk is None for photo in photos):
+            # Backends that cannot return ids from a bulk INSERT, e.g. MySQL.
+            ids = dict(cls.objects.filter(uid__in=[photo.uid for photo in photos]).values_list('uid', 'id'))
+            for photo in photos:
+                photo.pk = ids[photo.uid]
+        return photos
+
+
+class PhotoUploadSession(BaseModel):
+    """
+    A meeting photo sent in chunks. The bytes received so far are kept in a
+    file under PHOTO_UPLOAD_SESSION_DIR and counted by `offset`, so a client
+    whose connection drops asks for the offset and carries on from there.
+    Committing the session turns the file into a MeetingPhoto.
+    """
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, related_name='upload_sessions')
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='photo_upload_sessions')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=UPLOAD_SESSION_STATUS_CHOICES, default='open')
+    photo = models.OneToOneField(MeetingPhoto, on_delete=models.SET_NULL, related_name='upload_session', blank=True, null=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='upload_session_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"Upload of {self.filename} ({self.offset}/{self.size} bytes)"
+
+    @property
+    def path(self):
+        return os.path.join(settings.PHOTO_UPLOAD_SESSION_DIR, f"{self.uid}.part")
+
+    @classmethod
+    def start(cls, meeting, created_by, filename, size):
+        session = cls.objects.create(
+            meeting=meeting, created_by=created_by, filename=filename, size=size,
+            expires_at=timezone.now() + timedelta(hours=settings.PHOTO_UPLOAD_SESSION_HOURS),
+        )
+        os.makedirs(settings.PHOTO_UPLOAD_SESSION_DIR, exist_ok=True)
+        open(session.path, 'wb').close()
+        return session
+
+    def append(self, start, stream, chunk_size=64 * 1024):
+        """
+        Write what `stream` yields into the file at byte `start`, which must be
+        the stored offset, and move the offset past it. Chunks go straight to
+        disk, and the bytes that did arrive are counted even when the stream
+        breaks off. Returns the new offset, or None if another request moved
+        the offset first.
+        """
+        written = 0
+        error = None
+        with open(self.path, 'r+b') as part:
+            part.seek(start)
+            try:
+                while start + written < self.size:
+                    chunk = stream.read(min(chunk_size, self.size - start - written))
+                    if not chunk:
+                        break
+                    part.write(chunk)
+                    written += len(chunk)
+            except OSError as e:
+                error = e
+
+        if not PhotoUploadSession.objects.filter(pk=self.pk, status='open', offset=start).update(
+            offset=start + written, updated_at=timezone.now(),
+        ):
+            return None
+        self.offset = start + written
+        if error is not None:
+            raise error
+        return self.offset
+
+    def commit(self):
+        """
+        Create the MeetingPhoto from the uploaded bytes, once; committing again
+        returns the same photo. Returns None while bytes are still missing.
+        """
+        with discard_on_error(), transaction.atomic():
+            session = PhotoUploadSession.objects.select_for_update().get(pk=self.pk)
+            if session.status == 'committed':
+                return session.photo
+            if session.offset < session.size:
+                return None
+            with open(self.path, 'rb') as part:
+                photo = MeetingPhoto.store(self.meeting, File(part, name=self.filename), self.created_by)
+            self.photo, self.status, self.offset = photo, 'committed', session.offset
+            self.save(update_fields=['photo', 'status', 'updated_at'])
+            transaction.on_commit(self.remove_file)
+            return photo
+
+    def remove_file(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
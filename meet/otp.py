@@ -0,0 +1,119 @@
+import hashlib
+import hmac
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+class OTPAttemptsExceeded(Exception):
+    """Too many wrong codes were tried; a new OTP has to be generated."""
+
+
+def _digest(meeting_uid, code):
+    message = f'{meeting_uid}:{code}'.encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def _new_code():
+    return str(secrets.randbelow(900000) + 100000)
+
+
+class DatabaseOTPStore:
+    """
+    Keeps one OTP per meeting in the meet_meetingotp table (the default).
+
+    Only an HMAC of the code is stored. Codes expire after OTP_TTL_SECONDS,
+    and OTP_MAX_ATTEMPTS wrong guesses invalidate the code. Attempts are
+    counted with a conditional UPDATE, so parallel guesses from any number of
+    workers cannot get past the limit.
+    """
+
+    def issue(self, meeting_uid):
+        """
+        Create a new code for the meeting, replacing any previous one, and return
+        it. Only the meeting's own row is written; other meetings' expired rows
+        are left to the `purge_otps` command.
+        """
+        from meet.models import MeetingOTP
+
+        code = _new_code()
+        now = timezone.now()
+        MeetingOTP.objects.update_or_create(meeting_uid=meeting_uid, defaults={
+            'digest': _digest(meeting_uid, code),
+            'attempts': 0,
+            'expires_at': now + timedelta(seconds=settings.OTP_TTL_SECONDS),
+        })
+        return code
+
+    def verify(self, meeting_uid, code):
+        """
+        True if `code` is the meeting's current OTP; the code is then used up.
+        Raises OTPAttemptsExceeded once OTP_MAX_ATTEMPTS codes have been tried.
+        """
+        from meet.models import MeetingOTP
+
+        otps = MeetingOTP.objects.filter(meeting_uid=meeting_uid, expires_at__gt=timezone.now())
+        if not otps.filter(attempts__lt=settings.OTP_MAX_ATTEMPTS).update(attempts=F('attempts') + 1):
+            if otps.delete()[0]:
+                raise OTPAttemptsExceeded()
+            return False  # no code issued, or it expired
+        stored = otps.values_list('digest', flat=True).first()
+        if stored is None or not hmac.compare_digest(stored, _digest(meeting_uid, str(code))):
+            return False
+        # Only one of two parallel requests with the right code gets to delete it.
+        return otps.filter(digest=stored).delete()[0] > 0
+
+
+class CacheOTPStore:
+    """
+    Keeps one OTP per meeting in a Django cache (OTP_CACHE_ALIAS), for sites
+    that would rather keep codes out of the database.
+
+    The attempt limit relies on cache.incr() being atomic, which holds for
+    redis and memcached but not for the database or file caches: use one of
+    the former, shared by every worker.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.OTP_CACHE_ALIAS]
+
+    @staticmethod
+    def _keys(meeting_uid):
+        return f'meet:otp:{meeting_uid}', f'meet:otp_attempts:{meeting_uid}'
+
+    def issue(self, meeting_uid):
+        """Create a new code for the meeting, replacing any previous one, and return it."""
+        code = _new_code()
+        code_key, attempts_key = self._keys(meeting_uid)
+        self.cache.set_many({code_key: _digest(meeting_uid, code), attempts_key: 0}, settings.OTP_TTL_SECONDS)
+        return code
+
+    def verify(self, meeting_uid, code):
+        """
+        True if `code` is the meeting's current OTP; the code is then used up.
+        Raises OTPAttemptsExceeded once OTP_MAX_ATTEMPTS codes have been tried.
+        """
+        code_key, attempts_key = self._keys(meeting_uid)
+        try:
+            # Counted before comparing, so with an atomic incr parallel guesses cannot slip past the limit.
+            attempts = self.cache.incr(attempts_key)
+        except ValueError:
+            return False  # no code issued, or it expired
+        if attempts > settings.OTP_MAX_ATTEMPTS:
+            self.cache.delete_many([code_key, attempts_key])
+            raise OTPAttemptsExceeded()
+
+        stored = self.cache.get(code_key)
+        if stored is None or not hmac.compare_digest(stored, _digest(meeting_uid, str(code))):
+            return False
+        self.cache.delete_many([code_key, attempts_key])
+        return True
+
+
+def get_otp_store():
+    return import_string(settings.OTP_STORE)()
@@ -0,0 +1,145 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class MeetingCursorPagination(BasePagination):
+    """
+    Keyset pagination over (start_time, id), newest first.
+
+    Each page is a single indexed range query, so the cost of fetching a page
+    does not grow with how deep into the table the client has scrolled.
+    """
+    ordering = ('-start_time', '-id')
+    cursor_query_param = 'cursor'
+    page_size = getattr(settings, 'MEET_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._set_page(list(self._page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of paginate_queryset, for views running on the event loop."""
+        return self._set_page([row async for row in self._page_queryset(queryset, request)])
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = self.after(queryset, *position)
+
+        # Fetch one extra row to learn whether a next page exists.
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, results):
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    @staticmethod
+    def after(queryset, start_time, pk):
+        """Rows strictly after (start_time, pk) in descending order."""
+        return queryset.filter(Q(start_time__lt=start_time) | Q(start_time=start_time, id__lt=pk))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(*self.position(self.page[-1])))
+
+    @staticmethod
+    def position(row):
+        """The ordering key of a row; pages hold model instances or, for the list endpoint, `.values()` rows."""
+        return (row['start_time'], row['id']) if isinstance(row, dict) else (row.start_time, row.pk)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    @staticmethod
+    def encode_cursor(start_time, pk):
+        payload = json.dumps({'t': start_time.isoformat(), 'i': pk}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            return self.parse_cursor(payload)
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def parse_cursor(payload):
+        return datetime.fromisoformat(payload['t']), int(payload['i'])
+
+
+class MeetingSearchPagination(MeetingCursorPagination):
+    """
+    Keyset pagination over (rank, id), best match first, for querysets from
+    MeetingQuerySet.search. The rank is part of the cursor, so later pages
+    continue from the last row shown rather than from an offset.
+    """
+    ordering = ('-rank', '-id')
+
+    @staticmethod
+    def after(queryset, rank, pk):
+        return queryset.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=pk))
+
+    @staticmethod
+    def position(row):
+        return row['rank'], row['id']
+
+    @staticmethod
+    def encode_cursor(rank, pk):
+        payload = json.dumps({'r': rank, 'i': pk}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def parse_cursor(payload):
+        return float(payload['r']), int(payload['i'])
+
+
+class MeetingCalendarPagination(MeetingCursorPagination):
+    """Keyset pagination over (start_time, id), oldest first, for the calendar."""
+    ordering = ('start_time', 'id')
+
+    @staticmethod
+    def after(queryset, start_time, pk):
+        """Rows strictly after (start_time, pk) in ascending order."""
+        return queryset.filter(Q(start_time__gt=start_time) | Q(start_time=start_time, id__gt=pk))
@@ -0,0 +1,67 @@
+"""
+Full-text search over meeting title, description and location.
+
+MySQL answers it from a FULLTEXT index on the three columns and SQLite from an
+FTS5 table (meet_meeting_fts) that triggers keep in step with meet_meeting;
+both are created by migration 0010. Other databases fall back to icontains.
+
+Every term must match, as a word prefix, in at least one of the columns.
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+TABLE = 'meet_meeting'
+FTS_TABLE = 'meet_meeting_fts'
+FULLTEXT_INDEX = 'meeting_fulltext_idx'
+COLUMNS = ('title', 'description', 'location')
+MAX_TERMS = 10
+
+
+def search_terms(query):
+    """The words of a user's query, lower-cased and stripped of search operators."""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def _fulltext(using, terms):
+    """
+    (SQL selecting the ids of matching meetings, SQL for their relevance, query
+    parameter) for the database's full-text index, or None when it has none.
+    """
+    vendor = connections[using].vendor
+    if vendor == 'mysql':
+        columns = ', '.join(f'`{TABLE}`.`{column}`' for column in COLUMNS)
+        match = f"MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)"
+        return f"SELECT `id` FROM `{TABLE}` WHERE {match}", match, ' '.join(f'+{term}*' for term in terms)
+    if vendor == 'sqlite':
+        match = f'"{FTS_TABLE}" MATCH %s'
+        # bm25() is lower for better matches and can only be read inside a MATCH query.
+        return (
+            f'SELECT rowid FROM "{FTS_TABLE}" WHERE {match}',
+            f'SELECT -bm25("{FTS_TABLE}") FROM "{FTS_TABLE}" WHERE {match} AND rowid = "{TABLE}"."id"',
+            ' '.join(f'"{term}"*' for term in terms),
+        )
+    return None
+
+
+def matching(terms, using='default'):
+    """A Q object selecting the meetings that match every term."""
+    fulltext = _fulltext(using, terms)
+    if fulltext is None:
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(description__icontains=term) | Q(location__icontains=term)
+        return condition
+    ids, _, expression = fulltext
+    return Q(pk__in=RawSQL(ids, [expression]))
+
+
+def relevance(terms, using='default'):
+    """An expression for how well a matching meeting fits `terms`; higher is better."""
+    fulltext = _fulltext(using, terms)
+    if fulltext is None:
+        return Value(0.0, output_field=FloatField())
+    _, rank, expression = fulltext
+    return RawSQL(rank, [expression], output_field=FloatField())
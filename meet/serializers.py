@@ -1,20 +1,50 @@
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from meet.models import Meeting, MeetingPhoto
+from meet.models import Meeting, MeetingPhoto, PhotoUploadSession
 from account.serializers import UserSerializer
+from meet.choices import STATUS_CHOICES, MEETING_TYPE_CHOICES, VALID_STATUS_CHANGE
+from meet.search import search_terms
+from base.perf import timed
 
 class MeetingPhotoSerializer(serializers.ModelSerializer):
+    # The original upload keeps its EXIF (camera, GPS position); clients get the stripped renditions.
     class Meta:
         model = MeetingPhoto
-        fields = '__all__'
+        exclude = ['blob', 'file']
 
 class MeetingSerializer(serializers.ModelSerializer):
+    """
+    Pass `fields` and/or `expand` (see MeetingFieldsSerializer) for a sparse
+    shape: only the listed fields, with `created_by` as a user id and `photos`
+    left out unless they are expanded. With neither, every field is returned
+    and both relations are nested.
+    """
     photos = MeetingPhotoSerializer(many=True, read_only=True)
     next_status = serializers.SerializerMethodField()
     created_by = UserSerializer(read_only=True)
     
     class Meta:
         model = Meeting
-        fields = ['photos', 'uid', 'created_at', 'updated_at', 'title', 'description', 'location', 'meeting_type', 'start_time', 'duration_minutes', 'status', 'next_status', 'created_by','recipient_emails']
+        fields = ['photos', 'uid', 'created_at', 'updated_at', 'title', 'description', 'location', 'meeting_type', 'start_time', 'duration_minutes', 'end_time', 'status', 'overrun_at', 'next_status', 'created_by','recipient_emails']
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None and expand is None:
+            return
+        expand = set(expand or ())
+        keep = set(fields or self.fields) | expand
+        if 'created_by' not in expand:
+            self.fields['created_by'] = serializers.PrimaryKeyRelatedField(read_only=True)
+        if 'photos' not in expand:
+            keep.discard('photos')
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+    @timed('serialize')
+    def to_representation(self, instance):
+        return super().to_representation(instance)
 
     def create(self, validated_data, user):
         meeting = Meeting.objects.create(**validated_data, created_by=user)
@@ -29,7 +59,7 @@ class MeetingCreatSerializer(serializers.Serializer):
     description = serializers.CharField(max_length=100)
     location = serializers.CharField(max_length=100)
     start_time = serializers.DateTimeField()
-    duration_minutes = serializers.IntegerField()
+    duration_minutes = serializers.IntegerField(min_value=1, max_value=settings.MEET_MAX_DURATION_MINUTES)
     meeting_type = serializers.CharField(max_length=100)
     recipient_emails = serializers.ListField(child=serializers.EmailField())
 
@@ -45,4 +75,240 @@ class MeetingCreatSerializer(serializers.Serializer):
 
     def create(self, validated_data, user):
         meeting = Meeting.objects.create(**validated_data, created_by=user)
-        return meeting
\ No newline at end of file
+        return meeting
+
+    def update(self, instance, validated_data):
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        instance.save()
+        return instance
+
+class MeetingFilterSerializer(serializers.Serializer):
+    """
+    Validates the list query string and applies it to a Meeting queryset.
+    `status` and `meeting_type` accept a comma separated list of values.
+    """
+    status = serializers.CharField(required=False)
+    meeting_type = serializers.CharField(required=False)
+    created_by = serializers.IntegerField(required=False)
+    start_after = serializers.DateTimeField(required=False)
+    start_before = serializers.DateTimeField(required=False)
+
+    def _validate_choices(self, value, choices):
+        values = [v.strip() for v in value.split(',') if v.strip()]
+        allowed = {key for key, _ in choices}
+        invalid = [v for v in values if v not in allowed]
+        if invalid:
+            raise serializers.ValidationError(f"Invalid value(s): {', '.join(invalid)}")
+        return values
+
+    def validate_status(self, value):
+        return self._validate_choices(value, STATUS_CHOICES)
+
+    def validate_meeting_type(self, value):
+        return self._validate_choices(value, MEETING_TYPE_CHOICES)
+
+    def validate(self, attrs):
+        start_after = attrs.get('start_after')
+        start_before = attrs.get('start_before')
+        if start_after and start_before and start_after > start_before:
+            raise serializers.ValidationError("start_after must be before start_before")
+        return attrs
+
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        if data.get('status'):
+            queryset = queryset.filter(status__in=data['status'])
+        if data.get('meeting_type'):
+            queryset = queryset.filter(meeting_type__in=data['meeting_type'])
+        if 'created_by' in data:
+            queryset = queryset.filter(created_by_id=data['created_by'])
+        if 'start_after' in data:
+            queryset = queryset.filter(start_time__gte=data['start_after'])
+        if 'start_before' in data:
+            queryset = queryset.filter(start_time__lte=data['start_before'])
+        return queryset
+
+
+class MeetingFieldsSerializer(serializers.Serializer):
+    """
+    Validates `?fields=` and `?expand=` for the list and retrieve endpoints and
+    tells the view which relations it has to load. Both take a comma separated
+    list; `expand` accepts `photos` and `created_by`.
+    """
+    expandable = ('photos', 'created_by')
+
+    fields = serializers.CharField(required=False)
+    expand = serializers.CharField(required=False)
+
+    def _validate_names(self, value, allowed):
+        names = [v.strip() for v in value.split(',') if v.strip()]
+        invalid = [v for v in names if v not in allowed]
+        if invalid:
+            raise serializers.ValidationError(f"Invalid value(s): {', '.join(invalid)}")
+        return names
+
+    def validate_fields(self, value):
+        return self._validate_names(value, MeetingSerializer.Meta.fields)
+
+    def validate_expand(self, value):
+        return self._validate_names(value, self.expandable)
+
+    def expands(self, name):
+        """Whether the response embeds the `name` relation (always, for the full shape)."""
+        return not self.validated_data or name in self.validated_data.get('expand', ())
+
+    def prepare_queryset(self, queryset):
+        if self.expands('created_by'):
+            queryset = queryset.select_related('created_by')
+        return queryset
+
+    def serializer_kwargs(self):
+        if not self.validated_data:
+            return {}
+        return {'fields': self.validated_data.get('fields'), 'expand': self.validated_data.get('expand', [])}
+
+
+class MeetingWindowSerializer(serializers.Serializer):
+    """Validates the `from` / `to` query params of the calendar endpoint."""
+
+    def get_fields(self):
+        # `from` is a keyword, so the fields cannot be declared as class attributes.
+        return {'from': serializers.DateTimeField(), 'to': serializers.DateTimeField()}
+
+    def validate(self, attrs):
+        if attrs['from'] >= attrs['to']:
+            raise serializers.ValidationError("from must be before to")
+        if attrs['to'] - attrs['from'] > timedelta(days=settings.MEET_CALENDAR_MAX_DAYS):
+            raise serializers.ValidationError(f"The window cannot be longer than {settings.MEET_CALENDAR_MAX_DAYS} days")
+        return attrs
+
+
+class PhotoUploadSerializer(serializers.Serializer):
+    """Checks that one file of a photo upload is an image Pillow can read."""
+    file = serializers.ImageField()
+
+
+class PhotoUploadSessionSerializer(serializers.ModelSerializer):
+    """Starts a resumable upload (`filename`, `size`) and reports its progress."""
+    upload_id = serializers.UUIDField(source='uid', read_only=True)
+    photo_id = serializers.PrimaryKeyRelatedField(source='photo', read_only=True)
+
+    class Meta:
+        model = PhotoUploadSession
+        fields = ['upload_id', 'filename', 'size', 'offset', 'status', 'expires_at', 'photo_id']
+        read_only_fields = ['offset', 'status', 'expires_at']
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.PHOTO_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Size must be between 1 and {settings.PHOTO_UPLOAD_MAX_SIZE} bytes")
+        return value
+
+
+class MeetingSearchSerializer(serializers.Serializer):
+    """Validates the `q` query param of the search endpoint and splits it into search terms."""
+    q = serializers.CharField(max_length=200)
+
+    def validate_q(self, value):
+        terms = search_terms(value)
+        if not terms:
+            raise serializers.ValidationError("Enter at least one word to search for")
+        return terms
+
+
+class MeetingBulkTransitionSerializer(serializers.Serializer):
+    # Completing a meeting needs its OTP, so it is not offered in bulk.
+    uids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+    status = serializers.ChoiceField(choices=['in_progress', 'cancelled'])
+
+    def validate_uids(self, value):
+        uids = list(dict.fromkeys(value))
+        if len(uids) > settings.MEET_BULK_TRANSITION_MAX_ITEMS:
+            raise serializers.ValidationError(f"At most {settings.MEET_BULK_TRANSITION_MAX_ITEMS} meetings per request")
+        return uids
+
+
+def _value_converter(model, name, field):
+    """How a serializer field turns a `.values()` value into its representation."""
+    if isinstance(field, serializers.FileField):
+        storage = model._meta.get_field(name).storage
+        return lambda value: storage.url(value) if value else None
+    if isinstance(field, serializers.DateTimeField) and settings.USE_TZ and not hasattr(field, 'timezone'):
+        # Look the current time zone up once rather than for every value.
+        field.timezone = timezone.get_current_timezone()
+    if isinstance(field, (serializers.DateTimeField, serializers.UUIDField)):
+        convert = field.to_representation
+        return lambda value: None if value is None else convert(value)
+    # Integer, char, choice, boolean, JSON and primary key fields pass the stored value through.
+    return None
+
+
+class MeetingValuesSerializer:
+    """
+    Read-only fast path for MeetingSerializer on list responses.
+
+    Builds plain dicts from `.values(*self.columns)` rows and loads the photos
+    of all rows in one query, skipping DRF's per-field machinery. Takes the
+    same `fields` / `expand` arguments and renders the same JSON: the field
+    list, nesting and value formats are read from MeetingSerializer and
+    MeetingPhotoSerializer, so the two stay in step.
+    """
+    meeting_columns = (
+        'id', 'uid', 'created_at', 'updated_at', 'title', 'description', 'location', 'meeting_type',
+        'start_time', 'duration_minutes', 'end_time', 'status', 'overrun_at', 'created_by', 'recipient_emails',
+    )
+    creator_columns = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'is_superuser')
+
+    def __init__(self, fields=None, expand=None):
+        template = MeetingSerializer(fields=fields, expand=expand)
+        self.nest_creator = isinstance(template.fields.get('created_by'), UserSerializer)
+        self.include_photos = 'photos' in template.fields
+        self.columns = self.meeting_columns
+        if self.nest_creator:
+            self.columns += tuple(f'created_by__{name}' for name in self.creator_columns)
+
+        self.getters = []
+        for name, field in template.fields.items():
+            if name == 'photos':
+                getter = lambda row, photos: photos.get(row['id'], [])
+            elif name == 'next_status':
+                getter = lambda row, photos: VALID_STATUS_CHANGE.get(row['status'], None)
+            elif name == 'created_by' and self.nest_creator:
+                getter = lambda row, photos: self.creator(row)
+            else:
+                convert = _value_converter(Meeting, name, field)
+                getter = (lambda row, photos, name=name: row[name]) if convert is None else \
+                    (lambda row, photos, name=name, convert=convert: convert(row[name]))
+            self.getters.append((name, getter))
+
+        photo_fields = MeetingPhotoSerializer().fields
+        self.photo_columns = tuple(photo_fields)
+        self.photo_converters = [
+            (name, convert) for name, field in photo_fields.items()
+            if (convert := _value_converter(MeetingPhoto, name, field)) is not None
+        ]
+
+    @staticmethod
+    def creator(row):
+        first_name, last_name = row['created_by__first_name'], row['created_by__last_name']
+        return {
+            'id': row['created_by'],
+            'full_name': f"{first_name} {last_name}".strip(),
+            'username': row['created_by__username'],
+            'email': row['created_by__email'],
+            'role': 1 if row['created_by__is_superuser'] or row['created_by__is_staff'] else 0,
+        }
+
+    def photos_by_meeting(self, meeting_ids):
+        # Same filter as prefetch_related('photos'), so photos come back in the same order.
+        photos = {}
+        for photo in MeetingPhoto.objects.filter(meeting__in=meeting_ids).values(*self.photo_columns):
+            for name, convert in self.photo_converters:
+                photo[name] = convert(photo[name])
+            photos.setdefault(photo['meeting'], []).append(photo)
+        return photos
+
+    @timed('serialize')
+    def to_representation(self, rows):
+        photos = self.photos_by_meeting([row['id'] for row in rows]) if self.include_photos and rows else {}
+        return [{name: getter(row, photos) for name, getter in self.getters} for row in rows]
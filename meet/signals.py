@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from meet.models import MeetingPhoto, PhotoBlob, PhotoUploadSession
+
+
+@receiver(post_delete, sender=MeetingPhoto)
+def photo_deleted(sender, instance, **kwargs):
+    # Also runs for photos removed with their meeting; the blob itself is left to `gc_photo_blobs`.
+    if instance.blob_id is not None:
+        PhotoBlob.release(instance.blob_id)
+
+
+@receiver(post_delete, sender=PhotoUploadSession)
+def upload_session_deleted(sender, instance, **kwargs):
+    # Also runs for sessions removed with their meeting or by `gc_photo_blobs`; the file goes once the row is gone for good.
+    transaction.on_commit(instance.remove_file)
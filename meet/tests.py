@@ -1,3 +1,1195 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import shutil
+import tempfile
+import hashlib
+import json
+import uuid
+from unittest import mock
+from datetime import timedelta
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.cache import get_staff_emails
+from base.models import OutboxEmail
+from meet import async_views, views
+from meet.models import Meeting, MeetingOTP, MeetingPhoto, PhotoBlob, PhotoUploadSession
+from meet.otp import OTPAttemptsExceeded, get_otp_store
+from meet.uploads import upload_pool
+from meet.serializers import MeetingCreatSerializer, MeetingSerializer, MeetingValuesSerializer
+
+
+def make_image(size=(2000, 1000), orientation=None, fmt='JPEG', name='photo.jpg'):
+    image = Image.new('RGB', size, (200, 30, 30))
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+def sent_otp(meeting):
+    """The code from the most recent OTP email queued for `meeting`."""
+    email = OutboxEmail.objects.filter(subject__startswith='Your Meeting Verification Code').latest('id')
+    return email.subject.rsplit(' ', 1)[-1]
+
+
+def make_meeting(user, **kwargs):
+    defaults = {
+        'title': 'Weekly sync',
+        'location': 'Office',
+        'start_time': timezone.now() + timedelta(days=1),
+        'duration_minutes': 30,
+        'created_by': user,
+        'recipient_emails': ['guest@example.com'],
+    }
+    defaults.update(kwargs)
+    return Meeting.objects.create(**defaults)
+
+
+class TempMediaMixin:
+    """Stores files written by a test, including upload sessions, under a temporary MEDIA_ROOT."""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        media = override_settings(MEDIA_ROOT=self.media_root, PHOTO_UPLOAD_SESSION_DIR=os.path.join(self.media_root, 'sessions'))
+        media.enable()
+        self.addCleanup(media.disable)
+
+
+class MeetingListTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+
+    def test_pages_follow_the_cursor_without_gaps(self):
+        base = timezone.now()
+        # Two meetings share a start time so the id tie-breaker is exercised.
+        created = [make_meeting(self.user, start_time=base + timedelta(hours=i // 2)) for i in range(7)]
+
+        seen = []
+        url = '/api/meet/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(item['uid'] for item in response.data['results'])
+            url = response.data['next']
+
+        expected = sorted(created, key=lambda m: (m.start_time, m.id), reverse=True)
+        self.assertEqual(seen, [str(m.uid) for m in expected])
+
+    def test_filters(self):
+        other = User.objects.create_user('other', 'other@example.com', 'pass')
+        now = timezone.now()
+        match = make_meeting(self.user, status='in_progress', meeting_type='online', start_time=now + timedelta(days=2))
+        make_meeting(self.user, status='cancelled', meeting_type='online', start_time=now + timedelta(days=2))
+        make_meeting(other, status='in_progress', meeting_type='online', start_time=now + timedelta(days=2))
+        make_meeting(self.user, status='in_progress', meeting_type='online', start_time=now + timedelta(days=9))
+
+        response = self.client.get('/api/meet/', {
+            'status': 'scheduled,in_progress',
+            'meeting_type': 'online',
+            'created_by': self.user.id,
+            'start_after': (now + timedelta(days=1)).isoformat(),
+            'start_before': (now + timedelta(days=3)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([m['uid'] for m in response.data['results']], [str(match.uid)])
+
+    def test_invalid_filter_and_cursor(self):
+        self.assertEqual(self.client.get('/api/meet/', {'status': 'done'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get('/api/meet/', {'cursor': 'garbage'}).status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(OTP_STORE='meet.otp.CacheOTPStore', OTP_CACHE_ALIAS='default')
+class MeetingQueryCountTests(APITestCase):
+    """
+    The number of queries per request must not depend on how many meetings,
+    photos or users exist. Counts exclude authentication (force_authenticate)
+    and include the savepoint statements that transaction.atomic issues inside
+    a TestCase. OTPs are kept in memory here so only the app's own tables count.
+    """
+    sizes = (1, 100, 10_000)
+
+    def setUp(self):
+        cache.clear()  # throttle buckets
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        get_staff_emails()  # warm the recipient cache so every request below is a cache hit
+        self.client.force_authenticate(self.user)
+
+    def populate(self, total):
+        """Top the table up to `total` meetings, each with one photo."""
+        missing = total - Meeting.objects.count()
+        start = timezone.now() + timedelta(days=1)
+        Meeting.objects.bulk_create([
+            Meeting(title=f'Meeting {i}', location='Office', start_time=start + timedelta(minutes=i),
+                    duration_minutes=30, created_by=self.user, recipient_emails=['guest@example.com'])
+            for i in range(missing)
+        ], batch_size=1000)
+        MeetingPhoto.objects.bulk_create([
+            MeetingPhoto(meeting=meeting, file='meeting_photos/photo.jpg', uploaded_by=self.user)
+            for meeting in Meeting.objects.filter(photos__isnull=True)
+        ], batch_size=1000)
+
+    def test_query_counts_are_constant(self):
+        for total in self.sizes:
+            self.populate(total)
+            with self.subTest(rows=total):
+                # page, photo timestamps for the ETag, photos
+                with self.assertNumQueries(3):
+                    response = self.client.get('/api/meet/')
+                self.assertEqual(len(response.data['results']), min(total, 50))
+
+                meeting = make_meeting(self.user)
+                MeetingPhoto.objects.create(meeting=meeting, file='meeting_photos/photo.jpg', uploaded_by=self.user)
+                # meeting with photo timestamps, photos
+                with self.assertNumQueries(2):
+                    response = self.client.get(f'/api/meet/{meeting.uid}/')
+                # unchanged: meeting with photo timestamps only
+                with self.assertNumQueries(1):
+                    self.client.get(f'/api/meet/{meeting.uid}/', HTTP_IF_NONE_MATCH=response['ETag'])
+                # meeting + photos, savepoint, update, outbox insert, release
+                with self.assertNumQueries(6):
+                    self.client.post(f'/api/meet/{meeting.uid}/mark-in-progress/')
+                # meeting + photos, outbox insert
+                with self.assertNumQueries(3):
+                    self.client.post(f'/api/meet/{meeting.uid}/mark-completed/')
+                otp_code = sent_otp(meeting)
+                # meeting + photos, savepoint, update, outbox insert, release
+                with self.assertNumQueries(6):
+                    self.client.post(f'/api/meet/{meeting.uid}/mark-completed/', {'otp_code': otp_code})
+
+                meeting = make_meeting(self.user)
+                # meeting + photos, savepoint, update, outbox insert, release
+                with self.assertNumQueries(6):
+                    self.client.post(f'/api/meet/{meeting.uid}/mark-cancelled/')
+
+
+class MeetingTransitionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+    def test_only_valid_moves_are_applied(self):
+        meeting = make_meeting(self.user, status='cancelled')
+        self.assertFalse(meeting.transition('in_progress'))
+        self.assertEqual(Meeting.objects.get(pk=meeting.pk).status, 'cancelled')
+
+        response = self.client.post(f'/api/meet/{meeting.uid}/mark-in-progress/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stale_copy_loses_the_race(self):
+        meeting = make_meeting(self.user)
+        first, second = Meeting.objects.get(pk=meeting.pk), Meeting.objects.get(pk=meeting.pk)
+
+        self.assertTrue(first.status_update_cancelled(self.user))
+        self.assertFalse(second.status_update_in_progress())
+        self.assertEqual(second.status, 'cancelled')
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_queryset_transition_skips_ineligible_rows(self):
+        make_meeting(self.user)
+        make_meeting(self.user, status='in_progress')
+        make_meeting(self.user, status='completed')
+        self.assertEqual(Meeting.objects.all().transition('cancelled'), 2)
+        self.assertEqual(Meeting.objects.filter(status='cancelled').count(), 2)
+
+
+class PhotoProcessingTests(TempMediaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.meeting = make_meeting(self.user)
+
+    def test_worker_builds_upright_renditions_without_exif(self):
+        # Orientation 6: the camera was rotated, so the upright photo is portrait.
+        response = self.client.post(f'/api/meet/{self.meeting.uid}/upload-photo/',
+                                    {'file': make_image(orientation=6)}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        photo = MeetingPhoto.objects.get()
+        self.assertEqual(photo.processing_status, 'pending')
+
+        call_command('process_photos', once=True)
+
+        photo.refresh_from_db()
+        self.assertEqual(photo.processing_status, 'ready')
+        self.assertEqual((photo.width, photo.height), (1000, 2000))
+        self.assertEqual(photo.file_size, photo.file.size)
+        for name, bound in (('thumbnail', 320), ('medium', 1280)):
+            rendition = getattr(photo, name)
+            self.assertEqual(getattr(photo, f'{name}_size'), rendition.size)
+            with Image.open(rendition) as image:
+                self.assertEqual(image.format, 'WEBP')
+                self.assertEqual(max(image.size), bound)
+                self.assertLess(image.width, image.height)
+                self.assertFalse(image.getexif())
+
+        data = self.client.get(f'/api/meet/{self.meeting.uid}/').data['photos'][0]
+        self.assertEqual(data['thumbnail'], photo.thumbnail.url)
+        self.assertEqual(data['medium'], photo.medium.url)
+        # The original still has its EXIF, so its URL is not handed out.
+        self.assertNotIn('file', data)
+        self.assertNotIn('file', self.client.get('/api/meet/', {'expand': 'photos'}).data['results'][0]['photos'][0])
+
+    def test_unreadable_upload_is_marked_failed(self):
+        MeetingPhoto.objects.create(meeting=self.meeting, uploaded_by=self.user,
+                                    file=SimpleUploadedFile('broken.jpg', b'not an image'))
+        call_command('process_photos', once=True)
+        self.assertEqual(MeetingPhoto.objects.get().processing_status, 'failed')
+
+
+class PhotoBlobTests(TempMediaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.meeting = make_meeting(self.user)
+        self.url = f'/api/meet/{self.meeting.uid}/upload-photo/'
+
+    def upload(self, image):
+        response = self.client.post(self.url, {'file': image}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return MeetingPhoto.objects.get(pk=response.data['photo_id'])
+
+    def stored_files(self):
+        return sorted(os.path.relpath(os.path.join(root, name), self.media_root)
+                      for root, _, names in os.walk(self.media_root) for name in names)
+
+    def test_duplicate_uploads_share_one_stored_file(self):
+        image = make_image()
+        content = image.read()
+        first = self.upload(make_image(name='a.jpg'))
+        # Big enough to go through the temporary file handler.
+        with override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=10):
+            second = self.upload(make_image(name='b.jpg'))
+        other = self.upload(make_image(size=(10, 10)))
+
+        blob = PhotoBlob.objects.get(sha256=hashlib.sha256(content).hexdigest())
+        self.assertEqual((first.blob, second.blob, blob.ref_count), (blob, blob, 2))
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(first.file.name, f'meeting_photos/blobs/{blob.sha256[:2]}/{blob.sha256}.jpg')
+        self.assertNotEqual(other.blob, blob)
+        self.assertEqual(len(self.stored_files()), 2)
+
+        call_command('process_photos', once=True)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(second.processing_status, 'ready')
+        self.assertEqual((first.thumbnail, first.medium), (second.thumbnail, second.medium))
+        blob.refresh_from_db()
+        self.assertEqual(blob.renditions['thumbnail'], first.thumbnail.name)
+
+        # A later upload of the same content reuses the renditions recorded on the blob.
+        third = self.upload(make_image())
+        call_command('process_photos', once=True)
+        third.refresh_from_db()
+        self.assertEqual(third.medium, first.medium)
+        self.assertEqual(len(self.stored_files()), 6)
+
+    def test_gc_deletes_blobs_without_references(self):
+        first = self.upload(make_image())
+        second = self.upload(make_image())
+        blob = first.blob
+        self.assertEqual(second.blob, blob)
+        call_command('process_photos', once=True)
+        self.assertEqual(len(self.stored_files()), 3)
+
+        first.delete()
+        call_command('gc_photo_blobs', stdout=io.StringIO())
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(blob.file.storage.exists(blob.file.name))
+
+        self.meeting.delete()
+        self.assertEqual(PhotoBlob.objects.get().ref_count, 0)
+        out = io.StringIO()
+        call_command('gc_photo_blobs', stdout=out)
+        self.assertEqual(out.getvalue().split()[0], 'deleted=1')
+        self.assertFalse(PhotoBlob.objects.exists())
+        # The renditions went with the blob.
+        self.assertEqual(self.stored_files(), [])
+
+    def test_files_of_a_failed_store_are_deleted(self):
+        with mock.patch.object(MeetingPhoto.objects, 'create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                MeetingPhoto.store(self.meeting, make_image(), self.user)
+        with mock.patch.object(MeetingPhoto.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                MeetingPhoto.store_many(self.meeting, [make_image(), make_image(size=(10, 10))], self.user, upload_pool())
+        self.assertFalse(PhotoBlob.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_recount_repairs_drifted_counts(self):
+        photo = self.upload(make_image())
+        PhotoBlob.objects.update(ref_count=0)
+        call_command('gc_photo_blobs', stdout=io.StringIO())
+        self.assertTrue(PhotoBlob.objects.exists())
+        call_command('gc_photo_blobs', recount=True, stdout=io.StringIO())
+        self.assertEqual(PhotoBlob.objects.get().ref_count, 1)
+        self.assertEqual(photo.blob.photos.get(), photo)
+
+
+class UploadSessionTests(TempMediaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.meeting = make_meeting(self.user)
+        self.content = make_image().read()
+
+    def start(self):
+        response = self.client.post(f'/api/meet/{self.meeting.uid}/upload-sessions/',
+                                    {'filename': 'photo.jpg', 'size': len(self.content)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return f"/api/meet/{self.meeting.uid}/upload-sessions/{response.data['data']['upload_id']}/"
+
+    def put(self, url, offset, data):
+        return self.client.put(url, data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_chunks_are_appended_and_committed_once(self):
+        url = self.start()
+        middle = len(self.content) // 2
+        self.assertEqual(self.put(url, 0, self.content[:middle])['Upload-Offset'], str(middle))
+
+        # A chunk sent for the wrong offset is refused with the right one.
+        response = self.put(url, 0, self.content[:middle])
+        self.assertEqual((response.status_code, response['Upload-Offset']), (status.HTTP_409_CONFLICT, str(middle)))
+        self.assertEqual(self.client.get(url).data['data']['offset'], middle)
+        self.assertEqual(self.client.post(url + 'commit/').status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.put(url, middle, self.content[middle:] + b'extra').status_code,
+                         status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        self.put(url, middle, self.content[middle:])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url + 'commit/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(url + 'commit/').data['photo_id'], response.data['photo_id'])
+
+        photo = MeetingPhoto.objects.get()
+        self.assertEqual(photo.blob.sha256, hashlib.sha256(self.content).hexdigest())
+        with photo.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+        self.assertEqual(os.listdir(settings.PHOTO_UPLOAD_SESSION_DIR), [])
+
+    def test_commit_refuses_files_that_are_not_images(self):
+        content = b'<script>alert(1)</script>'
+        response = self.client.post(f'/api/meet/{self.meeting.uid}/upload-sessions/',
+                                    {'filename': 'x.html', 'size': len(content)}, format='json')
+        url = f"/api/meet/{self.meeting.uid}/upload-sessions/{response.data['data']['upload_id']}/"
+        self.put(url, 0, content)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url + 'commit/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PhotoUploadSession.objects.exists())
+        self.assertFalse(PhotoBlob.objects.exists())
+        self.assertEqual(os.listdir(settings.PHOTO_UPLOAD_SESSION_DIR), [])
+
+    def test_stored_extension_follows_the_image_format(self):
+        self.content = make_image(fmt='PNG').read()
+        url = self.start()  # named photo.jpg
+        self.put(url, 0, self.content)
+        self.assertEqual(self.client.post(url + 'commit/').status_code, status.HTTP_201_CREATED)
+        self.assertTrue(MeetingPhoto.objects.get().file.name.endswith('.png'))
+
+    def test_bytes_before_a_dropped_connection_are_kept(self):
+        url = self.start()
+        session = PhotoUploadSession.objects.get()
+
+        class Dropped(io.BytesIO):
+            def read(self, size=-1):
+                data = super().read(min(size, 100))
+                if not data:
+                    raise OSError('connection reset')
+                return data
+
+        with self.assertRaises(OSError):
+            session.append(0, Dropped(self.content[:250]), chunk_size=100)
+        response = self.client.get(url)
+        self.assertEqual(response['Upload-Offset'], '250')
+        self.put(url, 250, self.content[250:])
+        self.assertEqual(self.client.post(url + 'commit/').status_code, status.HTTP_201_CREATED)
+
+    def test_sessions_are_private_and_expire(self):
+        url = self.start()
+        other = User.objects.create_user('guest', 'guest@example.com', 'pass')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(self.user)
+        PhotoUploadSession.objects.update(expires_at=timezone.now())
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('gc_photo_blobs', stdout=io.StringIO())
+        self.assertFalse(PhotoUploadSession.objects.exists())
+        self.assertEqual(os.listdir(settings.PHOTO_UPLOAD_SESSION_DIR), [])
+
+    def test_files_go_with_deleted_sessions(self):
+        url = self.start()
+        self.put(url, 0, self.content[:100])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(os.listdir(settings.PHOTO_UPLOAD_SESSION_DIR), [])
+
+        # Sessions deleted along with their meeting too.
+        self.start()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f'/api/meet/{self.meeting.uid}/').status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(PhotoUploadSession.objects.exists())
+        self.assertEqual(os.listdir(settings.PHOTO_UPLOAD_SESSION_DIR), [])
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.meeting = make_meeting(self.user)
+
+    def assertRevalidates(self, url, change):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', first)
+
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again['ETag'], first['ETag'])
+        self.assertEqual(again.content, b'')
+
+        since = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(since.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        change()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_retrieve_changes_with_the_meeting(self):
+        self.assertRevalidates(f'/api/meet/{self.meeting.uid}/', lambda: self.meeting.transition('cancelled'))
+
+    def test_retrieve_changes_when_a_photo_is_added(self):
+        self.assertRevalidates(f'/api/meet/{self.meeting.uid}/', lambda: MeetingPhoto.objects.create(
+            meeting=self.meeting, file='meeting_photos/photo.jpg', uploaded_by=self.user))
+
+    def test_list_changes_when_a_meeting_is_added(self):
+        self.assertRevalidates('/api/meet/', lambda: make_meeting(self.user))
+
+    def test_list_changes_when_a_photo_is_deleted(self):
+        for _ in range(2):
+            MeetingPhoto.objects.create(meeting=self.meeting, file='meeting_photos/photo.jpg', uploaded_by=self.user)
+        self.assertRevalidates('/api/meet/', lambda: MeetingPhoto.objects.order_by('id').first().delete())
+
+    def test_validators_depend_on_the_query(self):
+        make_meeting(self.user, status='cancelled')
+        etag = self.client.get('/api/meet/')['ETag']
+        response = self.client.get('/api/meet/?status=cancelled', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class BulkCreateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass', first_name='Org')
+        User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+    def payload(self, title, hour=0, **kwargs):
+        data = {
+            'title': title,
+            'description': 'Agenda',
+            'location': 'Office',
+            'start_time': (timezone.now() + timedelta(days=1, hours=hour)).isoformat(),
+            'duration_minutes': 30,
+            'meeting_type': 'online',
+            'recipient_emails': ['guest@example.com'],
+        }
+        data.update(kwargs)
+        return data
+
+    def test_valid_items_are_created_and_errors_reported(self):
+        items = [self.payload('First'), self.payload('Broken', recipient_emails=[]), self.payload('Second', hour=1)]
+        response = self.client.post('/api/meet/bulk-create/', items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 1))
+        self.assertEqual([r['status'] for r in response.data['results']], ['created', 'error', 'created'])
+        self.assertIn('non_field_errors', response.data['results'][1]['errors'])
+
+        created = Meeting.objects.get(uid=response.data['results'][2]['uid'])
+        self.assertEqual((created.title, created.created_by), ('Second', self.user))
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.recipients, ['admin@example.com'])
+        self.assertIn('First', email.message)
+        self.assertIn('Second', email.message)
+
+    def test_all_valid_costs_a_fixed_number_of_queries(self):
+        get_staff_emails()
+        # savepoint, organizer lock, longest overlapping meeting, booked meetings, insert, outbox insert, release
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/meet/bulk-create/', [self.payload(f'M{i}', hour=i) for i in range(50)], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Meeting.objects.count(), 50)
+
+    def test_double_bookings_are_reported_per_item(self):
+        existing = make_meeting(self.user, start_time=timezone.now() + timedelta(days=1, minutes=10))
+        items = [self.payload('Clash'), self.payload('Later', hour=2), self.payload('Same slot', hour=2), self.payload('Back to back', hour=2.5)]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/meet/bulk-create/', items, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 2))
+        results = response.data['results']
+        self.assertEqual([r['status'] for r in results], ['error', 'created', 'error', 'created'])
+        self.assertEqual(results[0]['conflicts'], [existing.uid])
+        self.assertEqual(results[2]['conflicts'], [results[1]['uid']])
+        self.assertIn('start_time', results[0]['errors'])
+        self.assertEqual(sorted(Meeting.objects.values_list('title', flat=True)), ['Back to back', 'Later', 'Weekly sync'])
+
+    def test_rejects_bad_batches(self):
+        self.assertEqual(self.client.post('/api/meet/bulk-create/', {'title': 'x'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/api/meet/bulk-create/', [self.payload('x', duration_minutes='long')], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Meeting.objects.exists())
+        with override_settings(MEET_BULK_CREATE_MAX_ITEMS=1):
+            response = self.client.post('/api/meet/bulk-create/', [self.payload('a'), self.payload('b')], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BulkTransitionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('operator', 'operator@example.com', 'pass')
+        User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        self.client.force_authenticate(self.user)
+
+    def test_reports_per_uid_outcomes_and_sends_one_email(self):
+        scheduled = make_meeting(self.user, title='Standup')
+        in_progress = make_meeting(self.user, title='Review', status='in_progress')
+        completed = make_meeting(self.user, title='Retro', status='completed')
+        missing = '00000000-0000-0000-0000-000000000000'
+        get_staff_emails()
+
+        # savepoint, locked read, update, outbox insert, release
+        with self.assertNumQueries(5):
+            response = self.client.post('/api/meet/bulk-transition/', {
+                'uids': [str(scheduled.uid), str(in_progress.uid), str(completed.uid), missing, str(scheduled.uid)],
+                'status': 'cancelled',
+            }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(
+            [(r['result'], r['current_status']) for r in response.data['results']],
+            [('updated', 'cancelled'), ('updated', 'cancelled'), ('invalid_transition', 'completed'), ('not_found', None)],
+        )
+        self.assertEqual(
+            dict(Meeting.objects.values_list('title', 'status')),
+            {'Standup': 'cancelled', 'Review': 'cancelled', 'Retro': 'completed'},
+        )
+        email = OutboxEmail.objects.get()
+        self.assertIn('Standup', email.message)
+        self.assertNotIn('Retro', email.message)
+
+    def test_completion_is_not_offered_in_bulk(self):
+        meeting = make_meeting(self.user)
+        response = self.client.post('/api/meet/bulk-transition/', {'uids': [str(meeting.uid)], 'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_nothing_eligible_sends_no_email(self):
+        meeting = make_meeting(self.user, status='cancelled')
+        response = self.client.post('/api/meet/bulk-transition/', {'uids': [str(meeting.uid)], 'status': 'in_progress'}, format='json')
+        self.assertEqual(response.data['updated'], 0)
+        self.assertFalse(OutboxEmail.objects.exists())
+
+
+class OTPTests(APITestCase):
+    def setUp(self):
+        cache.clear()  # throttle buckets
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.meeting = make_meeting(self.user, status='in_progress')
+        self.url = f'/api/meet/{self.meeting.uid}/mark-completed/'
+
+    def test_valid_code_completes_once(self):
+        self.client.post(self.url)
+        code = sent_otp(self.meeting)
+        self.assertNotIn(code, MeetingOTP.objects.get(meeting_uid=self.meeting.uid).digest)
+
+        response = self.client.post(self.url, {'otp_code': code})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.meeting.refresh_from_db()
+        self.assertEqual((self.meeting.status, self.meeting.is_otp_verified), ('completed', True))
+
+        # The code is used up.
+        self.assertFalse(get_otp_store().verify(self.meeting.uid, code))
+
+    def test_new_code_replaces_the_old_one(self):
+        self.client.post(self.url)
+        old = sent_otp(self.meeting)
+        self.client.post(self.url)
+        self.assertEqual(self.client.post(self.url, {'otp_code': old}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_code_is_rejected(self):
+        with override_settings(OTP_TTL_SECONDS=-1):
+            self.client.post(self.url)
+        response = self.client.post(self.url, {'otp_code': sent_otp(self.meeting)})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_codes_are_purged_by_command(self):
+        store = get_otp_store()
+        with override_settings(OTP_TTL_SECONDS=-1):
+            store.issue(uuid.uuid4())
+            store.issue(uuid.uuid4())
+        # Issuing a code leaves other meetings' rows alone.
+        store.issue(self.meeting.uid)
+        self.assertEqual(MeetingOTP.objects.count(), 3)
+
+        out = io.StringIO()
+        call_command('purge_otps', batch_size=1, stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'deleted=2')
+        self.assertEqual(list(MeetingOTP.objects.values_list('meeting_uid', flat=True)), [self.meeting.uid])
+
+    @override_settings(OTP_MAX_ATTEMPTS=3)
+    def test_attempts_are_capped(self):
+        self.client.post(self.url)
+        code = sent_otp(self.meeting)
+        wrong = '000000' if code != '000000' else '111111'
+        for _ in range(3):
+            self.assertEqual(self.client.post(self.url, {'otp_code': wrong}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(self.url, {'otp_code': code}).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # The code was discarded, so even the right one no longer works.
+        self.assertEqual(self.client.post(self.url, {'otp_code': code}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Meeting.objects.get(pk=self.meeting.pk).status, 'in_progress')
+
+    @override_settings(OTP_MAX_ATTEMPTS=2)
+    def test_attempts_are_counted_in_the_database(self):
+        store = get_otp_store()
+        code = store.issue(self.meeting.uid)
+        wrong = '000000' if code != '000000' else '111111'
+        self.assertFalse(store.verify(self.meeting.uid, wrong))
+        self.assertEqual(MeetingOTP.objects.get(meeting_uid=self.meeting.uid).attempts, 1)
+        # A row another worker has already pushed to the limit refuses the right code too.
+        MeetingOTP.objects.update(attempts=2)
+        with self.assertRaises(OTPAttemptsExceeded):
+            store.verify(self.meeting.uid, code)
+        self.assertFalse(MeetingOTP.objects.exists())
+
+    @override_settings(OTP_STORE='meet.otp.CacheOTPStore', OTP_CACHE_ALIAS='default', OTP_MAX_ATTEMPTS=1)
+    def test_cache_store(self):
+        store = get_otp_store()
+        code = store.issue(self.meeting.uid)
+        self.assertNotIn(code, str(cache.get(f'meet:otp:{self.meeting.uid}')))
+        self.assertTrue(store.verify(self.meeting.uid, code))
+        self.assertFalse(store.verify(self.meeting.uid, code))
+
+
+class AsyncViewTests(APITestCase):
+    """meet.async_views must answer exactly like MeetingViewSet."""
+
+    def setUp(self):
+        cache.clear()  # throttle buckets
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+        User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        self.factory = AsyncRequestFactory()
+        self.auth = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.meeting = make_meeting(self.user)
+        MeetingPhoto.objects.create(meeting=self.meeting, file='meeting_photos/photo.jpg', uploaded_by=self.user)
+
+    def call(self, view, request, **kwargs):
+        return async_to_sync(view)(request, **kwargs)
+
+    def test_reads_match_the_viewset(self):
+        make_meeting(self.user)
+        for path, view, kwargs in [
+            ('/api/meet/?page_size=1', async_views.meeting_list, {}),
+            (f'/api/meet/{self.meeting.uid}/', async_views.meeting_detail, {'uid': self.meeting.uid}),
+        ]:
+            with self.subTest(path=path):
+                expected = self.client.get(path)
+                response = self.call(view, self.factory.get(path, headers=self.auth), **kwargs)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(json.loads(response.content), expected.json())
+                self.assertEqual(response['ETag'], expected['ETag'])
+
+                not_modified = self.call(view, self.factory.get(path, headers={**self.auth, 'If-None-Match': response['ETag']}), **kwargs)
+                self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_requires_authentication(self):
+        response = self.call(async_views.meeting_list, self.factory.get('/api/meet/'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('WWW-Authenticate', response)
+
+    def test_status_actions(self):
+        url = f'/api/meet/{self.meeting.uid}'
+        response = self.call(async_views.mark_in_progress, self.factory.post(f'{url}/mark-in-progress/', headers=self.auth), uid=self.meeting.uid)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['data']['status'], 'in_progress')
+        self.assertTrue(OutboxEmail.objects.filter(subject__startswith='BBC Meeting is in Progress').exists())
+
+        response = self.call(async_views.mark_completed, self.factory.post(f'{url}/mark-completed/', headers=self.auth), uid=self.meeting.uid)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        request = self.factory.post(f'{url}/mark-completed/', {'otp_code': sent_otp(self.meeting)}, content_type='application/json', headers=self.auth)
+        response = self.call(async_views.mark_completed, request, uid=self.meeting.uid)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.meeting.refresh_from_db()
+        self.assertEqual((self.meeting.status, self.meeting.is_otp_verified), ('completed', True))
+
+        response = self.call(async_views.mark_cancelled, self.factory.post(f'{url}/mark-cancelled/', headers=self.auth), uid=self.meeting.uid)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content)['error'], 'Cannot change status from completed to cancelled')
+
+    def test_other_methods_fall_back_to_the_viewset(self):
+        response = self.call(async_views.meeting_detail, self.factory.delete(f'/api/meet/{self.meeting.uid}/', headers=self.auth), uid=self.meeting.uid)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Meeting.objects.filter(pk=self.meeting.pk).exists())
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+
+    def export(self, query):
+        response = self.client.get(f'/api/meet/export/{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    @override_settings(MEET_EXPORT_CHUNK_SIZE=2)
+    def test_csv_streams_every_matching_meeting_in_chunks(self):
+        base = timezone.now()
+        meetings = [make_meeting(self.user, start_time=base + timedelta(hours=i // 2)) for i in range(5)]
+        make_meeting(self.user, status='cancelled')
+
+        response = self.client.get('/api/meet/export/?format=csv&status=scheduled')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        # Nothing is read until the body is consumed; then one query per chunk of 2.
+        with self.assertNumQueries(3):
+            rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+        expected = sorted(meetings, key=lambda m: (m.start_time, m.id), reverse=True)
+        self.assertEqual([row['uid'] for row in rows], [str(m.uid) for m in expected])
+        self.assertEqual(rows[0]['created_by'], 'organizer')
+        self.assertEqual(rows[0]['recipient_emails'], 'guest@example.com')
+
+    def test_ndjson_rows_match_the_api_fields(self):
+        meeting = make_meeting(self.user, title='=SUM(A1)')
+        response, body = self.export('?format=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        row = json.loads(body.splitlines()[0])
+        detail = self.client.get(f'/api/meet/{meeting.uid}/').data
+        for field in ('uid', 'title', 'start_time', 'status', 'recipient_emails', 'created_at', 'updated_at'):
+            self.assertEqual(row[field], detail[field])
+
+        # The CSV flavour neutralises cells a spreadsheet would run as formulas.
+        _, body = self.export('?format=csv')
+        self.assertIn("'=SUM(A1)", body)
+
+    def test_invalid_filters_are_reported_as_json(self):
+        for fmt in ('csv', 'ndjson'):
+            response = self.client.get(f'/api/meet/export/?format={fmt}&status=bogus')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertIn('status', response.json())
+
+    def test_authentication_errors_are_reported_as_json(self):
+        self.client.force_authenticate(None)
+        for fmt in ('csv', 'ndjson'):
+            response = self.client.get(f'/api/meet/export/?format={fmt}')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertIn('detail', response.json())
+
+
+class SparseFieldsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.meeting = make_meeting(self.user)
+        MeetingPhoto.objects.create(meeting=self.meeting, file='meeting_photos/photo.jpg', uploaded_by=self.user)
+
+    def test_full_shape_without_parameters(self):
+        item = self.client.get('/api/meet/').data['results'][0]
+        self.assertEqual(item['created_by']['username'], 'organizer')
+        self.assertEqual(len(item['photos']), 1)
+
+    def test_fields_skip_unrequested_relations(self):
+        # the page only: no photo aggregate, creator join or photo prefetch
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/meet/?fields=uid,title,start_time,status,created_by')
+        self.assertEqual(list(response.data['results'][0]), ['uid', 'title', 'start_time', 'status', 'created_by'])
+        self.assertEqual(response.data['results'][0]['created_by'], self.user.pk)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/meet/{self.meeting.uid}/?fields=title')
+        self.assertEqual(response.data, {'title': 'Weekly sync'})
+
+    def test_expand_embeds_relations(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/meet/?fields=uid&expand=photos,created_by')
+        item = response.data['results'][0]
+        self.assertEqual(set(item), {'uid', 'photos', 'created_by'})
+        self.assertEqual(item['created_by']['username'], 'organizer')
+
+        response = self.client.get(f'/api/meet/{self.meeting.uid}/?expand=created_by')
+        self.assertNotIn('photos', response.data)
+        self.assertIn('recipient_emails', response.data)
+        self.assertEqual(response.data['created_by']['username'], 'organizer')
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get('/api/meet/?fields=title,secret&expand=recipients')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {'fields', 'expand'})
+
+
+class MeetingValuesSerializerTests(APITestCase):
+    def test_output_matches_meeting_serializer_byte_for_byte(self):
+        user = User.objects.create_user('organizer', 'organizer@example.com', 'pass', first_name='Ada', last_name='Lovelace', is_staff=True)
+        other = User.objects.create_user('other', 'other@example.com', 'pass')
+        meetings = [make_meeting(user, status='in_progress', description='Ünïcode "quoted"'), make_meeting(other), make_meeting(other)]
+        MeetingPhoto.objects.create(meeting=meetings[0], file='meeting_photos/a.jpg', uploaded_by=user)
+        MeetingPhoto.objects.create(meeting=meetings[0], file='meeting_photos/b.jpg', uploaded_by=other, processing_status='ready',
+                                    thumbnail='meeting_photos/renditions/b_thumbnail.webp', width=10, height=20, file_size=300)
+        MeetingPhoto.objects.create(meeting=meetings[2], file='meeting_photos/c.jpg', uploaded_by=other)
+
+        renderer = JSONRenderer()
+        for kwargs in [{}, {'fields': ['uid', 'title', 'created_by']}, {'expand': ['photos']},
+                       {'fields': ['status', 'next_status'], 'expand': ['photos', 'created_by']}]:
+            with self.subTest(**kwargs):
+                fast = MeetingValuesSerializer(**kwargs)
+                rows = list(Meeting.objects.order_by('-id').values(*fast.columns))
+                instances = Meeting.objects.with_relations().order_by('-id')
+                self.assertEqual(
+                    renderer.render(fast.to_representation(rows)),
+                    renderer.render(MeetingSerializer(instances, many=True, **kwargs).data),
+                )
+
+
+class CalendarTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.base = (timezone.now() + timedelta(days=2)).replace(microsecond=0)
+
+    def payload(self, start, minutes=60):
+        return {
+            'title': 'Planning', 'description': 'Quarterly planning', 'location': 'Office', 'meeting_type': 'online',
+            'start_time': start.isoformat(), 'duration_minutes': minutes, 'recipient_emails': ['guest@example.com'],
+        }
+
+    def test_end_time_follows_start_and_duration(self):
+        meeting = make_meeting(self.user, start_time=self.base, duration_minutes=45)
+        self.assertEqual(meeting.end_time, self.base + timedelta(minutes=45))
+        meeting.duration_minutes = 90
+        meeting.save(update_fields=['duration_minutes'])
+        meeting.refresh_from_db()
+        self.assertEqual(meeting.end_time, self.base + timedelta(minutes=90))
+
+        bulk, = Meeting.objects.bulk_create([Meeting(title='Bulk', location='Office', start_time=self.base,
+                                                     duration_minutes=15, created_by=self.user)])
+        self.assertEqual(Meeting.objects.get(pk=bulk.pk).end_time, self.base + timedelta(minutes=15))
+
+    def test_calendar_returns_meetings_overlapping_the_window(self):
+        long = make_meeting(self.user, start_time=self.base - timedelta(hours=5), duration_minutes=6 * 60)
+        inside = make_meeting(self.user, start_time=self.base + timedelta(minutes=30))
+        make_meeting(self.user, start_time=self.base - timedelta(hours=2), duration_minutes=60)  # ends before
+        make_meeting(self.user, start_time=self.base + timedelta(hours=2))  # starts at `to`
+
+        response = self.client.get('/api/meet/calendar/', {
+            'from': self.base.isoformat(), 'to': (self.base + timedelta(hours=2)).isoformat(), 'fields': 'uid,end_time',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['uid'] for item in response.data['results']], [str(long.uid), str(inside.uid)])
+
+    def test_duration_is_capped_but_longer_stored_meetings_still_overlap(self):
+        response = self.client.post('/api/meet/', self.payload(self.base, minutes=settings.MEET_MAX_DURATION_MINUTES + 1), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('duration_minutes', response.data)
+
+        # Stored before the limit existed: still found well after the capped window.
+        legacy = make_meeting(self.user, start_time=self.base - timedelta(days=3), duration_minutes=5 * 24 * 60)
+        response = self.client.get('/api/meet/calendar/', {
+            'from': self.base.isoformat(), 'to': (self.base + timedelta(hours=1)).isoformat(), 'fields': 'uid',
+        })
+        self.assertEqual([item['uid'] for item in response.data['results']], [str(legacy.uid)])
+        response = self.client.post('/api/meet/', self.payload(self.base), format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_calendar_is_paged_in_start_order(self):
+        meetings = [make_meeting(self.user, start_time=self.base + timedelta(minutes=i % 2)) for i in range(5)]
+        expected = [str(meeting.uid) for meeting in sorted(meetings, key=lambda meeting: (meeting.start_time, meeting.pk))]
+
+        seen = []
+        url, params = '/api/meet/calendar/', {
+            'from': self.base.isoformat(), 'to': (self.base + timedelta(hours=1)).isoformat(), 'fields': 'uid', 'page_size': 2,
+        }
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen += [item['uid'] for item in response.data['results']]
+            url, params = response.data['next'], None
+        self.assertEqual(seen, expected)
+
+    def test_calendar_validates_the_window(self):
+        for params in [{}, {'from': self.base.isoformat(), 'to': self.base.isoformat()},
+                       {'from': self.base.isoformat(), 'to': (self.base + timedelta(days=365)).isoformat()}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/meet/calendar/', params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_double_booking_is_rejected(self):
+        existing = make_meeting(self.user, start_time=self.base, duration_minutes=60)
+        make_meeting(self.user, start_time=self.base, status='cancelled')
+
+        response = self.client.post('/api/meet/', self.payload(self.base + timedelta(minutes=30)), format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual([item['uid'] for item in response.data['conflicts']], [str(existing.uid)])
+
+        # Back to back is fine.
+        response = self.client.post('/api/meet/', self.payload(self.base + timedelta(minutes=60)), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_conflict_check_and_write_run_under_the_organizer_lock(self):
+        steps = []
+
+        def record(name, func):
+            def wrapper(*args):
+                steps.append((name, len(connection.atomic_blocks)))
+                return func(*args)
+            return wrapper
+
+        depth = len(connection.atomic_blocks)
+        with mock.patch.object(Meeting, 'lock_organizer', record('lock', Meeting.lock_organizer)), \
+                mock.patch('meet.views.conflict_response', record('check', views.conflict_response)), \
+                mock.patch.object(MeetingCreatSerializer, 'create', record('write', MeetingCreatSerializer.create)):
+            response = self.client.post('/api/meet/', self.payload(self.base), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # One transaction, entered before the lock is taken and left after the insert.
+        self.assertEqual(steps, [('lock', depth + 1), ('check', depth + 1), ('write', depth + 1)])
+
+    def test_update_checks_conflicts_and_moves_end_time(self):
+        first = make_meeting(self.user, start_time=self.base, duration_minutes=60)
+        second = make_meeting(self.user, start_time=self.base + timedelta(hours=3), duration_minutes=60)
+
+        response = self.client.put(f'/api/meet/{second.uid}/', self.payload(self.base + timedelta(minutes=30)), format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['conflicts'][0]['uid'], str(first.uid))
+
+        # Moving a meeting within its own slot does not clash with itself.
+        response = self.client.put(f'/api/meet/{second.uid}/', self.payload(self.base + timedelta(hours=3, minutes=15)), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        second.refresh_from_db()
+        self.assertEqual(second.end_time, self.base + timedelta(hours=4, minutes=15))
+
+
+class SchedulerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        User.objects.create_user('admin', 'admin@example.com', 'pass', is_staff=True)
+        self.now = timezone.now()
+
+    def run_scheduler(self, **options):
+        call_command('run_scheduler', once=True, stdout=io.StringIO(), **options)
+
+    def test_starts_due_meetings_and_flags_overruns(self):
+        due = make_meeting(self.user, title='Standup', start_time=self.now - timedelta(minutes=10))
+        overrun = make_meeting(self.user, title='Review', status='in_progress', start_time=self.now - timedelta(hours=2))
+        running = make_meeting(self.user, title='Planning', status='in_progress', start_time=self.now - timedelta(minutes=5))
+        future = make_meeting(self.user, title='Retro')
+        make_meeting(self.user, title='Offsite', status='cancelled', start_time=self.now - timedelta(hours=1))
+
+        self.run_scheduler(batch_size=1)
+
+        for meeting in (due, overrun, running, future):
+            meeting.refresh_from_db()
+        self.assertEqual((due.status, due.overrun_at), ('in_progress', None))
+        self.assertIsNotNone(overrun.overrun_at)
+        self.assertIsNone(running.overrun_at)
+        self.assertEqual(future.status, 'scheduled')
+        self.assertEqual(
+            sorted(OutboxEmail.objects.values_list('subject', flat=True)),
+            ['BBC Meetings In Progress: 1 meetings', 'BBC Meetings Overrunning: 1 meetings'],
+        )
+
+        # A second round has nothing left to do.
+        self.run_scheduler()
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_one_email_per_batch(self):
+        for i in range(5):
+            make_meeting(self.user, title=f'M{i}', start_time=self.now - timedelta(minutes=i + 1))
+        get_staff_emails()
+
+        # savepoint, locked read, update, outbox insert, release
+        with self.assertNumQueries(5):
+            self.assertEqual(len(Meeting.start_due(self.now, 3)), 3)
+        self.assertEqual(len(Meeting.start_due(self.now, 3)), 2)
+        self.assertEqual(Meeting.objects.filter(status='in_progress').count(), 5)
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_meetings_changed_elsewhere_are_not_reported(self):
+        meeting = make_meeting(self.user, start_time=self.now - timedelta(minutes=1))
+        claim = Meeting._claim
+
+        def claim_then_lose_race(queryset, limit):
+            claimed = claim(queryset, limit)
+            Meeting.objects.filter(pk=meeting.pk).update(status='cancelled')
+            return claimed
+
+        with mock.patch.object(Meeting, '_claim', claim_then_lose_race):
+            self.assertEqual(Meeting.start_due(self.now, 10), [])
+        self.assertFalse(OutboxEmail.objects.exists())
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.budget = make_meeting(self.user, title='Budget review', description='Quarterly budget and budget forecast')
+        self.offsite = make_meeting(self.user, title='Offsite', description='Planning the budget offsite', location='Lisbon')
+        self.standup = make_meeting(self.user, title='Standup', description='Daily sync')
+
+    def search(self, **params):
+        response = self.client.get('/api/meet/search/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_ranks_matches_and_pages_with_a_cursor(self):
+        response = self.search(q='budget', fields='uid')
+        self.assertEqual([item['uid'] for item in response.data['results']], [str(self.budget.uid), str(self.offsite.uid)])
+
+        uids = []
+        response = self.search(q='budget', fields='uid', page_size=1)
+        while True:
+            uids += [item['uid'] for item in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(uids, [str(self.budget.uid), str(self.offsite.uid)])
+
+    def test_every_word_must_match_as_a_prefix(self):
+        response = self.search(q='budg lisb', fields='uid')
+        self.assertEqual([item['uid'] for item in response.data['results']], [str(self.offsite.uid)])
+        self.assertEqual(self.search(q='"budget" OR (standup)', status='completed').data['results'], [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.standup.title = 'Budget standup'
+        self.standup.save()
+        self.offsite.delete()
+        response = self.search(q='budget', fields='title')
+        self.assertEqual(sorted(item['title'] for item in response.data['results']), ['Budget review', 'Budget standup'])
+
+    def test_query_is_required(self):
+        for params in [{}, {'q': ' *** '}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/meet/search/', params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_search_uses_the_index(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        other = User.objects.create_user('guest', 'guest@example.com', 'pass')
+        make_meeting(other, title='Hiring')
+        self.client.force_login(admin_user)
+        for term, titles in [('lisbon', ['Offsite']), ('guest@example.com', ['Hiring'])]:
+            with self.subTest(term=term):
+                response = self.client.get('/admin/meet/meeting/', {'q': term})
+                self.assertEqual([m.title for m in response.context['cl'].result_list], titles)
+
+
+class MultiPhotoUploadTests(TempMediaMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('organizer', 'organizer@example.com', 'pass')
+        self.client.force_authenticate(self.user)
+        self.meeting = make_meeting(self.user)
+        self.url = f'/api/meet/{self.meeting.uid}/upload-photo/'
+
+    def test_many_files_in_one_request(self):
+        files = [make_image(size=(10 + i, 10), name=f'p{i}.jpg') for i in range(5)]
+        files.append(make_image(size=(10, 10), name='copy.jpg'))  # same content as p0.jpg
+        files.insert(2, SimpleUploadedFile('notes.txt', b'not an image', content_type='text/plain'))
+
+        response = self.client.post(self.url, {'file': files}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((response.data['created'], response.data['failed']), (6, 1))
+        self.assertEqual([r['status'] for r in response.data['results']], ['created'] * 2 + ['error'] + ['created'] * 4)
+        self.assertEqual(response.data['results'][2]['name'], 'notes.txt')
+        self.assertNotIn('photo_id', response.data)
+
+        photos = {photo.id: photo for photo in MeetingPhoto.objects.select_related('blob')}
+        self.assertEqual(sorted(photos), sorted(r['photo_id'] for r in response.data['results'] if r['status'] == 'created'))
+        self.assertEqual(PhotoBlob.objects.count(), 5)
+        first, copy = response.data['results'][0]['photo_id'], response.data['results'][-1]['photo_id']
+        self.assertEqual(photos[first].blob, photos[copy].blob)
+        self.assertEqual(photos[first].blob.ref_count, 2)
+
+        # The same files again reuse every blob.
+        response = self.client.post(self.url, {'file': [make_image(size=(10, 10)), make_image(size=(11, 10))]}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(PhotoBlob.objects.count(), 5)
+        self.assertEqual(PhotoBlob.objects.get(pk=photos[first].blob_id).ref_count, 3)
+
+    def test_single_file_keeps_photo_id_and_bad_files_are_rejected(self):
+        response = self.client.post(self.url, {'file': make_image()}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['photo_id'], MeetingPhoto.objects.get().id)
+
+        response = self.client.post(self.url, {'file': SimpleUploadedFile('a.jpg', b'broken')}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(MEET_PHOTO_UPLOAD_MAX_FILES=1):
+            response = self.client.post(self.url, {'file': [make_image(), make_image()]}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(MeetingPhoto.objects.count(), 1)
+
+
+class SeedDataTests(APITestCase):
+    def seed(self, **options):
+        options = {'users': 3, 'meetings': 25, 'photo_blobs': 2, 'batch_size': 10, **options}
+        call_command('seed_data', stdout=io.StringIO(), **options)
+
+    def test_fills_the_database_consistently(self):
+        self.seed()
+        self.seed(prefix='other', photos_per_meeting=0)
+
+        self.assertEqual(User.objects.count(), 6)
+        self.assertEqual(Meeting.objects.count(), 50)
+        self.assertEqual(PhotoBlob.objects.count(), 2)
+        for blob in PhotoBlob.objects.all():
+            self.assertEqual(blob.ref_count, blob.photos.count())
+        now = timezone.now()
+        self.assertFalse(Meeting.objects.filter(status='scheduled', start_time__lt=now).exists())
+        self.assertFalse(Meeting.objects.filter(status='completed', end_time__gt=now).exists())
+        meeting = Meeting.objects.first()
+        self.assertEqual(meeting.end_time, meeting.start_time + timedelta(minutes=meeting.duration_minutes))
+
+    def test_reruns_reuse_users_and_blobs(self):
+        self.seed()
+        photos = MeetingPhoto.objects.count()
+        self.seed(seed=1)
+
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Meeting.objects.count(), 50)
+        self.assertEqual(sum(PhotoBlob.objects.values_list('ref_count', flat=True)), MeetingPhoto.objects.count())
+        self.assertGreater(MeetingPhoto.objects.count(), photos)
+
+    def test_seeded_users_can_log_in(self):
+        self.seed(password='secret-pass', meetings=0)
+        response = self.client.post('/api/auth/login/', {'username': 'seed-2', 'password': 'secret-pass'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,10 @@
+from base.throttling import IPTokenBucketThrottle, UserTokenBucketThrottle
+
+
+class OTPUserThrottle(UserTokenBucketThrottle):
+    """mark-completed sends an OTP email or checks a code, so both SMTP quota and guesses are limited."""
+    scope = 'otp_user'
+
+
+class OTPIPThrottle(IPTokenBucketThrottle):
+    scope = 'otp_ip'
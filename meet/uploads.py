@@ -0,0 +1,113 @@
+"""
+Upload handlers that hash photo uploads while Django streams them in, the
+thread pool that stores multi-photo uploads, and cleanup of files written by
+transactions that roll back.
+
+They are the MemoryFileUploadHandler / TemporaryFileUploadHandler pair with a
+SHA-256 of the content kept alongside: the resulting UploadedFile carries the
+hex digest as `sha256`, so PhotoBlob.acquire does not have to read the file a
+second time to find out whether the content is already stored.
+"""
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+from base.views import logger
+
+
+class _HashingMixin:
+    def new_file(self, *args, **kwargs):
+        # Set first: MemoryFileUploadHandler.new_file ends by raising StopFutureHandlers.
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def hashes_chunks(self):
+        return True
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.hashes_chunks():
+            self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(_HashingMixin, MemoryFileUploadHandler):
+    def hashes_chunks(self):
+        # Larger uploads are passed on to the temporary file handler, which hashes them itself.
+        return self.activated
+
+
+class HashingTemporaryFileUploadHandler(_HashingMixin, TemporaryFileUploadHandler):
+    pass
+
+
+def file_sha256(file):
+    """The hex SHA-256 of an uploaded or stored file, reusing the digest taken during upload when there is one."""
+    digest = getattr(file, 'sha256', None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    file.seek(0)
+    return sha256.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def upload_pool():
+    """
+    Threads that validate and store the files of multi-photo uploads. Shared
+    by every request in the process, so PHOTO_UPLOAD_WORKERS caps the files
+    being decoded or written at once however many uploads arrive together.
+    """
+    return ThreadPoolExecutor(max_workers=settings.PHOTO_UPLOAD_WORKERS, thread_name_prefix='photo-upload')
+
+
+_saved_files = ContextVar('saved_files', default=None)
+
+
+def saved_files():
+    """
+    The list to append (storage, name) to after writing a file that a database
+    row is about to refer to. Inside discard_on_error() the files are deleted
+    again if the block fails; elsewhere the list is thrown away. Appending from
+    worker threads is fine, but fetch the list in the calling thread.
+    """
+    files = _saved_files.get()
+    return files if files is not None else []
+
+
+@contextmanager
+def discard_on_error():
+    """
+    Delete the files recorded in saved_files() if the block raises, i.e. if the
+    transaction that would have referred to them rolls back. Enter it around the
+    outermost transaction.atomic(); nested blocks leave the cleanup to it.
+    """
+    if _saved_files.get() is not None:
+        yield
+        return
+    files = []
+    token = _saved_files.set(files)
+    try:
+        yield
+    except BaseException:
+        for storage, name in files:
+            try:
+                storage.delete(name)
+            except OSError as e:
+                logger.error(f"Error deleting {name} after a failed upload: {e}")
+        raise
+    finally:
+        _saved_files.reset(token)
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework.routers import DefaultRouter
+from meet import async_views
 from meet.views import MeetingViewSet
 
 router = DefaultRouter()
@@ -9,4 +11,14 @@ urlpatterns = [
     # Placeholder for future API endpoints
 ]
 
+if settings.MEET_ASYNC_VIEWS:
+    # Served on the event loop under ASGI; everything else falls through to the router.
+    urlpatterns += [
+        path('', async_views.meeting_list),
+        path('<uuid:uid>/', async_views.meeting_detail),
+        path('<uuid:uid>/mark-in-progress/', async_views.mark_in_progress),
+        path('<uuid:uid>/mark-completed/', async_views.mark_completed),
+        path('<uuid:uid>/mark-cancelled/', async_views.mark_cancelled),
+    ]
+
 urlpatterns += router.urls
@@ -1,30 +1,111 @@
 from django.shortcuts import render
+from django.core.files import File
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, prefetch_related_objects
+from django.utils import timezone
 from rest_framework.viewsets import ViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, JSONParser
-from meet.models import Meeting, MeetingPhoto
-from meet.serializers import MeetingSerializer, MeetingCreatSerializer
+from meet.models import Meeting, MeetingPhoto, PhotoUploadSession
+from meet.serializers import MeetingSerializer, MeetingCreatSerializer, MeetingFilterSerializer, MeetingFieldsSerializer, MeetingValuesSerializer, MeetingWindowSerializer, MeetingSearchSerializer, MeetingBulkTransitionSerializer, PhotoUploadSerializer, PhotoUploadSessionSerializer
+from meet.pagination import MeetingCalendarPagination, MeetingCursorPagination, MeetingSearchPagination
+from meet.otp import OTPAttemptsExceeded
+from meet.throttling import OTPUserThrottle, OTPIPThrottle
+from meet.export import MeetingCSVRenderer, MeetingNDJSONRenderer, export_response
+from meet.uploads import upload_pool
+from meet.conditional import meeting_validators, not_modified_response, set_validators
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from account.authentication import CachedJWTAuthentication
 from rest_framework import status
 from base.views import logger
 
 
+def upload_offset(response, offset):
+    response['Upload-Offset'] = str(offset)
+    return response
+
+
+def batch_response(results):
+    """
+    The response of a batch endpoint from its per-item `results`, each with an
+    'index' and a 'status' of 'created' or 'error': HTTP 201 when every item was
+    created, 207 when only some were, and 400 when none was.
+    """
+    results.sort(key=lambda result: result['index'])
+    created = sum(1 for result in results if result['status'] == 'created')
+    failed = len(results) - created
+    if not created:
+        response_status = status.HTTP_400_BAD_REQUEST
+    elif failed:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_201_CREATED
+    return Response({'status': created > 0, 'created': created, 'failed': failed, 'results': results}, status=response_status)
+
+
+def photo_errors(file):
+    """Validation errors for one uploaded photo, or None; decodes the image, so it runs on the upload pool."""
+    serializer = PhotoUploadSerializer(data={'file': file})
+    return None if serializer.is_valid() else serializer.errors['file']
+
+
+def conflict_response(meeting):
+    """A 409 listing the organizer's meetings that overlap `meeting`, or None if there are none."""
+    fast = MeetingValuesSerializer(fields=['uid', 'title', 'start_time', 'end_time', 'status'])
+    conflicts = fast.to_representation(list(meeting.conflicts().values(*fast.columns)))
+    if not conflicts:
+        return None
+    return Response({
+        'status': False,
+        'error': 'The organizer already has a meeting at this time',
+        'conflicts': conflicts,
+    }, status=status.HTTP_409_CONFLICT)
+
+
 # Create your views here.
 class MeetingViewSet(ViewSet):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     lookup_field = 'uid'
+    pagination_class = MeetingCursorPagination
 
     def list(self, request):
         """
-        List all meetings
+        List meetings, newest first, one page at a time
         Endpoint: GET /api/meet/
+        Query params (all optional):
+            status: "scheduled,in_progress"
+            meeting_type: "online"
+            created_by: user id
+            start_after / start_before: ISO 8601 datetimes
+            page_size: number of meetings per page (max 200)
+            cursor: value taken from the "next" link of the previous page
+            fields: "uid,title,start_time,status" (top-level fields to return)
+            expand: "photos,created_by" (relations to embed; see MeetingSerializer)
+        Response: {"next": "url or null", "results": [...]}
+        Supports If-None-Match / If-Modified-Since; returns 304 when the page is unchanged.
         """
-        meetings = Meeting.objects.all()
-        serializer = MeetingSerializer(meetings, many=True)
-        return Response(serializer.data)
+        filters = MeetingFilterSerializer(data=request.query_params)
+        shape = MeetingFieldsSerializer(data=request.query_params)
+        if not (filters.is_valid() & shape.is_valid()):
+            return Response({**filters.errors, **shape.errors}, status=status.HTTP_400_BAD_REQUEST)
+        fast = MeetingValuesSerializer(**shape.serializer_kwargs())
+        meetings = filters.filter_queryset(Meeting.objects.values(*fast.columns))
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(meetings, request, view=self)
+
+        photos = MeetingPhoto.objects.filter(meeting__in=[m['id'] for m in page]).aggregate(
+            latest=Max('updated_at'), total=Count('id'),
+        ) if page and shape.expands('photos') else {'latest': None, 'total': 0}
+        etag, last_modified = meeting_validators(request, page, photos['latest'], photos['total'], extra=paginator.has_next,
+                                                 include_creator=shape.expands('created_by'))
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        return set_validators(paginator.get_paginated_response(fast.to_representation(page)), etag, last_modified)
 
     def create(self, request):
         """
@@ -40,12 +121,19 @@ class MeetingViewSet(ViewSet):
             "duration_minutes": "Meeting Duration",
             "recipient_emails": "Meeting Recipient Emails list"
         }
+        Responds 409 with the clashing meetings if the organizer already has a
+        scheduled or running meeting at that time.
         """
         try:
             serializer = MeetingCreatSerializer(data=request.data)
             user = request.user
             if serializer.is_valid():
-                serializer.create(request.data, user)
+                with transaction.atomic():
+                    Meeting.lock_organizer(user.pk)
+                    conflict = conflict_response(Meeting(**serializer.validated_data, created_by=user))
+                    if conflict is not None:
+                        return conflict
+                    serializer.create(serializer.validated_data, user)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
@@ -54,15 +142,165 @@ class MeetingViewSet(ViewSet):
             logger.error(f"Error creating meeting: {str(e)}")
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'], url_path='bulk-create')
+    def bulk_create(self, request):
+        """
+        Create many meetings in one request
+        Endpoint: POST /api/meet/bulk-create/
+        Body: [{...same fields as POST /api/meet/...}, ...] (at most MEET_BULK_CREATE_MAX_ITEMS items)
+        Response: {"status": true, "created": 2, "failed": 1, "results": [
+            {"index": 0, "status": "created", "uid": "..."},
+            {"index": 1, "status": "error", "errors": {...}},
+            ...
+        ]}
+        Items that overlap another scheduled or running meeting of the organizer,
+        including one earlier in the batch, fail with their "conflicts" uids.
+        Valid items are created even when others fail (HTTP 207). Nothing is created
+        if every item fails (HTTP 400). Admins get one email for the whole batch.
+        """
+        try:
+            items = request.data
+            if not isinstance(items, list) or not items:
+                return Response({'status': False, 'error': 'Expected a non-empty list of meetings'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(items) > settings.MEET_BULK_CREATE_MAX_ITEMS:
+                return Response({'status': False, 'error': f'At most {settings.MEET_BULK_CREATE_MAX_ITEMS} meetings per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+            results, valid = [], []
+            for index, item in enumerate(items):
+                serializer = MeetingCreatSerializer(data=item)
+                if serializer.is_valid():
+                    valid.append((index, serializer.validated_data))
+                else:
+                    results.append({'index': index, 'status': 'error', 'errors': serializer.errors})
+
+            if valid:
+                outcomes = Meeting.bulk_schedule([data for _, data in valid], request.user)
+                for (index, _), (meeting, conflicts) in zip(valid, outcomes):
+                    if meeting is not None:
+                        results.append({'index': index, 'status': 'created', 'uid': meeting.uid})
+                    else:
+                        results.append({
+                            'index': index, 'status': 'error',
+                            'errors': {'start_time': ['The organizer already has a meeting at this time']},
+                            'conflicts': [conflict.uid for conflict in conflicts],
+                        })
+            return batch_response(results)
+        except Exception as e:
+            logger.error(f"Error bulk creating meetings: {e}")
+            return Response({'status': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'], url_path='bulk-transition')
+    def bulk_transition(self, request):
+        """
+        Change the status of many meetings at once
+        Endpoint: POST /api/meet/bulk-transition/
+        Body: {"uids": ["uid", ...], "status": "in_progress" | "cancelled"}
+        Response: {"status": true, "updated": 1, "results": [
+            {"uid": "...", "result": "updated", "current_status": "cancelled"},
+            {"uid": "...", "result": "invalid_transition", "current_status": "completed"},
+            {"uid": "...", "result": "not_found", "current_status": null}
+        ]}
+        Admins get one email for the whole batch.
+        """
+        try:
+            serializer = MeetingBulkTransitionSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            uids = serializer.validated_data['uids']
+            outcomes = Meeting.bulk_transition(uids, serializer.validated_data['status'], request.user)
+            results = [
+                {'uid': uid, 'result': outcomes[uid][0], 'current_status': outcomes[uid][1]}
+                for uid in uids
+            ]
+            updated = sum(1 for result in results if result['result'] == 'updated')
+            return Response({'status': True, 'updated': updated, 'results': results}, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.error(f"Error bulk changing meeting status: {e}")
+            return Response({'status': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['get'], url_path='calendar')
+    def calendar(self, request):
+        """
+        Meetings running at any point in a time window, in start order
+        Endpoint: GET /api/meet/calendar/?from=2026-03-01T00:00:00Z&to=2026-04-01T00:00:00Z
+        Query params: from, to (required, at most MEET_CALENDAR_MAX_DAYS apart),
+            page_size, cursor; the list filters and fields / expand are accepted too
+        Response: {"next": "url or null", "results": [...]}
+        """
+        window = MeetingWindowSerializer(data=request.query_params)
+        filters = MeetingFilterSerializer(data=request.query_params)
+        shape = MeetingFieldsSerializer(data=request.query_params)
+        if not (window.is_valid() & filters.is_valid() & shape.is_valid()):
+            return Response({**window.errors, **filters.errors, **shape.errors}, status=status.HTTP_400_BAD_REQUEST)
+        fast = MeetingValuesSerializer(**shape.serializer_kwargs())
+        meetings = filters.filter_queryset(
+            Meeting.objects.overlapping(window.validated_data['from'], window.validated_data['to'])
+        ).values(*fast.columns)
+        paginator = MeetingCalendarPagination()
+        page = paginator.paginate_queryset(meetings, request, view=self)
+        return paginator.get_paginated_response(fast.to_representation(page))
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """
+        Full-text search over title, description and location, best match first
+        Endpoint: GET /api/meet/search/?q=quarterly planning
+        Query params: q (required; every word must match, as a prefix), page_size,
+            cursor, and the list filters and fields / expand
+        Response: {"next": "url or null", "results": [...]}
+        """
+        query = MeetingSearchSerializer(data=request.query_params)
+        filters = MeetingFilterSerializer(data=request.query_params)
+        shape = MeetingFieldsSerializer(data=request.query_params)
+        if not (query.is_valid() & filters.is_valid() & shape.is_valid()):
+            return Response({**query.errors, **filters.errors, **shape.errors}, status=status.HTTP_400_BAD_REQUEST)
+        fast = MeetingValuesSerializer(**shape.serializer_kwargs())
+        meetings = filters.filter_queryset(Meeting.objects.search(query.validated_data['q']).values(*fast.columns, 'rank'))
+        paginator = MeetingSearchPagination()
+        page = paginator.paginate_queryset(meetings, request, view=self)
+        return paginator.get_paginated_response(fast.to_representation(page))
+
+    @action(detail=False, methods=['get'], url_path='export', renderer_classes=[MeetingCSVRenderer, MeetingNDJSONRenderer])
+    def export(self, request):
+        """
+        Stream every meeting matching the list filters, newest first
+        Endpoint: GET /api/meet/export/?format=csv (default) or ?format=ndjson
+        Query params: the same filters as GET /api/meet/ (no pagination)
+        Response: a text/csv or application/x-ndjson attachment, sent as rows are read
+        """
+        filters = MeetingFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            # ExportRenderer sends errors as JSON whatever format was asked for.
+            return Response(filters.errors, status=status.HTTP_400_BAD_REQUEST)
+        meetings = filters.filter_queryset(Meeting.objects.all())
+        return export_response(request._request, meetings, request.accepted_renderer)
+
     def retrieve(self, request, uid=None):
         """
         Retrieve a meeting
         Endpoint: GET /api/meet/{uid}/
+        Query params (optional): fields, expand, as for the list
+        Supports If-None-Match / If-Modified-Since; returns 304 when unchanged.
         """
+        shape = MeetingFieldsSerializer(data=request.query_params)
+        if not shape.is_valid():
+            return Response(shape.errors, status=status.HTTP_400_BAD_REQUEST)
         try:
-            meeting = Meeting.objects.get(uid=uid)
-            serializer = MeetingSerializer(meeting)
-            return Response(serializer.data)
+            meetings = shape.prepare_queryset(Meeting.objects.all())
+            if shape.expands('photos'):
+                meetings = meetings.with_photo_stats()
+            meeting = meetings.get(uid=uid)
+            etag, last_modified = meeting_validators(request, [meeting], getattr(meeting, 'photos_updated_at', None),
+                                                     getattr(meeting, 'photo_count', 0), include_creator=shape.expands('created_by'))
+            not_modified = not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+
+            if shape.expands('photos'):
+                prefetch_related_objects([meeting], 'photos')
+            serializer = MeetingSerializer(meeting, **shape.serializer_kwargs())
+            return set_validators(Response(serializer.data), etag, last_modified)
         except Meeting.DoesNotExist:
             return Response({"error": "Meeting not found"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -70,12 +308,20 @@ class MeetingViewSet(ViewSet):
         """
         Update a meeting
         Endpoint: PUT /api/meet/{uid}/
+        Responds 409 with the clashing meetings if the new time overlaps another
+        scheduled or running meeting of the organizer.
         """
         try:
             meeting = Meeting.objects.get(uid=uid)
             serializer = MeetingCreatSerializer(meeting, data=request.data)
             if serializer.is_valid():
-                serializer.save()
+                with transaction.atomic():
+                    Meeting.lock_organizer(meeting.created_by_id)
+                    candidate = Meeting(pk=meeting.pk, created_by_id=meeting.created_by_id, **serializer.validated_data)
+                    conflict = conflict_response(candidate)
+                    if conflict is not None:
+                        return conflict
+                    serializer.save()
                 return Response(serializer.data)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Meeting.DoesNotExist:
@@ -96,25 +342,146 @@ class MeetingViewSet(ViewSet):
     @action(detail=True, methods=['post'], url_path='upload-photo', parser_classes=[MultiPartParser])
     def upload_photo(self, request, uid=None):
         """
-        Upload a photo for a meeting
+        Upload one or more photos for a meeting
         Endpoint: POST /api/meet/{uid}/upload-photo/
         Body: multipart/form-data
-        Key: file (image file)
+        Key: file (image file; repeat the key for up to MEET_PHOTO_UPLOAD_MAX_FILES photos)
+        Response: {"status": true, "created": 1, "failed": 1, "results": [
+            {"index": 0, "name": "a.jpg", "status": "created", "photo_id": 1},
+            {"index": 1, "name": "b.txt", "status": "error", "errors": {...}},
+        ]}
+        A single-file upload also gets "photo_id". Valid files are stored even
+        when others fail (HTTP 207); nothing is stored if every file fails (HTTP 400).
         """
         try:
             meeting = Meeting.objects.get(uid=uid)
-            file = request.FILES.get('file')
-            if not file:
+            files = request.FILES.getlist('file')
+            if not files:
                 return Response({'status': False, 'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(files) > settings.MEET_PHOTO_UPLOAD_MAX_FILES:
+                return Response({'status': False, 'error': f'At most {settings.MEET_PHOTO_UPLOAD_MAX_FILES} photos per request'}, status=status.HTTP_400_BAD_REQUEST)
 
-            photo = MeetingPhoto.objects.create(meeting=meeting, file=file, uploaded_by=request.user)
-            return Response({'status': True, 'photo_id': photo.id}, status=status.HTTP_201_CREATED)
+            pool = upload_pool()
+            results, valid = [], []
+            for index, (file, errors) in enumerate(zip(files, pool.map(photo_errors, files))):
+                if errors:
+                    results.append({'index': index, 'name': file.name, 'status': 'error', 'errors': errors})
+                else:
+                    valid.append((index, file))
+
+            if valid:
+                photos = MeetingPhoto.store_many(meeting, [file for _, file in valid], request.user, pool)
+                results += [
+                    {'index': index, 'name': file.name, 'status': 'created', 'photo_id': photo.id}
+                    for (index, file), photo in zip(valid, photos)
+                ]
+            response = batch_response(results)
+            if len(files) == 1 and valid:
+                response.data['photo_id'] = results[0]['photo_id']
+            return response
         except Meeting.DoesNotExist:
             return Response({"status": False, "error": "Meeting not found"}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.error(f"Error uploading photo: {e}")
             return Response({"status": False, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['post'], url_path='upload-sessions')
+    def upload_sessions(self, request, uid=None):
+        """
+        Start a resumable photo upload
+        Endpoint: POST /api/meet/{uid}/upload-sessions/
+        Body: {"filename": "photo.jpg", "size": 4718592}
+        Response: the session; send the bytes to .../upload-sessions/{upload_id}/ with PUT, then POST .../commit/
+        """
+        try:
+            meeting = Meeting.objects.get(uid=uid)
+            serializer = PhotoUploadSessionSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response({'status': False, 'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+            session = PhotoUploadSession.start(meeting, request.user, **serializer.validated_data)
+            return Response({'status': True, 'data': PhotoUploadSessionSerializer(session).data}, status=status.HTTP_201_CREATED)
+        except Meeting.DoesNotExist:
+            return Response({"status": False, "error": "Meeting not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    @staticmethod
+    def get_upload_session(request, uid, upload_id):
+        return PhotoUploadSession.objects.select_related('meeting').get(
+            uid=upload_id, meeting__uid=uid, created_by=request.user, expires_at__gt=timezone.now(),
+        )
+
+    @action(detail=True, methods=['get', 'put', 'delete'], url_path=r'upload-sessions/(?P<upload_id>[0-9a-f-]{36})')
+    def upload_session(self, request, uid=None, upload_id=None):
+        """
+        Send, resume or abandon a resumable photo upload
+        Endpoint: GET /api/meet/{uid}/upload-sessions/{upload_id}/
+            Bytes received so far, in `offset` and the Upload-Offset header; resume from there
+        Endpoint: PUT /api/meet/{uid}/upload-sessions/{upload_id}/
+            Headers: Upload-Offset (the current offset), Content-Type: application/offset+octet-stream
+            Body: the next bytes of the file, of any length; chunks must be sent one at a time
+        Endpoint: DELETE /api/meet/{uid}/upload-sessions/{upload_id}/
+        """
+        try:
+            session = self.get_upload_session(request, uid, upload_id)
+        except PhotoUploadSession.DoesNotExist:
+            return Response({"status": False, "error": "Upload session not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.method == 'DELETE':
+            session.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        if request.method == 'PUT':
+            if session.status != 'open':
+                return Response({'status': False, 'error': 'Upload session is already committed'}, status=status.HTTP_409_CONFLICT)
+            try:
+                start = int(request.headers['Upload-Offset'])
+            except (KeyError, ValueError):
+                return Response({'status': False, 'error': 'Upload-Offset header is required'}, status=status.HTTP_400_BAD_REQUEST)
+            if start != session.offset:
+                return upload_offset(Response({'status': False, 'error': f"Upload-Offset must be {session.offset}"},
+                                              status=status.HTTP_409_CONFLICT), session.offset)
+            if int(request.META.get('CONTENT_LENGTH') or 0) > session.size - start:
+                return Response({'status': False, 'error': 'Chunk goes past the declared size'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            try:
+                if request.stream is not None and session.append(start, request.stream) is None:
+                    session.refresh_from_db(fields=['offset'])
+                    return upload_offset(Response({'status': False, 'error': f"Upload-Offset must be {session.offset}"},
+                                                  status=status.HTTP_409_CONFLICT), session.offset)
+            except OSError as e:
+                logger.error(f"Error receiving upload chunk: {e}")
+                return upload_offset(Response({'status': False, 'error': 'Upload interrupted; resume from Upload-Offset'},
+                                              status=status.HTTP_400_BAD_REQUEST), session.offset)
+
+        return upload_offset(Response({'status': True, 'data': PhotoUploadSessionSerializer(session).data}), session.offset)
+
+    @action(detail=True, methods=['post'], url_path=r'upload-sessions/(?P<upload_id>[0-9a-f-]{36})/commit')
+    def commit_upload_session(self, request, uid=None, upload_id=None):
+        """
+        Finish a resumable photo upload and add the photo to the meeting
+        Endpoint: POST /api/meet/{uid}/upload-sessions/{upload_id}/commit/
+        Response: {"status": true, "photo_id": 1}, as for upload-photo; committing twice returns the same photo
+        A file that is not a valid photo is refused (HTTP 400) and the session deleted.
+        """
+        try:
+            session = self.get_upload_session(request, uid, upload_id)
+            if session.status == 'open' and session.offset >= session.size:
+                # Checked like upload-photo; the bytes cannot change any more, the session is full.
+                with open(session.path, 'rb') as part:
+                    errors = photo_errors(File(part, name=session.filename))
+                if errors:
+                    session.delete()
+                    return Response({'status': False, 'error': 'The upload is not a valid photo', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+            photo = session.commit()
+            if photo is None:
+                session.refresh_from_db()
+                error = 'Upload is not complete' if session.status == 'open' else 'The photo was deleted'
+                return upload_offset(Response({'status': False, 'error': error}, status=status.HTTP_409_CONFLICT), session.offset)
+            return Response({'status': True, 'photo_id': photo.id}, status=status.HTTP_201_CREATED)
+        except PhotoUploadSession.DoesNotExist:
+            return Response({"status": False, "error": "Upload session not found"}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error(f"Error committing photo upload: {e}")
+            return Response({"status": False, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     @action(detail=True, methods=['post'], url_path='mark-in-progress')
     def mark_in_progress(self, request, uid=None):
         """
@@ -122,8 +489,9 @@ class MeetingViewSet(ViewSet):
         Endpoint: POST /api/meet/{uid}/mark-in-progress/
         """
         try:
-            meeting = Meeting.objects.get(uid=uid)
-            meeting.status_update_in_progress()
+            meeting = Meeting.objects.with_relations().get(uid=uid)
+            if not meeting.status_update_in_progress():
+                return Response({'status': False, 'error': f"Cannot change status from {meeting.status} to in_progress"}, status=status.HTTP_400_BAD_REQUEST)
             serializer = MeetingSerializer(meeting)
             return Response({'status': True, 'data': serializer.data}, status=status.HTTP_200_OK)
         except Meeting.DoesNotExist:
@@ -132,7 +500,7 @@ class MeetingViewSet(ViewSet):
             logger.error(f"Error marking meeting in progress: {e}")
             return Response({'status': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=True, methods=['post'], url_path='mark-completed')
+    @action(detail=True, methods=['post'], url_path='mark-completed', throttle_classes=[OTPUserThrottle, OTPIPThrottle])
     def mark_completed(self, request, uid=None):
         """
         Mark a meeting as completed
@@ -140,12 +508,17 @@ class MeetingViewSet(ViewSet):
         Body: {"otp_code": "OTP Code"} (optional — omit to trigger OTP email)
         """
         try:
-            meeting = Meeting.objects.get(uid=uid)
+            meeting = Meeting.objects.with_relations().get(uid=uid)
             otp_code = request.data.get('otp_code')
 
             if otp_code:
-                if meeting.verify_otp(otp_code):
-                    meeting.status_update_completed()
+                try:
+                    verified = meeting.verify_otp(otp_code)
+                except OTPAttemptsExceeded:
+                    return Response({'status': False, 'error': 'Too many invalid OTP attempts. Request a new OTP.'}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+                if verified:
+                    if not meeting.status_update_completed():
+                        return Response({'status': False, 'error': f"Cannot change status from {meeting.status} to completed"}, status=status.HTTP_400_BAD_REQUEST)
                     serializer = MeetingSerializer(meeting)
                     return Response({'status': True, 'data': serializer.data}, status=status.HTTP_200_OK)
                 else:
@@ -167,8 +540,9 @@ class MeetingViewSet(ViewSet):
         Endpoint: POST /api/meet/{uid}/mark-cancelled/
         """
         try:
-            meeting = Meeting.objects.get(uid=uid)
-            meeting.status_update_cancelled(request.user)
+            meeting = Meeting.objects.with_relations().get(uid=uid)
+            if not meeting.status_update_cancelled(request.user):
+                return Response({'status': False, 'error': f"Cannot change status from {meeting.status} to cancelled"}, status=status.HTTP_400_BAD_REQUEST)
             serializer = MeetingSerializer(meeting)
             return Response({'status': True, 'data': serializer.data}, status=status.HTTP_200_OK)
         except Meeting.DoesNotExist: